@@ -0,0 +1,54 @@
+"""
+Binary records vs pydantic JSON: bytes per record and decode time for a session history.
+
+    python -m benchmarks.bench_binary_records --records 20000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+from benchmarks.bench_storage import sample_analyses
+from models import binary_records
+
+
+def _timed(fn, repeat: int = 5) -> float:
+    """Best of ``repeat`` runs in ms, each after a full collection so no run pays for another's garbage."""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare binary record and JSON storage of analyses.")
+    parser.add_argument("--records", type=int, default=20000, help="analyses to encode")
+    args = parser.parse_args(argv)
+
+    analyses = [analysis for _, analysis in sample_analyses(args.records)]
+    print(f"{args.records:,} records, Python {sys.version.split()[0]}, {os.cpu_count()} CPUs")
+    print(f"{'':22} {'JSON B':>8} {'bin B':>7} {'json.loads':>11} {'JSON→models':>12} "
+          f"{'bin→models':>11} {'bin→columns':>12}  (ms)")
+    for name, attr in (("FinancialData", "financial_data"), ("FinancialRatios", "ratios"),
+                       ("HealthScoreBreakdown", "health_score")):
+        records = [getattr(a, attr) for a in analyses]
+        model = type(records[0])
+        texts = [r.model_dump_json() for r in records]
+        buffer = binary_records.encode_many(records)
+        print(
+            f"{name:22} {sum(map(len, texts)) / len(records):8.0f} {len(buffer) / len(records):7.0f} "
+            f"{_timed(lambda: [json.loads(t) for t in texts]):11.1f} "
+            f"{_timed(lambda: [model.model_validate_json(t) for t in texts]):12.1f} "
+            f"{_timed(lambda: binary_records.decode_many(buffer)):11.1f} "
+            f"{_timed(lambda: binary_records.columns(buffer)):12.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+SQLite storage benchmark: default-journal, row-at-a-time writes vs WAL with bulk transactions.
+
+    python -m benchmarks.bench_storage --sessions 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Tuple
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from models.database import Base, SQLiteSettings, make_engine
+from models.financial_data import BalanceSheet, CashFlow, FinancialData, FullAnalysis, ProfitLoss
+from services.analyzer import analyze
+from services.portfolio_store import save_analyses, save_analysis, screen_ratio
+
+# The engine as it was before the tuning layer: rollback journal, full sync, default cache, no mmap
+LEGACY = SQLiteSettings(journal_mode="DELETE", synchronous="FULL", cache_size_kib=2000, mmap_size=0,
+                        busy_timeout_ms=0)
+TUNED = SQLiteSettings()
+
+
+def sample_financials(n: int, seed: int = 0) -> List[FinancialData]:
+    rng = random.Random(seed)
+
+    def amount(scale: float) -> float:
+        return round(rng.uniform(0, scale), 2)
+
+    return [
+        FinancialData(
+            company_name=f"Company {i % max(n // 5, 1)}",
+            financial_year=rng.choice(["2022-23", "2023-24", "2024-25"]),
+            balance_sheet=BalanceSheet(**{f: amount(1e6) for f in BalanceSheet.model_fields}),
+            profit_loss=ProfitLoss(**{f: amount(4e6 if f == "revenue_from_operations" else 5e5)
+                                      for f in ProfitLoss.model_fields}),
+            cash_flow=CashFlow(**{f: amount(3e5) - 1e5 for f in CashFlow.model_fields}),
+            annual_loan_repayment=amount(2e5),
+        )
+        for i in range(n)
+    ]
+
+
+def sample_analyses(n: int, seed: int = 0) -> List[Tuple[str, FullAnalysis]]:
+    return [(f"bench-{i:07d}", analyze(data)) for i, data in enumerate(sample_financials(n, seed))]
+
+
+def run(settings: SQLiteSettings, bulk: bool, items, queries: int, path: str) -> dict:
+    url = f"sqlite:///{path}"
+    engine = make_engine(url, settings)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    db = Session()
+    start = time.perf_counter()
+    if bulk:
+        save_analyses(db, items)
+    else:
+        for session_id, analysis in items:
+            save_analysis(db, session_id, analysis)
+    insert_s = time.perf_counter() - start
+    db.close()
+
+    db = Session()
+    start = time.perf_counter()
+    for i in range(queries):
+        screen_ratio(db, "dscr", "<", 1.0 + (i % 10) / 20, "2024-25")
+    query_s = time.perf_counter() - start
+    db.close()
+
+    # Readers polling while a writer re-saves the whole batch
+    reads, locked = [0], [0]
+    done = threading.Event()
+
+    def reader():
+        db = Session()
+        while not done.is_set():
+            try:
+                screen_ratio(db, "current_ratio", "<", 1.0)
+                reads[0] += 1
+            except OperationalError:
+                locked[0] += 1
+                db.rollback()
+        db.close()
+
+    threads = [threading.Thread(target=reader) for _ in range(2)]
+    for t in threads:
+        t.start()
+    db = Session()
+    start = time.perf_counter()
+    try:
+        save_analyses(db, items, chunk_size=100)
+    except OperationalError:
+        locked[0] += 1
+    concurrent_s = time.perf_counter() - start
+    done.set()
+    for t in threads:
+        t.join()
+    db.close()
+    engine.dispose()
+
+    return {
+        "inserts_per_s": len(items) / insert_s,
+        "queries_per_s": queries / query_s,
+        "reads_during_write_per_s": reads[0] / concurrent_s,
+        "locked_errors": locked[0],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare legacy and tuned SQLite storage.")
+    parser.add_argument("--sessions", type=int, default=2000, help="analyses to store")
+    parser.add_argument("--queries", type=int, default=200, help="screening queries to time")
+    args = parser.parse_args(argv)
+
+    items = sample_analyses(args.sessions)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        results["before (DELETE journal, row commits)"] = run(
+            LEGACY, False, items, args.queries, os.path.join(tmp, "legacy.db"))
+        results["after (WAL, bulk transactions)"] = run(
+            TUNED, True, items, args.queries, os.path.join(tmp, "tuned.db"))
+
+    print(f"{args.sessions:,} sessions, {args.queries} queries, Python {sys.version.split()[0]}, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'':40} {'inserts/s':>12} {'queries/s':>12} {'reads/s (writing)':>18} {'locked':>7}")
+    for name, r in results.items():
+        print(f"{name:40} {r['inserts_per_s']:12,.0f} {r['queries_per_s']:12,.0f} "
+              f"{r['reads_during_write_per_s']:18,.0f} {r['locked_errors']:7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Load test: latency of a light endpoint while heavy analysis requests are running.
+
+    python -m benchmarks.load_test --app main:app --heavy-concurrency 4
+
+Starts the app under uvicorn, measures GET /health alone, then again while
+clients keep POSTing a heavy request, and compares the two p99 latencies.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+
+# Heavy request: a 200k-scenario Monte Carlo stress test
+STRESS_PAYLOAD = {
+    "financial_data": {
+        "balance_sheet": {
+            "share_capital": 1000000, "reserves_surplus": 2500000, "long_term_borrowings": 3000000,
+            "short_term_borrowings": 1500000, "trade_payables": 1800000, "fixed_assets": 4500000,
+            "inventories": 1600000, "trade_receivables": 2200000, "cash_and_equivalents": 400000,
+        },
+        "profit_loss": {
+            "revenue_from_operations": 12000000, "cogs": 7800000, "employee_expenses": 1400000,
+            "other_expenses": 900000, "finance_costs": 450000, "depreciation": 350000, "tax_expense": 250000,
+        },
+        "cash_flow": {"operating_cf": 900000, "capex": 500000},
+        "annual_loan_repayment": 600000,
+    },
+    "factors": [
+        {"field": "revenue_from_operations", "distribution": "normal", "mode": "pct", "std": 15},
+        {"field": "finance_costs", "distribution": "uniform", "mode": "pct", "low": 0, "high": 40},
+    ],
+    "scenarios": 200000,
+}
+
+
+async def request(port: int, method: str, path: str, body: Optional[bytes] = None) -> Tuple[int, float]:
+    """One HTTP/1.1 request on a fresh connection: (status, seconds)."""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n"
+    if body is not None:
+        head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+    writer.write(head.encode() + b"\r\n" + (body or b""))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    status = int(response.split(b" ", 2)[1]) if response else 0
+    return status, time.perf_counter() - start
+
+
+async def light_load(port: int, path: str, rate: float, seconds: float) -> List[float]:
+    """Fire GET ``path`` at a fixed rate (open loop), returning each latency in ms."""
+    latencies: List[float] = []
+
+    async def one():
+        status, elapsed = await request(port, "GET", path)
+        if status == 200:
+            latencies.append(elapsed * 1000)
+
+    tasks = []
+    start = time.perf_counter()
+    for i in range(int(rate * seconds)):
+        await asyncio.sleep(max(0.0, start + i / rate - time.perf_counter()))
+        tasks.append(asyncio.create_task(one()))
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+async def heavy_load(port: int, path: str, body: bytes, stop: asyncio.Event, done: List[float]) -> None:
+    while not stop.is_set():
+        status, elapsed = await request(port, "POST", path, body)
+        if status != 200:
+            raise RuntimeError(f"Heavy request to {path} returned HTTP {status}")
+        done.append(elapsed)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] if ordered else float("nan")
+
+
+def summary(name: str, latencies: List[float]) -> str:
+    return (f"{name:28} n={len(latencies):5}  p50 {percentile(latencies, 50):7.1f}  "
+            f"p95 {percentile(latencies, 95):7.1f}  p99 {percentile(latencies, 99):7.1f}  "
+            f"max {max(latencies, default=float('nan')):7.1f} ms")
+
+
+async def run(args) -> int:
+    body = json.dumps(STRESS_PAYLOAD if args.heavy_body is None else json.load(open(args.heavy_body))).encode()
+
+    baseline = await light_load(args.port, args.light_path, args.rate, args.seconds)
+
+    stop = asyncio.Event()
+    heavy_done: List[float] = []
+    heavy = [asyncio.create_task(heavy_load(args.port, args.heavy_path, body, stop, heavy_done))
+             for _ in range(args.heavy_concurrency)]
+    await asyncio.sleep(args.warmup)
+    loaded = await light_load(args.port, args.light_path, args.rate, args.seconds)
+    stop.set()
+    await asyncio.gather(*heavy)
+
+    print(f"Python {sys.version.split()[0]}, {os.cpu_count()} CPUs, {args.rate:g} req/s on {args.light_path} "
+          f"for {args.seconds:g}s per phase")
+    print(summary("light alone", baseline))
+    print(summary(f"light + {args.heavy_concurrency} heavy clients", loaded))
+    if heavy_done:
+        print(f"{'heavy ' + args.heavy_path:28} n={len(heavy_done):5}  "
+              f"mean {sum(heavy_done) / len(heavy_done) * 1000:7.1f} ms")
+    ratio = percentile(loaded, 99) / percentile(baseline, 99)
+    print(f"p99 ratio (loaded / alone): {ratio:.2f} (limit {args.max_p99_ratio:g})")
+    return 0 if ratio <= args.max_p99_ratio else 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Light-endpoint latency under heavy analysis load.")
+    parser.add_argument("--app", default="main:app", help="ASGI app for uvicorn")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--light-path", default="/health")
+    parser.add_argument("--heavy-path", default="/api/stress-test")
+    parser.add_argument("--heavy-body", help="JSON file to POST instead of the built-in stress test")
+    parser.add_argument("--heavy-concurrency", type=int, default=4, help="clients looping on the heavy request")
+    parser.add_argument("--rate", type=float, default=50, help="light requests per second")
+    parser.add_argument("--seconds", type=float, default=10, help="length of each phase")
+    parser.add_argument("--warmup", type=float, default=1, help="seconds of heavy load before measuring")
+    parser.add_argument("--max-p99-ratio", type=float, default=3.0, help="fail above this p99 ratio")
+    args = parser.parse_args(argv)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", args.app, "--port", str(args.port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                if asyncio.run(request(args.port, "GET", args.light_path))[0] == 200:
+                    break
+            except OSError:
+                pass
+            if time.time() > deadline or server.poll() is not None:
+                print("error: server did not start", file=sys.stderr)
+                return 1
+            time.sleep(0.2)
+        return asyncio.run(run(args))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
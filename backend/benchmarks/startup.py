@@ -0,0 +1,115 @@
+"""
+Startup check: import-time report for the app module and a cold-start budget.
+
+    python -m benchmarks.startup                       # report, then fail if over budget
+    python -m benchmarks.startup --app main:app --runs 5 --budget 2.0 --top 20
+
+Imports the app under ``python -X importtime`` and reports the slowest
+top-level packages, failing if any of DEFERRED_IMPORTS was loaded. Then
+starts the app under uvicorn ``--runs`` times, timing process launch to the
+first successful /health, and fails (exit 1) when the median exceeds the
+budget.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+from benchmarks.load_test import request
+from utils.constants import DEFERRED_IMPORTS, STARTUP_BUDGET_S
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ImportReport(NamedTuple):
+    total_s: float
+    by_package: Dict[str, float]          # top-level package → seconds spent in its own modules
+    modules: List[str]                    # every module imported, in import order
+
+
+def import_report(module: str) -> ImportReport:
+    """Import ``module`` in a fresh interpreter under -X importtime and aggregate the log."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    by_package: Dict[str, float] = defaultdict(float)
+    modules: List[str] = []
+    total = 0.0
+    # "import time: self [us] | cumulative | imported package", indented by
+    # nesting depth; a module's line follows those of everything it imports
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if name == module:
+            total = int(cumulative_us) / 1e6
+        by_package[name.split(".")[0]] += int(self_us) / 1e6
+        modules.append(name)
+    return ImportReport(total, dict(by_package), modules)
+
+
+def cold_start(app: str, port: int, path: str, timeout: float) -> float:
+    """Seconds from launching uvicorn to the first 200 from ``path``."""
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        while True:
+            try:
+                if asyncio.run(request(port, "GET", path))[0] == 200:
+                    return time.perf_counter() - start
+            except OSError:
+                pass
+            if time.perf_counter() - start > timeout or server.poll() is not None:
+                raise RuntimeError(f"{app} did not answer {path} within {timeout:g}s")
+            time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time report and cold-start budget for the API.")
+    parser.add_argument("--app", default="main:app", help="ASGI app for uvicorn (module:attribute)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--path", default="/health", help="endpoint that marks the app as ready")
+    parser.add_argument("--runs", type=int, default=3, help="cold starts to time; the median is checked")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_S, help="seconds allowed for a cold start")
+    parser.add_argument("--top", type=int, default=15, help="packages to list in the import report")
+    args = parser.parse_args(argv)
+    module = args.app.split(":")[0]
+    failed = False
+
+    report = import_report(module)
+    print(f"Python {sys.version.split()[0]}, {os.cpu_count()} CPUs: import {module} took {report.total_s * 1000:.0f} ms "
+          f"({len(report.modules)} modules)")
+    for package, seconds in sorted(report.by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {package:24} {seconds * 1000:8.1f} ms  {seconds / report.total_s:6.1%}")
+    loaded = [name for name in DEFERRED_IMPORTS if name in report.modules]
+    if loaded:
+        print(f"error: importing {module} loads {', '.join(loaded)}; these must be imported on first use")
+        failed = True
+
+    times = [cold_start(args.app, args.port, args.path, timeout=max(30.0, args.budget * 5)) for _ in range(args.runs)]
+    median = statistics.median(times)
+    print(f"\ncold start to first {args.path}: median {median:.2f}s over {args.runs} runs "
+          f"({', '.join(f'{t:.2f}' for t in times)}), budget {args.budget:g}s")
+    if median > args.budget:
+        print(f"error: cold start exceeds the {args.budget:g}s budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
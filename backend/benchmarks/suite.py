@@ -0,0 +1,337 @@
+"""
+Benchmark suite for the analysis pipeline, with stored baselines and a regression gate.
+
+    python -m benchmarks.suite                        # run, compare with benchmarks/baseline.json
+    python -m benchmarks.suite --save-baseline        # run and record the results as the new baseline
+    python -m benchmarks.suite --only ratios,batch --tolerance 0.1 --output results.json
+
+Microbenchmarks time one function each; scenarios time a whole request or
+job end to end. Throughput is records per second in the fastest of several
+timed rounds. The gate compares each benchmark's cost relative to a fixed
+calibration workload timed alongside it, so a machine that is busier than
+when the baseline was recorded does not read as a regression. A benchmark
+regresses when it is slower than its baseline (same dataset size) by more
+than ``--tolerance`` or NOISE_SIGMAS standard errors, whichever is larger,
+and the run fails (exit 1) only if it still regresses on ``--confirm``
+re-measurements.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_storage import sample_financials
+from models.financial_data import FinancialData, FullAnalysis
+from models.financial_frame import INPUT_FIELDS
+from services.analyzer import analyze, compliance_flags
+from services.bulk import analyze_chunk
+from services.calculator import calculate_ratios
+from services.multi_year import multi_year_analysis
+from services.recommender import generate_recommendations
+from services.scorer import calculate_health_score
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+RESULTS_VERSION = 1
+# A slowdown must exceed this many standard errors of the compared medians
+# (or --tolerance, whichever is larger) to count as a regression
+NOISE_SIGMAS = 2
+
+
+class Benchmark(NamedTuple):
+    name: str
+    kind: str                                    # "micro" or "scenario"
+    description: str
+    setup: Callable[[argparse.Namespace], "Case"]
+
+
+class Case(NamedTuple):
+    run: Callable[[], object]
+    dataset_size: int                            # records processed by one call of ``run``
+
+
+# ── Benchmarks ─────────────────────────────────────────────────────
+
+def _records(args) -> List[FinancialData]:
+    return sample_financials(args.records, args.seed)
+
+
+def _cycle(items: list, fn: Callable) -> Callable[[], None]:
+    def run():
+        for item in items:
+            fn(item)
+    return run
+
+
+def _ratios(args) -> Case:
+    records = _records(args)
+    return Case(_cycle(records, calculate_ratios), len(records))
+
+
+def _score(args) -> Case:
+    records = _records(args)
+    inputs = [(calculate_ratios(r), compliance_flags(r)) for r in records]
+    return Case(_cycle(inputs, lambda item: calculate_health_score(item[0], **item[1])), len(inputs))
+
+
+def _recommendations(args) -> Case:
+    records = _records(args)
+    inputs = [(calculate_ratios(r), r) for r in records]
+    return Case(_cycle(inputs, lambda item: generate_recommendations(*item)), len(inputs))
+
+
+def _validate(args) -> Case:
+    payloads = [r.model_dump() for r in _records(args)]
+    return Case(_cycle(payloads, FinancialData.model_validate), len(payloads))
+
+
+def _single(args) -> Case:
+    records = _records(args)
+    return Case(_cycle(records, analyze), len(records))
+
+
+def _multi_year(args) -> Case:
+    years = [
+        r.model_copy(update={"company_name": "Company 0", "financial_year": f"{2015 + i}-{(16 + i) % 100:02d}"})
+        for i, r in enumerate(sample_financials(args.years, args.seed))
+    ]
+    return Case(lambda: multi_year_analysis(years), len(years))
+
+
+def _batch(args) -> Case:
+    rng = np.random.default_rng(args.seed)
+    n = args.batch_size
+    chunk = pd.DataFrame({name: rng.uniform(0, 1e6, n).round(2) for name in INPUT_FIELDS})
+    chunk["revenue_from_operations"] *= 4
+    for name in ("operating_cf", "investing_cf", "financing_cf"):
+        chunk[name] -= 5e5
+    chunk.insert(0, "company_name", [f"Company {i}" for i in range(n)])
+    chunk.insert(1, "financial_year", "2024-25")
+    return Case(lambda: analyze_chunk(chunk), n)
+
+
+def _serialize(args) -> Case:
+    analyses = [analyze(r) for r in _records(args)]
+    return Case(_cycle(analyses, FullAnalysis.model_dump_json), len(analyses))
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("ratios", "micro", "calculate_ratios, one company-year per call", _ratios),
+    Benchmark("score", "micro", "calculate_health_score from ratios and compliance flags", _score),
+    Benchmark("recommendations", "micro", "generate_recommendations from ratios", _recommendations),
+    Benchmark("validate", "micro", "FinancialData.model_validate from a dict", _validate),
+    Benchmark("single_analysis", "scenario", "analyze() for one company-year", _single),
+    Benchmark("multi_year", "scenario", "MultiYearAnalysis of one company's years", _multi_year),
+    Benchmark("batch", "scenario", "bulk analyze_chunk over a whole portfolio", _batch),
+    Benchmark("serialize", "scenario", "FullAnalysis.model_dump_json", _serialize),
+]
+
+
+# ── Running ────────────────────────────────────────────────────────
+
+def environment() -> Dict[str, object]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+    }
+
+
+def calibration_work() -> float:
+    """
+    Fixed reference workload — dict / float churn plus small numpy ops,
+    the same mix as the engines — timed next to every benchmark round so
+    results can be expressed relative to the machine's speed at that moment.
+    """
+    totals: Dict[int, float] = {}
+    for i in range(5000):
+        totals[i % 97] = totals.get(i % 97, 0.0) + i * 0.5
+    values = np.arange(5000, dtype=np.float64)
+    return sum(totals.values()) + float((np.sqrt(values) * 2 + 1).sum())
+
+
+def _timed(fn: Callable[[], object], loops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return time.perf_counter() - start
+
+
+def measure(case: Case, repeats: int, min_time: float) -> Dict[str, float]:
+    """
+    Seconds per call over ``repeats`` timed rounds of enough calls to last
+    ``min_time``. Throughput comes from the fastest round, which is the
+    least disturbed by other load on the machine; the median is kept too.
+
+    Each round is paired with a round of ``calibration_work`` run right
+    before it, and ``relative_cost`` is the median of benchmark time over
+    calibration time. A machine that is slower for a while slows both
+    halves of a pair, so the ratio moves far less between runs than raw
+    throughput does; the regression gate compares it.
+    """
+    case.run()   # warm-up: imports, caches, first-call allocation
+    calibration_work()
+    loops = 1
+    while True:
+        elapsed = _timed(case.run, loops)
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9)) + 1)
+    calibration_loops = max(1, int(loops * elapsed / max(_timed(calibration_work, 1), 1e-9) / 4))
+    rounds, ratios = [], []
+    for _ in range(repeats):
+        calibration = _timed(calibration_work, calibration_loops) / calibration_loops
+        rounds.append(_timed(case.run, loops) / loops)
+        ratios.append(rounds[-1] / calibration)
+    best, median = min(rounds), statistics.median(rounds)
+    relative = statistics.median(ratios)
+    return {
+        "seconds_per_call": best,
+        "median_seconds_per_call": median,
+        "records_per_second": case.dataset_size / best,
+        "stdev_pct": 100 * statistics.pstdev(rounds) / median if median else 0.0,
+        "relative_cost": relative,
+        "relative_stdev_pct": 100 * statistics.pstdev(ratios) / relative if relative else 0.0,
+        "calls_per_round": loops,
+        "repeats": repeats,
+    }
+
+
+def run_suite(args, selected: List[Benchmark]) -> Dict[str, object]:
+    env = environment()
+    results = {}
+    for bench in selected:
+        case = bench.setup(args)
+        result = measure(case, args.repeats, args.min_time)
+        # Environment is kept per result: a baseline may merge runs made at different times
+        results[bench.name] = {
+            "kind": bench.kind,
+            "dataset_size": case.dataset_size,
+            **result,
+            "python": env["python"],
+            "cpu_count": env["cpu_count"],
+        }
+        print(f"{bench.name:18} {bench.kind:9} n={case.dataset_size:<7,} "
+              f"{result['records_per_second']:14,.0f} rec/s  ±{result['stdev_pct']:4.1f}%  ({bench.description})")
+    return {"version": RESULTS_VERSION, "environment": env, "results": results}
+
+
+def _speedup(result: Dict[str, float], base: Dict[str, float]) -> float:
+    """Throughput change against the baseline (negative: slower), on relative cost when both runs have it."""
+    if "relative_cost" in result and "relative_cost" in base:
+        return base["relative_cost"] / result["relative_cost"] - 1
+    return base["median_seconds_per_call"] / result["median_seconds_per_call"] - 1
+
+
+def _threshold(result: Dict[str, float], base: Dict[str, float], tolerance: float) -> float:
+    """``tolerance``, widened to NOISE_SIGMAS standard errors of the two medians when the runs were noisier."""
+    key = "relative_stdev_pct" if "relative_cost" in result and "relative_cost" in base else "stdev_pct"
+    spread = (result[key] ** 2 + base[key] ** 2) ** 0.5 / 100
+    # standard error of a median ≈ 1.25 σ / √n
+    return max(tolerance, NOISE_SIGMAS * 1.25 * spread / min(result["repeats"], base["repeats"]) ** 0.5)
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """Names of benchmarks slower than baseline by more than their threshold, with a report printed."""
+    regressions = []
+    base_env, env = baseline.get("environment", {}), current["environment"]
+    changed = [k for k in ("python", "cpu_count", "machine") if base_env.get(k) != env.get(k)]
+    if changed:
+        print("note: baseline was recorded on a different environment ("
+              + ", ".join(f"{k} {base_env.get(k)} → {env.get(k)}" for k in changed) + ")")
+    print(f"\n{'':18} {'baseline rec/s':>15} {'now rec/s':>14} {'change':>8} {'allowed':>8}")
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:18} {'—':>15} {result['records_per_second']:14,.0f}   (new)")
+            continue
+        if base["dataset_size"] != result["dataset_size"]:
+            print(f"{name:18} skipped: baseline dataset size {base['dataset_size']:,}, "
+                  f"this run {result['dataset_size']:,}")
+            continue
+        change, allowed = _speedup(result, base), _threshold(result, base, tolerance)
+        flag = "  REGRESSION" if change < -allowed else ""
+        print(f"{name:18} {base['records_per_second']:15,.0f} {result['records_per_second']:14,.0f} "
+              f"{change:+8.1%} {-allowed:+8.1%}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline against a stored baseline.")
+    parser.add_argument("--only", help="comma-separated benchmark names (default: all)")
+    parser.add_argument("--kind", choices=("micro", "scenario"), help="run only one kind")
+    parser.add_argument("--records", type=int, default=200, help="company-years per call for per-record benchmarks")
+    parser.add_argument("--years", type=int, default=10, help="years in the multi-year scenario")
+    parser.add_argument("--batch-size", type=int, default=100000, help="companies in the batch scenario")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=7, help="timed rounds per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per round")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare with or save to")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed throughput drop before a benchmark counts as a regression "
+                             "(widened automatically for noisy benchmarks)")
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="re-measure a regressed benchmark this many times; it fails only if every run regresses")
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    args = parser.parse_args(argv)
+
+    selected = BENCHMARKS
+    if args.only:
+        names = set(args.only.split(","))
+        unknown = names - {b.name for b in BENCHMARKS}
+        if unknown:
+            parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+        selected = [b for b in selected if b.name in names]
+    if args.kind:
+        selected = [b for b in selected if b.kind == args.kind]
+
+    env = environment()
+    print(f"Python {env['python']} ({env['implementation']}), {env['cpu_count']} CPUs, numpy {env['numpy']}")
+    current = run_suite(args, selected)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+    if args.save_baseline:
+        baseline = {"version": RESULTS_VERSION, "environment": current["environment"], "results": {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline["results"] = json.load(f).get("results", {})
+        baseline["results"].update(current["results"])
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(current, baseline, args.tolerance)
+    for attempt in range(args.confirm):
+        if not regressions:
+            break
+        print(f"\nre-measuring {', '.join(regressions)} ({attempt + 1}/{args.confirm})")
+        rerun = run_suite(args, [b for b in selected if b.name in regressions])
+        regressions = [name for name in compare(rerun, baseline, args.tolerance) if name in regressions]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed beyond their allowed drop: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Command-line bulk analysis of a CSV / Parquet / JSON-lines portfolio file.
+
+    python bulk_analyze.py portfolio.csv results.csv --workers 4
+    python bulk_analyze.py portfolio.csv results.csv --ratio-store ratio_store
+"""
+import argparse
+import sys
+
+from services.bulk import run_bulk
+from utils.constants import BULK_CHUNK_SIZE
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Score every company-year in a file with the health-score engine.",
+    )
+    parser.add_argument("input", help="input .csv, .parquet or .jsonl — one company-year per row")
+    parser.add_argument("output", help="output .csv, .parquet or .jsonl")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE, help="rows per chunk")
+    parser.add_argument("--workers", type=int, default=1, help="processes to analyse chunks on")
+    parser.add_argument("--ratio-store", metavar="DIR",
+                        help="also append ratios and scores to the ratio store in DIR, for /api/screen")
+    parser.add_argument("--quiet", action="store_true", help="no per-chunk progress")
+    args = parser.parse_args(argv)
+
+    def progress(rows: int, elapsed: float) -> None:
+        rate = rows / elapsed if elapsed > 0 else 0
+        print(f"\r{rows:,} rows  {rate:,.0f} rows/s", end="", file=sys.stderr, flush=True)
+
+    try:
+        stats = run_bulk(
+            args.input,
+            args.output,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            progress=None if args.quiet else progress,
+            ratio_store=args.ratio_store,
+        )
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(
+        f"{stats['rows']:,} rows in {stats['chunks']} chunks, {stats['seconds']}s "
+        f"({stats['rows_per_second']:,.0f} rows/s) → {args.output}",
+        file=sys.stderr,
+    )
+    if args.ratio_store is not None:
+        print(f"ratio store {args.ratio_store}: {stats['store_rows']:,} rows", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,31 @@
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 
-from models.database import create_tables
-from routers import upload, calculate, compare
+from models.database import create_tables, dispose_async_engine
+from services import metrics, profiler
+from services.executor import shutdown_pools
+from services.preload import start_preload
+from routers import calculate, calculate_stream, sensitivity, stress_test, goal_seek, multi_year, excel_import, pdf_import, screen
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: create_tables takes milliseconds and must finish before any
+    # request; the lazily imported parsers and the screening index are
+    # built in the background
     create_tables()
     os.makedirs("uploads", exist_ok=True)
+    start_preload()
+    screen.portfolio.watch()
     yield
-    # Shutdown (nothing to do)
+    # Shutdown
+    screen.portfolio.stop()
+    shutdown_pools()
+    await dispose_async_engine()
 
 
 app = FastAPI(
@@ -22,6 +33,7 @@ app = FastAPI(
     description="Indian Company Financial Health Analysis API — Ind AS / Companies Act 2013",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=metrics.InstrumentedJSONResponse,
 )
 
 app.add_middleware(
@@ -31,10 +43,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
 
-app.include_router(upload.router, prefix="/api/upload", tags=["Upload"])
 app.include_router(calculate.router, prefix="/api/calculate", tags=["Calculate"])
-app.include_router(compare.router, prefix="/api/compare", tags=["Compare"])
+app.include_router(calculate_stream.router, prefix="/api/calculate", tags=["Calculate"])
+app.include_router(sensitivity.router, prefix="/api/sensitivity", tags=["Sensitivity"])
+app.include_router(stress_test.router, prefix="/api/stress-test", tags=["Stress Test"])
+app.include_router(goal_seek.router, prefix="/api/goal-seek", tags=["Goal Seek"])
+app.include_router(multi_year.router, prefix="/api/multi-year", tags=["Multi-Year"])
+app.include_router(excel_import.router, prefix="/api/excel", tags=["Excel Import"])
+app.include_router(pdf_import.router, prefix="/api/pdf", tags=["PDF Import"])
+app.include_router(screen.router, prefix="/api/screen", tags=["Screening"])
 
 
 @app.get("/")
@@ -49,3 +68,24 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics_endpoint():
+    """Stage and request latency histograms in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/profiles", include_in_schema=False)
+async def list_profiles():
+    """Recent request profiles (send the X-Profile header with REQUEST_PROFILING=1 to record one)."""
+    return {"enabled": profiler.PROFILING_ENABLED, "profiles": profiler.recent()}
+
+
+@app.get("/metrics/profiles/{profile_id}", response_class=PlainTextResponse, include_in_schema=False)
+async def get_profile(profile_id: str):
+    """One profile as collapsed stacks, ready for flamegraph.pl or speedscope."""
+    session = profiler.get(profile_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(session.collapsed())
@@ -0,0 +1,43 @@
+"""
+Backfill the normalized analysis tables from existing JSON session blobs.
+
+    python migrate_normalized.py --chunk-size 500
+"""
+import argparse
+import sys
+
+from models.database import SessionLocal, create_tables
+from services.portfolio_store import backfill_normalized
+from utils.constants import NORMALIZED_BACKFILL_CHUNK_SIZE
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Copy inputs, ratios, scores and rule codes out of analysis_sessions blobs into indexed tables.",
+    )
+    parser.add_argument("--chunk-size", type=int, default=NORMALIZED_BACKFILL_CHUNK_SIZE,
+                        help="sessions per transaction")
+    parser.add_argument("--quiet", action="store_true", help="no per-chunk progress")
+    args = parser.parse_args(argv)
+
+    def progress(migrated: int, skipped: int) -> None:
+        print(f"\r{migrated:,} migrated  {skipped:,} skipped", end="", file=sys.stderr, flush=True)
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        stats = backfill_normalized(db, args.chunk_size, None if args.quiet else progress)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"{stats['migrated']:,} sessions migrated, {stats['skipped']:,} skipped (unreadable blobs)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
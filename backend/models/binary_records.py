@@ -0,0 +1,266 @@
+"""
+Compact binary records for FinancialData, FinancialRatios and HealthScoreBreakdown.
+Fixed layout per schema: header, presence bitmap, packed float64 fields, fixed-width text.
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+from pydantic import BaseModel
+
+from models.financial_data import DebtorAgeingBucket, FinancialData, FinancialRatios, HealthScoreBreakdown
+from models.financial_frame import (
+    BALANCE_SHEET_FIELDS, CASH_FLOW_FIELDS, COMPANY_FIELDS, PROFIT_LOSS_FIELDS, FinancialFrame,
+)
+from utils.constants import HEALTH_ZONES
+
+# Record layout (little-endian, every section 8-byte aligned):
+#   schema_id   uint16   — identifies model and layout version; a changed layout gets a new id
+#   field_count uint16
+#   reserved    uint32
+#   present     ceil(fields / 8) bytes, padded to 8 — bit i set ⇔ field i is not None
+#   values      float64 × fields — NaN where the field is None (a NaN value keeps its bit set)
+#   text        fixed-width UTF-8, NUL-padded (FinancialData only)
+COMPANY_NAME_BYTES = 128
+FINANCIAL_YEAR_BYTES = 16
+
+_ZONE_INDEX = {zone[2]: i for i, zone in enumerate(HEALTH_ZONES)}
+
+
+class RecordSchema(NamedTuple):
+    schema_id: int
+    model: Type[BaseModel]
+    fields: List[str]
+    text: List[Tuple[str, int]]     # (field, bytes)
+
+    @property
+    def dtype(self) -> np.dtype:
+        bitmap = -(-len(self.fields) // 64) * 8
+        return np.dtype(
+            [("schema_id", "<u2"), ("field_count", "<u2"), ("reserved", "<u4"),
+             ("present", "u1", (bitmap,)), ("values", "<f8", (len(self.fields),))]
+            + [(name, f"S{size}") for name, size in self.text]
+        )
+
+
+# Field layouts are spelled out rather than read from the models, so a model
+# change cannot silently re-lay an existing schema id: a new or reordered
+# field needs a new id (and tests/test_binary_records.py says so).
+FINANCIAL_DATA_SCHEMA = RecordSchema(
+    1, FinancialData,
+    [
+        # balance sheet
+        "fixed_assets", "capital_wip", "long_term_investments", "deferred_tax_asset", "long_term_loans_advances",
+        "other_non_current_assets", "inventories", "trade_receivables", "cash_and_equivalents",
+        "short_term_loans_advances", "gst_itc_receivable", "tds_advance_tax_receivable", "other_current_assets",
+        "share_capital", "reserves_surplus", "money_received_share_warrants", "long_term_borrowings",
+        "deferred_tax_liability", "long_term_provisions", "short_term_borrowings", "trade_payables", "gst_payable",
+        "tds_payable", "pf_esi_payable", "advance_from_customers", "other_current_liabilities",
+        # profit and loss
+        "revenue_from_operations", "other_income", "cogs", "employee_expenses", "finance_costs", "depreciation",
+        "other_expenses", "tax_expense",
+        # cash flow
+        "operating_cf", "investing_cf", "financing_cf", "capex",
+        # company level, then the optional headcount and debtor ageing
+        "promoter_loans", "msme_payables", "msme_receivables", "annual_loan_repayment",
+        "headcount", "ageing_zero_to_30", "ageing_thirty_to_60", "ageing_sixty_to_90", "ageing_ninety_to_180",
+        "ageing_above_180",
+    ],
+    [("company_name", COMPANY_NAME_BYTES), ("financial_year", FINANCIAL_YEAR_BYTES)],
+)
+FINANCIAL_RATIOS_SCHEMA = RecordSchema(
+    2, FinancialRatios,
+    [
+        "gross_margin", "net_margin", "ebitda_margin", "ebit_margin", "roe", "roa", "roce", "eps",
+        "current_ratio", "quick_ratio", "cash_ratio", "working_capital",
+        "debt_to_equity", "debt_ratio", "interest_coverage", "dscr", "net_debt", "net_debt_to_ebitda", "total_debt",
+        "dso", "dpo", "dio", "ccc", "asset_turnover", "inventory_turnover", "fixed_asset_turnover",
+        "capital_productivity", "ocf_margin", "fcf", "cf_to_debt", "cash_conversion_ratio", "capex_intensity",
+    ],
+    [],
+)
+# zone / zone_color are stored as one index into HEALTH_ZONES
+HEALTH_SCORE_SCHEMA = RecordSchema(
+    3, HealthScoreBreakdown,
+    ["overall", "liquidity", "profitability", "leverage", "efficiency", "cash_flow", "compliance", "zone_index"],
+    [],
+)
+
+SCHEMAS: Dict[int, RecordSchema] = {
+    schema.schema_id: schema for schema in (FINANCIAL_DATA_SCHEMA, FINANCIAL_RATIOS_SCHEMA, HEALTH_SCORE_SCHEMA)
+}
+_MODEL_SCHEMAS = {schema.model: schema for schema in SCHEMAS.values()}
+
+Record = Union[FinancialData, FinancialRatios, HealthScoreBreakdown]
+
+
+def schema_for(model: Union[Type[BaseModel], BaseModel]) -> RecordSchema:
+    cls = model if isinstance(model, type) else type(model)
+    if cls not in _MODEL_SCHEMAS:
+        raise ValueError(f"No binary schema for {cls.__name__}")
+    return _MODEL_SCHEMAS[cls]
+
+
+# ── Model ↔ value rows ─────────────────────────────────────────────
+
+def _values(schema: RecordSchema, records: Sequence[Record]) -> np.ndarray:
+    """(records × fields) float64 block, NaN for None."""
+    if schema is FINANCIAL_DATA_SCHEMA:
+        frame = FinancialFrame.from_records(records)
+        return np.stack([frame[name] for name in schema.fields], axis=1)
+    if schema is HEALTH_SCORE_SCHEMA:
+        rows = [[getattr(r, f) for f in schema.fields[:-1]] + [_ZONE_INDEX[r.zone]] for r in records]
+    else:
+        rows = [[getattr(r, f) for f in schema.fields] for r in records]
+    return np.array(rows, dtype=np.float64).reshape(len(records), len(schema.fields))
+
+
+def _text(value: str, size: int, name: str) -> bytes:
+    encoded = value.encode("utf-8")
+    if len(encoded) > size:
+        raise ValueError(f"{name} is longer than {size} bytes and cannot be stored in a binary record")
+    return encoded
+
+
+def _present(schema: RecordSchema, records: Sequence[Record]) -> np.ndarray:
+    """(records × fields) mask of the fields that are not None."""
+    mask = np.ones((len(records), len(schema.fields)), dtype=bool)
+    if schema is FINANCIAL_DATA_SCHEMA:
+        mask[:, _HEADCOUNT] = [r.headcount is not None for r in records]
+        mask[:, [i for _, i in _AGEING]] = np.array([r.debtor_ageing is not None for r in records])[:, None]
+    elif schema is FINANCIAL_RATIOS_SCHEMA:
+        mask[:] = [[getattr(r, f) is not None for f in schema.fields] for r in records]
+    return mask
+
+
+def _unpack(bits: np.ndarray, schema: RecordSchema) -> np.ndarray:
+    return np.unpackbits(bits, axis=1, count=len(schema.fields), bitorder="little").astype(bool)
+
+
+def _models(schema: RecordSchema, table: np.ndarray) -> List[Record]:
+    """Rebuild models from decoded rows, validating plain dicts (faster in pydantic-core than model_construct)."""
+    absent = ~_unpack(table["present"], schema)
+    if absent.any():
+        rows = table["values"].astype(object)
+        rows[absent] = None
+        rows = rows.tolist()
+    else:
+        rows = table["values"].tolist()
+    if schema is FINANCIAL_DATA_SCHEMA:
+        names = [v.decode("utf-8") for v in table["company_name"].tolist()]
+        years = [v.decode("utf-8") for v in table["financial_year"].tolist()]
+        return [_financial_data(row, name, year) for row, name, year in zip(rows, names, years)]
+    validate = schema.model.model_validate
+    if schema is HEALTH_SCORE_SCHEMA:
+        out = []
+        for row in rows:
+            zone = HEALTH_ZONES[int(row[-1])]
+            values = dict(zip(schema.fields[:-1], row))
+            values["zone"], values["zone_color"] = zone[2], zone[3]
+            out.append(validate(values))
+        return out
+    return [validate(dict(zip(schema.fields, row))) for row in rows]
+
+
+# Layout positions of each part of a FinancialData, matched by field name
+_PARTS = {
+    part: [(name, FINANCIAL_DATA_SCHEMA.fields.index(name)) for name in fields]
+    for part, fields in (("balance_sheet", BALANCE_SHEET_FIELDS), ("profit_loss", PROFIT_LOSS_FIELDS),
+                         ("cash_flow", CASH_FLOW_FIELDS), (None, COMPANY_FIELDS))
+}
+_HEADCOUNT = FINANCIAL_DATA_SCHEMA.fields.index("headcount")
+_AGEING = [(name, FINANCIAL_DATA_SCHEMA.fields.index("ageing_" + name)) for name in DebtorAgeingBucket.model_fields]
+
+
+def _financial_data(row: List[float], name: str, year: str) -> FinancialData:
+    values = {field: row[i] for field, i in _PARTS[None]}
+    for part in ("balance_sheet", "profit_loss", "cash_flow"):
+        values[part] = {field: row[i] for field, i in _PARTS[part]}
+    headcount, ageing = row[_HEADCOUNT], {field: row[i] for field, i in _AGEING}
+    values.update(
+        company_name=name,
+        financial_year=year,
+        headcount=None if headcount is None else int(headcount),
+        debtor_ageing=None if None in ageing.values() else ageing,
+    )
+    return FinancialData.model_validate(values)
+
+
+# ── Encoding ───────────────────────────────────────────────────────
+
+def encode_many(records: Sequence[Record]) -> bytes:
+    """Pack same-typed records back to back into one buffer."""
+    if not records:
+        return b""
+    schema = schema_for(records[0])
+    if any(type(r) is not schema.model for r in records):
+        raise ValueError("All records in one buffer must be of the same model")
+    values = _values(schema, records)
+    table = np.zeros(len(records), dtype=schema.dtype)
+    table["schema_id"] = schema.schema_id
+    table["field_count"] = len(schema.fields)
+    table["values"] = values
+    present = np.packbits(_present(schema, records), axis=1, bitorder="little")
+    table["present"][:, :present.shape[1]] = present
+    for name, size in schema.text:
+        table[name] = [_text(getattr(r, name), size, name) for r in records]
+    return table.tobytes()
+
+
+def encode(record: Record) -> bytes:
+    return encode_many([record])
+
+
+# ── Decoding ───────────────────────────────────────────────────────
+
+def read_schema(buffer) -> RecordSchema:
+    """Schema of a buffer, from the id in its first record header."""
+    header = np.frombuffer(buffer, dtype="<u2", count=2)
+    schema = SCHEMAS.get(int(header[0]))
+    if schema is None:
+        raise ValueError(f"Unknown binary schema id {int(header[0])}")
+    if int(header[1]) != len(schema.fields):
+        raise ValueError(f"Schema {schema.schema_id} expects {len(schema.fields)} fields, record has {int(header[1])}")
+    return schema
+
+
+def view(buffer, schema: Optional[RecordSchema] = None) -> np.ndarray:
+    """
+    Zero-copy structured array over a buffer of records (bytes, memoryview,
+    mmap, ...). Nothing is parsed: fields are read in place when accessed.
+    """
+    schema = schema or read_schema(buffer)
+    itemsize = schema.dtype.itemsize
+    if len(memoryview(buffer).cast("B")) % itemsize:
+        raise ValueError(f"Buffer length is not a multiple of the {itemsize}-byte record size")
+    table = np.frombuffer(buffer, dtype=schema.dtype)
+    if len(table) and np.any(table["schema_id"] != schema.schema_id):
+        raise ValueError("Buffer mixes records of different schemas")
+    return table
+
+
+def columns(buffer, schema: Optional[RecordSchema] = None) -> Dict[str, np.ndarray]:
+    """Field name → strided float64 view into the buffer (NaN where None), for the batch engines."""
+    schema = schema or read_schema(buffer)
+    values = view(buffer, schema)["values"]
+    return {name: values[:, i] for i, name in enumerate(schema.fields)}
+
+
+def present(buffer, schema: Optional[RecordSchema] = None) -> np.ndarray:
+    """(records × fields) boolean presence mask, unpacked from the bitmaps."""
+    schema = schema or read_schema(buffer)
+    return _unpack(view(buffer, schema)["present"], schema)
+
+
+def decode_many(buffer) -> List[Record]:
+    """Every record in a buffer, as the pydantic models they were encoded from."""
+    if not len(memoryview(buffer)):
+        return []
+    schema = read_schema(buffer)
+    return _models(schema, view(buffer, schema))
+
+
+def decode(buffer) -> Record:
+    records = decode_many(buffer)
+    if len(records) != 1:
+        raise ValueError(f"Expected one record, buffer holds {len(records)}")
+    return records[0]
@@ -1,13 +1,85 @@
 import os
-from sqlalchemy import create_engine, Column, String, Text, DateTime
+from sqlalchemy import create_engine, event, Column, String, Text, DateTime, Float, Integer, ForeignKey, Index
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 from datetime import datetime
+from typing import AsyncIterator, List, NamedTuple, Optional
+
+from models.financial_data import FinancialRatios, HealthScoreBreakdown
+from models.financial_frame import INPUT_FIELDS
+from utils import constants
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'financial_data.db')}"
+DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{os.path.join(BASE_DIR, 'financial_data.db')}")
+
+
+# ── Engine ─────────────────────────────────────────────────────────
+
+class SQLiteSettings(NamedTuple):
+    journal_mode: str = constants.SQLITE_JOURNAL_MODE     # WAL / DELETE / TRUNCATE / MEMORY / OFF
+    synchronous: str = constants.SQLITE_SYNCHRONOUS       # OFF / NORMAL / FULL / EXTRA
+    cache_size_kib: int = constants.SQLITE_CACHE_SIZE_KIB
+    mmap_size: int = constants.SQLITE_MMAP_SIZE
+    busy_timeout_ms: int = constants.SQLITE_BUSY_TIMEOUT_MS
+    pool_size: int = constants.SQLITE_POOL_SIZE
+    max_overflow: int = constants.SQLITE_MAX_OVERFLOW
+
+    @classmethod
+    def from_env(cls) -> "SQLiteSettings":
+        """Defaults, overridden by SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_CACHE_SIZE_KIB, ..."""
+        overrides = {}
+        for name, default in cls._field_defaults.items():
+            value = os.getenv(f"SQLITE_{name.upper()}")
+            if value is not None:
+                overrides[name] = type(default)(value)
+        return cls(**overrides)
+
+    def pragmas(self) -> List[str]:
+        return [
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA cache_size=-{int(self.cache_size_kib)}",   # negative → KiB rather than pages
+            f"PRAGMA mmap_size={int(self.mmap_size)}",
+            f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}",
+            "PRAGMA foreign_keys=ON",
+        ]
+
+
+def make_engine(url: str = DATABASE_URL, settings: Optional[SQLiteSettings] = None) -> Engine:
+    """
+    Engine with the settings applied as PRAGMAs on every new connection.
+
+    File databases get a QueuePool of long-lived connections shared across
+    threads; an in-memory database uses a single static connection.
+    """
+    if not url.startswith("sqlite"):
+        return create_engine(url, pool_pre_ping=True)
+    settings = settings or SQLiteSettings.from_env()
+    in_memory = url in ("sqlite://", "sqlite:///:memory:")
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool if in_memory else QueuePool,
+        **({} if in_memory else {"pool_size": settings.pool_size, "max_overflow": settings.max_overflow}),
+    )
+
+    _install_pragmas(engine, settings)
+    return engine
+
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+def _install_pragmas(engine: Engine, settings: SQLiteSettings) -> None:
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in settings.pragmas():
+            cursor.execute(pragma)
+        cursor.close()
+
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -24,6 +96,98 @@ class AnalysisSession(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+# ── Normalized analysis tables ─────────────────────────────────────
+# One row per session in each wide table, with company / year repeated so
+# portfolio filters are answered from a single indexed table.
+
+RATIO_FIELDS = list(FinancialRatios.model_fields)
+SCORE_FIELDS = [f for f in HealthScoreBreakdown.model_fields if f not in ("zone", "zone_color")]
+
+# Ratios screened on across the portfolio; each gets a (financial_year, ratio) index
+INDEXED_RATIOS = ["dscr", "debt_to_equity", "current_ratio", "interest_coverage", "ccc", "net_margin", "roce"]
+
+
+def _session_table(class_name: str, tablename: str, fields, indexed=(), **extra):
+    """Declarative model with a session key, company / year columns and one Float column per field."""
+    attrs = {
+        "__tablename__": tablename,
+        "session_id": Column(String, ForeignKey("analysis_sessions.id", ondelete="CASCADE"), primary_key=True),
+        "company_name": Column(String, nullable=True),
+        "financial_year": Column(String, nullable=True),
+        "__table_args__": (
+            Index(f"ix_{tablename}_company_year", "company_name", "financial_year"),
+            *(Index(f"ix_{tablename}_year_{name}", "financial_year", name) for name in indexed),
+        ),
+    }
+    attrs.update({name: Column(Float, nullable=True) for name in fields})
+    attrs.update(extra)
+    return type(class_name, (Base,), attrs)
+
+
+SessionFinancials = _session_table("SessionFinancials", "session_financials", INPUT_FIELDS)
+SessionRatios = _session_table("SessionRatios", "session_ratios", RATIO_FIELDS, INDEXED_RATIOS)
+SessionScores = _session_table(
+    "SessionScores", "session_scores", SCORE_FIELDS, ["overall"],
+    zone=Column(String, nullable=True, index=True),
+)
+
+
+class SessionRecommendation(Base):
+    __tablename__ = "session_recommendations"
+    __table_args__ = (
+        Index("ix_session_recommendations_code_year", "code", "financial_year"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(String, ForeignKey("analysis_sessions.id", ondelete="CASCADE"), index=True)
+    company_name = Column(String, nullable=True)
+    financial_year = Column(String, nullable=True)
+    code = Column(String, nullable=False)
+    priority = Column(String, nullable=False)
+
+
+NORMALIZED_TABLES = [SessionFinancials, SessionRatios, SessionScores, SessionRecommendation]
+
+
+# ── Async access ───────────────────────────────────────────────────
+# Same database through the aiosqlite driver, for async routes; created on
+# first use so the synchronous tools never need the driver installed.
+
+_async_engine: Optional[AsyncEngine] = None
+_async_sessions: Optional[async_sessionmaker] = None
+
+
+def async_url(url: str) -> str:
+    return url.replace("sqlite://", "sqlite+aiosqlite://", 1) if url.startswith("sqlite://") else url
+
+
+def get_async_engine(url: str = DATABASE_URL, settings: Optional[SQLiteSettings] = None) -> AsyncEngine:
+    global _async_engine, _async_sessions
+    if _async_engine is None:
+        settings = settings or SQLiteSettings.from_env()
+        pooled = {"poolclass": AsyncAdaptedQueuePool, "pool_size": settings.pool_size,
+                  "max_overflow": settings.max_overflow}
+        in_memory = url in ("sqlite://", "sqlite:///:memory:")
+        _async_engine = create_async_engine(async_url(url), **({"poolclass": StaticPool} if in_memory else pooled))
+        if url.startswith("sqlite"):
+            _install_pragmas(_async_engine.sync_engine, settings)
+        _async_sessions = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_engine
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    get_async_engine()
+    async with _async_sessions() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_sessions
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_sessions = None
+
+
 def create_tables():
     Base.metadata.create_all(bind=engine)
 
@@ -34,3 +198,4 @@ def get_db():
         yield db
     finally:
         db.close()
+
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 
+from utils.constants import SCREEN_MAX_RESULTS, SCREEN_MAX_YEARS, SENSITIVITY_MAX_POINTS
+
 
 class BalanceSheet(BaseModel):
     # Non-Current Assets
@@ -240,6 +242,12 @@ class FullAnalysis(BaseModel):
     session_id: Optional[str] = None
 
 
+class AnalysisRequest(BaseModel):
+    financial_data: FinancialData
+    previous_year_data: Optional[FinancialData] = None
+    session_id: Optional[str] = None    # session to store the analysis under; a new one when omitted
+
+
 class UploadResponse(BaseModel):
     session_id: str
     detected_type: str
@@ -256,3 +264,173 @@ class MultiYearAnalysis(BaseModel):
     improvements: List[str] = []
     deteriorations: List[str] = []
     root_cause_analysis: List[str] = []
+
+
+class MultiYearRequest(BaseModel):
+    years: List[FinancialData]   # one company, oldest year first
+
+
+class AnalysisDelta(BaseModel):
+    changed_fields: List[str]
+    ratios: Dict[str, Optional[float]] = {}        # only ratios whose value changed
+    changed_categories: List[str] = []
+    health_score: Optional[HealthScoreBreakdown] = None   # set when any score changed
+    fired_rules: List[str] = []                    # rule codes that started firing
+    cleared_rules: List[str] = []                  # rule codes that stopped firing
+    recommendations: Optional[List[Recommendation]] = None   # full list, when it changed
+    recomputed_nodes: List[str] = []
+
+
+class AnalysisEdit(BaseModel):
+    # New values keyed by flat input field name ("prev_<field>" for the prior year)
+    changes: Dict[str, float]
+    # Prior-year inputs, needed only to reopen a session with a prior year that has left memory
+    previous_year_data: Optional[FinancialData] = None
+
+
+class SensitivityAxis(BaseModel):
+    # An input field name, or one of the day levers "dso" / "dpo" / "dio"
+    # (which move trade_receivables / trade_payables / inventories)
+    field: str
+    mode: str = "add"  # "set", "add" (absolute change), "pct" (% change) or "scale" (multiplier)
+    values: Optional[List[float]] = Field(None, max_length=SENSITIVITY_MAX_POINTS)
+    start: float = 0
+    stop: float = 0
+    steps: int = Field(11, ge=1, le=SENSITIVITY_MAX_POINTS)
+
+
+class SensitivityRequest(BaseModel):
+    financial_data: FinancialData
+    previous_year_data: Optional[FinancialData] = None
+    axes: List[SensitivityAxis]
+
+
+class SensitivityResult(BaseModel):
+    axes: List[str]
+    axis_values: List[List[float]]
+    base_score: HealthScoreBreakdown
+    # One entry per grid point; nested [axis 0][axis 1] for two-axis sweeps
+    overall: List[Any]
+    zone: List[Any]
+
+
+class StressFactor(BaseModel):
+    # An input field name, or one of the day levers "dso" / "dpo" / "dio"
+    field: str
+    distribution: str = "normal"  # "normal", "lognormal", "uniform" or "triangular"
+    mode: Optional[str] = None  # "set", "add", "pct" or "scale"; default "scale" for lognormal, else "pct"
+    mean: float = 0    # normal; for lognormal, mean of the underlying normal
+    std: float = 0     # normal / lognormal sigma
+    low: float = 0     # uniform / triangular
+    high: float = 0    # uniform / triangular
+    mode_value: float = 0  # triangular peak
+
+
+class StressTestRequest(BaseModel):
+    financial_data: FinancialData
+    previous_year_data: Optional[FinancialData] = None
+    factors: List[StressFactor]
+    scenarios: int = 10000
+    seed: int = 0
+
+
+class StressTestResult(BaseModel):
+    scenarios: int
+    seed: int
+    base_score: HealthScoreBreakdown
+    overall_mean: float
+    overall_std: float
+    overall_percentiles: Dict[str, float]   # "p1" … "p99"
+    overall_histogram: List[int]            # counts per 5-point bucket, 0–100
+    zone_probabilities: Dict[str, float]
+    dscr_below_npa_probability: float       # P(DSCR < NPA_RISK standard minimum)
+
+
+class GoalSeekRequest(BaseModel):
+    financial_data: FinancialData
+    previous_year_data: Optional[FinancialData] = None
+    target_score: Optional[float] = None
+    target_zone: Optional[str] = None      # e.g. "Good" — used when target_score is not given
+    levers: Optional[List[str]] = None     # defaults to every goal-seek lever
+    weights: Dict[str, float] = {}         # cost per % change of each lever, default 1
+    max_change_pct: Optional[float] = None
+
+
+class LeverChange(BaseModel):
+    field: str
+    base_value: float
+    new_value: float
+    change_pct: float
+    cost: float
+
+
+class GoalSeekResult(BaseModel):
+    target_score: float
+    achieved: bool
+    base_score: HealthScoreBreakdown
+    final_score: HealthScoreBreakdown
+    changes: List[LeverChange]
+    total_cost: float
+    iterations: int
+    adjusted_data: FinancialData
+
+
+class ExcelExtraction(BaseModel):
+    financial_data: FinancialData
+    previous_year_data: Optional[FinancialData] = None
+    matched_fields: Dict[str, str] = {}     # field → "Sheet!row"
+    missing_fields: List[str] = []          # balance-sheet / P&L fields not found
+    layout_cached: bool = False             # read via a remembered template layout
+    rows_scanned: int = 0
+    elapsed_ms: float = 0
+
+
+class PdfPage(BaseModel):
+    page: int                               # 1-based
+    statement: Optional[str] = None         # balance_sheet / profit_loss / cash_flow
+    score: int = 0
+    rows: int = 0
+    cached: bool = False                    # rows came from the page-table cache
+    extract_ms: float = 0
+
+
+class PdfExtraction(BaseModel):
+    financial_data: FinancialData
+    previous_year_data: Optional[FinancialData] = None
+    matched_fields: Dict[str, str] = {}     # field → "page N"
+    missing_fields: List[str] = []          # balance-sheet / P&L fields not found
+    page_count: int = 0
+    statement_pages: List[PdfPage] = []     # pages that were table-extracted
+    scan_ms: float = 0                      # scoring every page's text
+    elapsed_ms: float = 0
+
+
+class ScreenCondition(BaseModel):
+    metric: str                             # ratio name, or "score_overall" / "score_<category>"
+    op: str                                 # ">", ">=", "<", "<=", "between", "rising", "falling"
+    value: Optional[float] = None           # threshold for comparisons
+    low: Optional[float] = None             # "between": low <= value < high
+    high: Optional[float] = None
+    years: int = Field(1, ge=1, le=SCREEN_MAX_YEARS)   # must hold for this many consecutive years
+
+
+class ScreenRequest(BaseModel):
+    preset: Optional[str] = None            # named screen, e.g. "ibc_leverage"
+    conditions: List[ScreenCondition] = []
+    combine: str = "all"                    # "all" / "any"
+    financial_year: Optional[str] = None    # only rows of this year
+    latest_only: bool = True                # one match per company: its latest matching year
+    limit: Optional[int] = Field(None, ge=0, le=SCREEN_MAX_RESULTS)
+
+
+class ScreenMatch(BaseModel):
+    company_name: str
+    financial_year: str
+    values: Dict[str, List[Optional[float]]]   # metric → values over its window, oldest first
+
+
+class ScreenResult(BaseModel):
+    rows_scanned: int
+    total_matches: int
+    matches: List[ScreenMatch]
+    elapsed_ms: float
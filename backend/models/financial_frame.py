@@ -0,0 +1,262 @@
+"""
+Columnar (struct-of-arrays) container for many company-years.
+One contiguous float64 row per field, derived totals computed once.
+"""
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from models.financial_data import (
+    BalanceSheet, CashFlow, DebtorAgeingBucket, FinancialData, ProfitLoss,
+)
+
+BALANCE_SHEET_FIELDS = list(BalanceSheet.model_fields)
+PROFIT_LOSS_FIELDS = list(ProfitLoss.model_fields)
+CASH_FLOW_FIELDS = list(CashFlow.model_fields)
+COMPANY_FIELDS = ["promoter_loans", "msme_payables", "msme_receivables", "annual_loan_repayment"]
+
+# Numeric inputs consumed by the ratio engine
+INPUT_FIELDS = BALANCE_SHEET_FIELDS + PROFIT_LOSS_FIELDS + CASH_FLOW_FIELDS + COMPANY_FIELDS
+
+# Optional inputs — NaN when the record has None
+DEBTOR_AGEING_FIELDS = ["ageing_" + f for f in DebtorAgeingBucket.model_fields]
+OPTIONAL_FIELDS = ["headcount"] + DEBTOR_AGEING_FIELDS
+
+def _total(*columns: np.ndarray) -> np.ndarray:
+    # Left-to-right, exactly like a + b + c in the model properties
+    total = columns[0]
+    for column in columns[1:]:
+        total = total + column
+    return total
+
+
+# Derived totals as (inputs, formula) nodes, named like the @property totals
+# on the pydantic models and listed in dependency order. Additions run in
+# the same order as the properties, so results are bit-identical to
+# ``bs.total_assets``, ``pl.pat`` etc.
+DERIVED_NODES: Dict[str, Tuple[Tuple[str, ...], Callable[..., np.ndarray]]] = {
+    "total_non_current_assets": (
+        ("fixed_assets", "capital_wip", "long_term_investments", "deferred_tax_asset",
+         "long_term_loans_advances", "other_non_current_assets"),
+        _total,
+    ),
+    "total_current_assets": (
+        ("inventories", "trade_receivables", "cash_and_equivalents", "short_term_loans_advances",
+         "gst_itc_receivable", "tds_advance_tax_receivable", "other_current_assets"),
+        _total,
+    ),
+    "total_assets": (("total_non_current_assets", "total_current_assets"), _total),
+    "total_equity": (("share_capital", "reserves_surplus", "money_received_share_warrants"), _total),
+    "total_non_current_liabilities": (
+        ("long_term_borrowings", "deferred_tax_liability", "long_term_provisions"),
+        _total,
+    ),
+    "total_current_liabilities": (
+        ("short_term_borrowings", "trade_payables", "gst_payable", "tds_payable", "pf_esi_payable",
+         "advance_from_customers", "other_current_liabilities"),
+        _total,
+    ),
+    "total_liabilities_equity": (
+        ("total_equity", "total_non_current_liabilities", "total_current_liabilities"),
+        _total,
+    ),
+    "total_revenue": (("revenue_from_operations", "other_income"), _total),
+    "gross_profit": (("revenue_from_operations", "cogs"), lambda revenue, cogs: revenue - cogs),
+    "ebitda": (
+        ("gross_profit", "employee_expenses", "other_expenses"),
+        lambda gross_profit, employee, other: gross_profit - employee - other,
+    ),
+    "ebit": (("ebitda", "depreciation"), lambda ebitda, depreciation: ebitda - depreciation),
+    "pbt": (
+        ("ebit", "finance_costs", "other_income"),
+        lambda ebit, finance_costs, other_income: ebit - finance_costs + other_income,
+    ),
+    "pat": (("pbt", "tax_expense"), lambda pbt, tax: pbt - tax),
+    "net_cash_change": (("operating_cf", "investing_cf", "financing_cf"), _total),
+    "free_cash_flow": (("operating_cf", "capex"), lambda operating_cf, capex: operating_cf - capex),
+}
+
+DERIVED_FIELDS = list(DERIVED_NODES)
+
+FRAME_FIELDS = INPUT_FIELDS + OPTIONAL_FIELDS + DERIVED_FIELDS
+_FIELD_INDEX = {name: i for i, name in enumerate(FRAME_FIELDS)}
+
+
+def derive_columns(columns: Mapping[str, np.ndarray], n: int) -> Dict[str, np.ndarray]:
+    """
+    Compute the derived totals from raw input columns (missing inputs count as 0).
+    Totals already present in ``columns`` are reused, not recomputed.
+    """
+    if all(name in columns for name in DERIVED_FIELDS):
+        return {name: np.asarray(columns[name], dtype=np.float64) for name in DERIVED_FIELDS}
+
+    d: Dict[str, np.ndarray] = {}
+
+    def g(name: str) -> np.ndarray:
+        if name in d:
+            return d[name]
+        if name in columns:
+            return np.asarray(columns[name], dtype=np.float64)
+        return np.zeros(n)
+
+    for name, (inputs, formula) in DERIVED_NODES.items():
+        d[name] = formula(*(g(i) for i in inputs))
+    return d
+
+
+def _as_slice(indices: np.ndarray) -> Optional[slice]:
+    """Express sorted row indices as a slice (so numpy returns a view) when they are evenly spaced."""
+    if len(indices) == 0:
+        return None
+    if len(indices) == 1:
+        return slice(int(indices[0]), int(indices[0]) + 1)
+    steps = np.diff(indices)
+    step = int(steps[0])
+    if step <= 0 or not np.all(steps == step):
+        return None
+    return slice(int(indices[0]), int(indices[-1]) + 1, step)
+
+
+class FinancialFrame:
+    """
+    N company-years stored as one (fields × N) float64 block.
+
+    Each field is a contiguous row of the block, so ``frame["trade_receivables"]``
+    is a view, and row slices (``frame[10:20]``, ``frame.company(...)`` on
+    grouped data, ``frame.year(...)`` on balanced panels) share memory with
+    the parent frame. Indexing by a field name also works for the derived
+    totals, which makes a frame a drop-in input for the batch engines.
+    """
+
+    __slots__ = ("values", "company_names", "financial_years")
+
+    def __init__(self, values: np.ndarray, company_names: np.ndarray, financial_years: np.ndarray):
+        if values.shape[0] != len(FRAME_FIELDS):
+            raise ValueError(f"Expected {len(FRAME_FIELDS)} field rows, got {values.shape[0]}")
+        self.values = values
+        self.company_names = company_names
+        self.financial_years = financial_years
+
+    # ── Construction ───────────────────────────────────────────────
+
+    @classmethod
+    def from_columns(
+        cls,
+        columns: Mapping[str, Sequence[float]],
+        company_names: Optional[Sequence[str]] = None,
+        financial_years: Optional[Sequence[str]] = None,
+    ) -> "FinancialFrame":
+        """Build from flat field-name columns; missing inputs default to 0, optional ones to NaN."""
+        lengths = {len(columns[name]) for name in columns if name in _FIELD_INDEX}
+        if len(lengths) != 1:
+            raise ValueError("Expected at least one field column, all of equal length")
+        n = lengths.pop()
+
+        values = np.empty((len(FRAME_FIELDS), n), dtype=np.float64)
+        for name in INPUT_FIELDS:
+            values[_FIELD_INDEX[name]] = columns[name] if name in columns else 0.0
+        for name in OPTIONAL_FIELDS:
+            values[_FIELD_INDEX[name]] = columns[name] if name in columns else np.nan
+        inputs = {name: values[_FIELD_INDEX[name]] for name in INPUT_FIELDS}
+        for name, column in derive_columns(inputs, n).items():
+            values[_FIELD_INDEX[name]] = column
+
+        names = np.array(company_names if company_names is not None else ["Company"] * n, dtype=object)
+        years = np.array(financial_years if financial_years is not None else ["2024-25"] * n, dtype=object)
+        return cls(values, names, years)
+
+    @classmethod
+    def from_records(cls, records: Sequence[FinancialData]) -> "FinancialFrame":
+        rows = []
+        for r in records:
+            bs, pl, cf, da = r.balance_sheet, r.profit_loss, r.cash_flow, r.debtor_ageing
+            rows.append(
+                [getattr(bs, f) for f in BALANCE_SHEET_FIELDS]
+                + [getattr(pl, f) for f in PROFIT_LOSS_FIELDS]
+                + [getattr(cf, f) for f in CASH_FLOW_FIELDS]
+                + [getattr(r, f) for f in COMPANY_FIELDS]
+                + [np.nan if r.headcount is None else r.headcount]
+                + ([np.nan] * len(DEBTOR_AGEING_FIELDS) if da is None
+                   else [getattr(da, f) for f in DebtorAgeingBucket.model_fields])
+            )
+        raw = np.array(rows, dtype=np.float64).reshape(len(records), len(INPUT_FIELDS) + len(OPTIONAL_FIELDS))
+        columns = {name: raw[:, i] for i, name in enumerate(INPUT_FIELDS + OPTIONAL_FIELDS)}
+        return cls.from_columns(
+            columns,
+            company_names=[r.company_name for r in records],
+            financial_years=[r.financial_year for r in records],
+        )
+
+    # ── Conversion back to models ──────────────────────────────────
+
+    def record(self, i: int) -> FinancialData:
+        row = self.values[:, i].tolist()
+        field = lambda name: row[_FIELD_INDEX[name]]  # noqa: E731
+        headcount = field("headcount")
+        ageing = [field(name) for name in DEBTOR_AGEING_FIELDS]
+        return FinancialData(
+            company_name=self.company_names[i],
+            financial_year=self.financial_years[i],
+            balance_sheet=BalanceSheet(**{f: field(f) for f in BALANCE_SHEET_FIELDS}),
+            profit_loss=ProfitLoss(**{f: field(f) for f in PROFIT_LOSS_FIELDS}),
+            cash_flow=CashFlow(**{f: field(f) for f in CASH_FLOW_FIELDS}),
+            headcount=None if headcount != headcount else int(headcount),
+            debtor_ageing=None if any(a != a for a in ageing) else DebtorAgeingBucket(
+                **dict(zip(DebtorAgeingBucket.model_fields, ageing))
+            ),
+            **{f: field(f) for f in COMPANY_FIELDS},
+        )
+
+    def to_records(self) -> List[FinancialData]:
+        return [self.record(i) for i in range(len(self))]
+
+    # ── Access ─────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return self.values.shape[1]
+
+    def __contains__(self, name: object) -> bool:
+        return name in _FIELD_INDEX
+
+    def keys(self) -> List[str]:
+        return list(FRAME_FIELDS)
+
+    def __getitem__(self, key: Union[str, slice]) -> Union[np.ndarray, "FinancialFrame"]:
+        if isinstance(key, str):
+            return self.values[_FIELD_INDEX[key]]
+        if isinstance(key, slice):
+            return FinancialFrame(self.values[:, key], self.company_names[key], self.financial_years[key])
+        raise TypeError("FinancialFrame indices must be field names or slices")
+
+    def take(self, indices: Iterable[int]) -> "FinancialFrame":
+        """Select rows — a view when the indices are evenly spaced, otherwise a copy."""
+        indices = np.asarray(indices if isinstance(indices, np.ndarray) else list(indices), dtype=np.intp)
+        as_slice = _as_slice(indices)
+        if as_slice is not None:
+            return self[as_slice]
+        return FinancialFrame(
+            np.ascontiguousarray(self.values[:, indices]),
+            self.company_names[indices],
+            self.financial_years[indices],
+        )
+
+    def company(self, name: str) -> "FinancialFrame":
+        return self.take(np.flatnonzero(self.company_names == name))
+
+    def year(self, financial_year: str) -> "FinancialFrame":
+        return self.take(np.flatnonzero(self.financial_years == financial_year))
+
+    def companies(self) -> List[str]:
+        return list(dict.fromkeys(self.company_names.tolist()))
+
+    def years(self) -> List[str]:
+        return sorted(set(self.financial_years.tolist()))
+
+    def sort_by_company(self) -> "FinancialFrame":
+        """
+        Reorder rows by (company, year). After this one copy every
+        ``company()`` slice is a view, and so is every ``year()`` slice
+        when all companies cover the same years.
+        """
+        order = np.lexsort((self.financial_years.astype(str), self.company_names.astype(str)))
+        return self.take(order)
@@ -0,0 +1,74 @@
+"""
+Single company-year records for the per-request analysis path.
+Plain ``__slots__`` objects with derived totals computed once; pydantic models are built only at the API boundary.
+"""
+from operator import attrgetter
+from typing import Dict, Optional
+
+from models.financial_data import FinancialData, FinancialRatios, HealthScoreBreakdown
+from models.financial_frame import COMPANY_FIELDS, DERIVED_FIELDS, DERIVED_NODES, INPUT_FIELDS
+
+RATIO_FIELDS = list(FinancialRatios.model_fields)
+SCORE_FIELDS = list(HealthScoreBreakdown.model_fields)
+
+
+def _getter(names):
+    # attrgetter returns a bare value for a single name; formulas always take a tuple
+    return attrgetter(*names) if len(names) > 1 else lambda record: (getattr(record, names[0]),)
+
+
+# DERIVED_NODES with attribute getters bound once, in dependency order
+_DERIVED = [(name, _getter(inputs), formula) for name, (inputs, formula) in DERIVED_NODES.items()]
+_inputs = attrgetter(*INPUT_FIELDS)
+_ratios = attrgetter(*RATIO_FIELDS)
+_scores = attrgetter(*SCORE_FIELDS)
+
+
+class FinancialRecord:
+    """
+    The row counterpart of FinancialFrame: every input field of a
+    FinancialData as a flat attribute, plus the derived totals
+    (``total_assets``, ``ebitda``, ``pat`` ...) materialised once from
+    DERIVED_NODES, so they are bit-identical to the model properties
+    without re-walking their chains on every read.
+    """
+
+    __slots__ = tuple(INPUT_FIELDS + DERIVED_FIELDS)
+
+    @classmethod
+    def from_data(cls, data: FinancialData) -> "FinancialRecord":
+        record = cls.__new__(cls)
+        for part in (data.balance_sheet, data.profit_loss, data.cash_flow):
+            for name, value in part.__dict__.items():
+                setattr(record, name, value)
+        for name in COMPANY_FIELDS:
+            setattr(record, name, getattr(data, name))
+        for name, get, formula in _DERIVED:
+            setattr(record, name, formula(*get(record)))
+        return record
+
+    def values(self) -> Dict[str, float]:
+        return dict(zip(INPUT_FIELDS, _inputs(self)))
+
+
+class RatioValues:
+    """FinancialRatios fields as plain attributes (None where undefined), rounded like the model."""
+
+    __slots__ = tuple(RATIO_FIELDS)
+
+    def to_model(self) -> FinancialRatios:
+        # Validating a plain dict runs in pydantic-core, faster than model_construct
+        return FinancialRatios.model_validate(dict(zip(RATIO_FIELDS, _ratios(self))))
+
+
+class ScoreValues:
+    """HealthScoreBreakdown fields as plain attributes."""
+
+    __slots__ = tuple(SCORE_FIELDS)
+
+    def to_model(self) -> HealthScoreBreakdown:
+        return HealthScoreBreakdown.model_validate(dict(zip(SCORE_FIELDS, _scores(self))))
+
+
+def record_or_none(data: Optional[FinancialData]) -> Optional[FinancialRecord]:
+    return FinancialRecord.from_data(data) if data is not None else None
@@ -0,0 +1,61 @@
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.database import AnalysisSession, get_async_db
+from models.financial_data import AnalysisDelta, AnalysisEdit, AnalysisRequest, FullAnalysis
+from services.analysis_cache import cached_analyze
+from services.dependency_graph import edit_sessions
+from services.executor import run_stage
+from services.portfolio_store import save_analysis_async
+
+router = APIRouter()
+
+
+@router.post("", response_model=FullAnalysis)
+async def calculate(request: AnalysisRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Ratios, health score, recommendations and compliance for one company-year.
+    Re-submitted statements (dashboard refreshes) are answered from the analysis cache;
+    the analysis is stored under ``session_id`` (a new session when none is given).
+    """
+    try:
+        analysis = await run_stage("analysis", cached_analyze, request.financial_data, request.previous_year_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    analysis.session_id = request.session_id or str(uuid.uuid4())
+    await save_analysis_async(db, analysis.session_id, analysis)
+    edit_sessions.remember(analysis.session_id, request.financial_data, request.previous_year_data)
+    return analysis
+
+
+@router.patch("/{session_id}", response_model=AnalysisDelta)
+async def edit(session_id: str, request: AnalysisEdit, db: AsyncSession = Depends(get_async_db)):
+    """
+    Apply field edits to a stored session and return what changed. Only the
+    ratios, score categories and rules downstream of the edited fields are
+    re-run; the edited analysis replaces the stored one. A single company-year
+    is cheap enough to update on the event loop, which also keeps concurrent
+    edits to one session in order.
+    """
+    incremental = edit_sessions.get(session_id)
+    if incremental is None:
+        record = await db.get(AnalysisSession, session_id)
+        if record is None or not record.analysis_json:
+            raise HTTPException(status_code=404, detail=f"Session '{session_id}' not found")
+        stored = FullAnalysis.model_validate_json(record.analysis_json)
+        if stored.previous_year_ratios is not None and request.previous_year_data is None:
+            raise HTTPException(
+                status_code=409,
+                detail="Session has prior-year figures that are no longer held; send previous_year_data",
+            )
+        incremental = edit_sessions.open(session_id, stored.financial_data, request.previous_year_data)
+    try:
+        delta = incremental.update(request.changes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    analysis = incremental.analysis()
+    analysis.session_id = session_id
+    await save_analysis_async(db, session_id, analysis)
+    return delta
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Request
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from services.batch_stream import stream_analyses
+
+router = APIRouter()
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator reads the request body itself.
+
+    The stock response listens for a disconnect while streaming, which
+    would swallow the request body messages the iterator still needs; a
+    disconnect surfaces through ``request.stream()`` instead.
+    """
+
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+
+@router.post("/batch", response_class=NDJSONStreamingResponse)
+async def calculate_batch(request: Request):
+    """
+    Full analyses for a newline-delimited stream of FinancialData records.
+
+    Results come back as NDJSON in input order while the upload is still
+    running; a record that fails validation yields ``{"line": n, "error": ...}``
+    in its place.
+    """
+    return NDJSONStreamingResponse(stream_analyses(request.stream()))
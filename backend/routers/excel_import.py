@@ -0,0 +1,28 @@
+from fastapi import APIRouter, File, HTTPException, UploadFile
+
+from models.financial_data import ExcelExtraction
+from services.executor import run_stage
+from services.metrics import stage
+
+router = APIRouter()
+
+
+def _parse_excel(content: bytes) -> ExcelExtraction:
+    # Imported on first use: openpyxl loads on the first upload (or the
+    # startup preload), never while the app starts or on the event loop
+    from services.excel_parser import parse_excel
+    return parse_excel(content)
+
+
+@router.post("", response_model=ExcelExtraction)
+async def import_excel(file: UploadFile = File(...)):
+    """Extract balance sheet, P&L and cash-flow line items from an .xlsx statement workbook."""
+    if not (file.filename or "").lower().endswith((".xlsx", ".xlsm")):
+        raise HTTPException(status_code=400, detail="Expected an .xlsx or .xlsm workbook")
+    try:
+        with stage("file_read"):
+            content = await file.read()
+        with stage("excel_parse"):
+            return await run_stage("parse", _parse_excel, content)
+    except (KeyError, ValueError, OSError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read workbook: {e}")
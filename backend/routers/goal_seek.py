@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException
+
+from models.financial_data import GoalSeekRequest, GoalSeekResult
+from services.executor import run_stage
+from services.goal_seek import goal_seek, target_for
+
+router = APIRouter()
+
+
+@router.post("", response_model=GoalSeekResult)
+async def goal_seek_levers(request: GoalSeekRequest):
+    """Cheapest lever changes that take the submitted financials to a target score or zone."""
+    try:
+        return await run_stage(
+            "analysis",
+            goal_seek,
+            request.financial_data,
+            target_for(request.target_score, request.target_zone),
+            levers=request.levers,
+            weights=request.weights,
+            max_change_pct=request.max_change_pct,
+            prev_data=request.previous_year_data,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
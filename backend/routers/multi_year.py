@@ -0,0 +1,16 @@
+from fastapi import APIRouter, HTTPException
+
+from models.financial_data import MultiYearAnalysis, MultiYearRequest
+from services.executor import run_stage
+from services.multi_year import multi_year_analysis
+
+router = APIRouter()
+
+
+@router.post("", response_model=MultiYearAnalysis)
+async def analyze_multi_year(request: MultiYearRequest):
+    """Analyse every year of one company, each against the year before it."""
+    try:
+        return await run_stage("analysis", multi_year_analysis, request.years)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
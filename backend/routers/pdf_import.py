@@ -0,0 +1,28 @@
+from fastapi import APIRouter, File, HTTPException, UploadFile
+
+from models.financial_data import PdfExtraction
+from services.executor import run_stage
+from services.metrics import stage
+
+router = APIRouter()
+
+
+def _parse_pdf(content: bytes) -> PdfExtraction:
+    # Imported on first use: pdfplumber loads on the first upload (or the
+    # startup preload), never while the app starts or on the event loop
+    from services.pdf_extractor import parse_pdf
+    return parse_pdf(content)
+
+
+@router.post("", response_model=PdfExtraction)
+async def import_pdf(file: UploadFile = File(...)):
+    """Extract balance sheet, P&L and cash-flow line items from a statement PDF."""
+    if not (file.filename or "").lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Expected a .pdf file")
+    try:
+        with stage("file_read"):
+            content = await file.read()
+        with stage("pdf_parse"):
+            return await run_stage("parse", _parse_pdf, content)
+    except (ValueError, OSError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read PDF: {e}")
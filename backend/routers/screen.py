@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException
+
+from models.financial_data import ScreenRequest, ScreenResult
+from services.executor import run_stage
+from services.ratio_store import RATIO_STORE_DIR
+from services.screener import IndexedStore, run_screen
+
+router = APIRouter()
+
+# Watched from app startup, so appended rows are indexed before any screen sees them
+portfolio = IndexedStore(RATIO_STORE_DIR)
+
+
+def _screen(request: ScreenRequest) -> ScreenResult:
+    store, index = portfolio.current()
+    return run_screen(store, request, index)
+
+
+@router.post("", response_model=ScreenResult)
+async def screen_portfolio(request: ScreenRequest):
+    """Companies in the stored portfolio matching ratio and consecutive-year conditions."""
+    try:
+        return await run_stage("analysis", _screen, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException
+
+from models.financial_data import SensitivityRequest, SensitivityResult
+from services.executor import run_stage
+from services.sensitivity import run_sweep
+
+router = APIRouter()
+
+
+@router.post("", response_model=SensitivityResult)
+async def sensitivity_sweep(request: SensitivityRequest):
+    """Score a one- or two-axis what-if grid around the submitted financials."""
+    try:
+        return await run_stage(
+            "analysis",
+            run_sweep,
+            request.financial_data,
+            request.axes,
+            request.previous_year_data,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
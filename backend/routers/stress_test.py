@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException
+
+from models.financial_data import StressTestRequest, StressTestResult
+from services.executor import run_stage
+from services.stress_test import run_stress_test
+
+router = APIRouter()
+
+
+@router.post("", response_model=StressTestResult)
+async def stress_test(request: StressTestRequest):
+    """Monte Carlo distribution of the health score under the requested shocks."""
+    try:
+        return await run_stage(
+            "analysis",
+            run_stress_test,
+            request.financial_data,
+            request.factors,
+            request.scenarios,
+            seed=request.seed,
+            prev_data=request.previous_year_data,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,145 @@
+"""
+In-process LRU cache for full analyses.
+Keyed by a canonical hash of the inputs and of the scoring constants in force.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from models.financial_data import FinancialData, FullAnalysis
+from services import metrics, recommender, scorer
+from services.analyzer import analyze
+from utils import constants
+
+
+def _signature(value) -> str:
+    """Stable text for a table entry; functions (rule predicates) by their bytecode, constants and closure."""
+    code = getattr(value, "__code__", None)
+    if code is None:
+        return repr(value)
+    closure = [cell.cell_contents for cell in value.__closure__ or ()]
+    return repr((code.co_code, code.co_consts, code.co_names, value.__defaults__, closure))
+
+
+def constants_fingerprint() -> str:
+    """
+    Hash of every table the engines read when producing an analysis: the
+    category metric bands and weights of the scorer, the health zones, the
+    compliance thresholds and the recommendation rules (predicates included).
+    """
+    tables = [
+        constants.BENCHMARKS_VERSION,
+        constants.HEALTH_SCORE_WEIGHTS,
+        constants.HEALTH_ZONES,
+        constants.COMPLIANCE_THRESHOLDS,
+        scorer.PROFITABILITY_METRICS,
+        scorer.LEVERAGE_METRICS,
+        scorer.EFFICIENCY_METRICS,
+        scorer.CASH_FLOW_METRICS,
+    ]
+    h = hashlib.blake2b(digest_size=16)
+    for table in tables:
+        h.update(repr(table).encode())
+    for rule in recommender.RECOMMENDATION_RULES:
+        h.update("\0".join(_signature(part) for part in rule).encode())
+    return h.hexdigest()
+
+
+def analysis_key(data: FinancialData, prev_data: Optional[FinancialData] = None) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    h.update(data.model_dump_json().encode())
+    h.update(b"\0")
+    if prev_data is not None:
+        h.update(prev_data.model_dump_json().encode())
+    return h.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Bounded LRU of FullAnalysis results.
+
+    Entries are only valid for the constants they were computed under:
+    the constants fingerprint is recomputed at most once every
+    ``recheck_s`` seconds (ANALYSIS_CACHE_RECHECK_S), and the whole cache is
+    dropped when it has changed, so an edited table is picked up within
+    that window without hashing the tables on every lookup. Callers get deep copies, so mutating a
+    returned analysis (e.g. setting ``session_id``) never leaks into the cache.
+    """
+
+    def __init__(self, maxsize: int = constants.ANALYSIS_CACHE_SIZE,
+                 recheck_s: float = constants.ANALYSIS_CACHE_RECHECK_S):
+        self.maxsize = maxsize
+        self.recheck_s = recheck_s
+        self._entries: "OrderedDict[str, FullAnalysis]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = constants_fingerprint()
+        self._checked_at = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_constants(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.recheck_s:
+            return
+        self._checked_at = now
+        fingerprint = constants_fingerprint()
+        if fingerprint != self._fingerprint:
+            self._entries.clear()
+            self._fingerprint = fingerprint
+            self.invalidations += 1
+
+    def analyze(self, data: FinancialData, prev_data: Optional[FinancialData] = None) -> FullAnalysis:
+        key = analysis_key(data, prev_data)
+        with self._lock:
+            self._check_constants()
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached.model_copy(deep=True)
+            self.misses += 1
+            fingerprint = self._fingerprint
+
+        result = analyze(data, prev_data)
+
+        with self._lock:
+            # Skip storing if the constants changed while we were computing
+            if self.maxsize > 0 and fingerprint == self._fingerprint:
+                self._entries[key] = result.model_copy(deep=True)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return result
+
+    def check_constants(self) -> None:
+        """Re-hash the constants now (e.g. right after editing a table) instead of waiting for the recheck."""
+        with self._lock:
+            self._check_constants(force=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+analysis_cache = AnalysisCache()
+metrics.cache_stats.register("analysis", analysis_cache.stats)
+
+
+def cached_analyze(data: FinancialData, prev_data: Optional[FinancialData] = None) -> FullAnalysis:
+    return analysis_cache.analyze(data, prev_data)
@@ -0,0 +1,150 @@
+"""
+Analysis pipeline — calculate → score → recommend → compliance.
+Builds the FullAnalysis returned to the dashboard for one company-year.
+"""
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.financial_data import (
+    ComplianceStatus, FinancialData, FinancialRatios, FullAnalysis, HealthScoreBreakdown,
+)
+from models.financial_frame import FinancialFrame
+from models.financial_record import FinancialRecord, record_or_none
+from services.calculator import RATIO_FIELDS, calculate_ratios_batch, ratio_values
+from services.metrics import stage
+from services.recommender import evaluate_rules, record_recommendations, render_recommendations, rule_columns
+from services.scorer import calculate_health_score_batch, score_values
+from utils.constants import COMPLIANCE_THRESHOLDS, HEALTH_ZONES
+
+SCORE_CATEGORIES = ("liquidity", "profitability", "leverage", "efficiency", "cash_flow", "compliance")
+
+
+def compliance_flags(data: FinancialData) -> Dict[str, bool]:
+    bs = data.balance_sheet
+    revenue = data.profit_loss.revenue_from_operations
+    return {
+        "tds_payable_overdue": bs.tds_payable > 0,
+        "pf_esi_overdue": bs.pf_esi_payable > 0,
+        # ITC worth more than N months of revenue is considered blocked
+        "gst_itc_large": revenue > 0 and bs.gst_itc_receivable > (revenue / 12) * COMPLIANCE_THRESHOLDS["gst_itc_months"],
+        "msme_overdue": data.msme_payables > 0,
+    }
+
+
+def compliance_flags_batch(columns: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Vectorised ``compliance_flags`` over input columns (e.g. a FinancialFrame)."""
+    revenue = np.asarray(columns["revenue_from_operations"], dtype=np.float64)
+    itc = np.asarray(columns["gst_itc_receivable"], dtype=np.float64)
+    return {
+        "tds_payable_overdue": np.asarray(columns["tds_payable"]) > 0,
+        "pf_esi_overdue": np.asarray(columns["pf_esi_payable"]) > 0,
+        "gst_itc_large": (revenue > 0) & (itc > (revenue / 12) * COMPLIANCE_THRESHOLDS["gst_itc_months"]),
+        "msme_overdue": np.asarray(columns["msme_payables"]) > 0,
+    }
+
+
+def build_compliance(data: FinancialData, flags: Dict[str, bool]) -> ComplianceStatus:
+    return ComplianceStatus(
+        gst_itc_blocked="WARNING" if flags["gst_itc_large"] else "OK",
+        tds_deposited="CRITICAL" if flags["tds_payable_overdue"] else "OK",
+        pf_esi="CRITICAL" if flags["pf_esi_overdue"] else "OK",
+        msme_payments="WARNING" if flags["msme_overdue"] else "OK",
+        related_party="WARNING" if data.promoter_loans > 0 else "OK",
+        **flags,
+    )
+
+
+def analyze(data: FinancialData, prev_data: Optional[FinancialData] = None) -> FullAnalysis:
+    # Ratios, scores and recommendations pass between the engines as slots
+    # records; the pydantic models are built once, for the response
+    record = FinancialRecord.from_data(data)
+    prev_record = record_or_none(prev_data)
+    with stage("calculate_ratios"):
+        ratios = ratio_values(record, prev_record)
+        prev_ratios = ratio_values(prev_record) if prev_record is not None else None
+    flags = compliance_flags(data)
+    with stage("score"):
+        health_score = score_values(ratios, **flags)
+    with stage("recommendations"):
+        recommendations = record_recommendations(record, ratios, prev_ratios)
+
+    return FullAnalysis(
+        financial_data=data,
+        ratios=ratios.to_model(),
+        health_score=health_score.to_model(),
+        recommendations=recommendations,
+        compliance=build_compliance(data, flags),
+        previous_year_ratios=prev_ratios.to_model() if prev_ratios is not None else None,
+    )
+
+
+def score_batch(
+    columns: Mapping[str, np.ndarray],
+    prev_columns: Optional[Mapping[str, np.ndarray]] = None,
+    has_prev: Optional[np.ndarray] = None,
+) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+    """Columnar calculate → score for N company-years: (ratio columns, score columns)."""
+    ratios = calculate_ratios_batch(columns, prev_columns, has_prev)
+    scores = calculate_health_score_batch(ratios, **compliance_flags_batch(columns))
+    return ratios, scores
+
+
+# ── Batch → models ─────────────────────────────────────────────────
+
+def row_ratios(ratios: Mapping[str, np.ndarray], row: int) -> FinancialRatios:
+    values = {name: float(ratios[name][row]) for name in RATIO_FIELDS}
+    return FinancialRatios(**{name: None if v != v else v for name, v in values.items()})
+
+
+def row_score(scores: Mapping[str, np.ndarray], row: int) -> HealthScoreBreakdown:
+    zone = HEALTH_ZONES[scores["zone"][row]]
+    return HealthScoreBreakdown(
+        overall=float(scores["overall"][row]),
+        zone=zone[2],
+        zone_color=zone[3],
+        **{name: float(scores[name][row]) for name in SCORE_CATEGORIES},
+    )
+
+
+def analyze_batch(
+    records: Sequence[FinancialData],
+    prev_records: Optional[Sequence[Optional[FinancialData]]] = None,
+) -> List[FullAnalysis]:
+    """
+    ``analyze`` for many independent company-years, with ratios, scores and
+    rule masks computed in one columnar pass. ``prev_records`` is aligned
+    with ``records``; None entries have no prior year.
+    """
+    if not records:
+        return []
+    frame = FinancialFrame.from_records(records)
+    prev_frame = has_prev = standalone_prev = None
+    if prev_records is not None and any(p is not None for p in prev_records):
+        if len(prev_records) != len(records):
+            raise ValueError("prev_records must be aligned with records")
+        has_prev = np.array([p is not None for p in prev_records])
+        # Rows without a prior year are filled with their own data and masked out by has_prev
+        prev_frame = FinancialFrame.from_records([p or r for p, r in zip(prev_records, records)])
+        standalone_prev = {
+            name: np.where(has_prev, column, np.nan) for name, column in calculate_ratios_batch(prev_frame).items()
+        }
+
+    ratios = calculate_ratios_batch(frame, prev_frame, has_prev)
+    flags = compliance_flags_batch(frame)
+    scores = calculate_health_score_batch(ratios, **flags)
+    columns = rule_columns(ratios, frame, standalone_prev)
+    fired = evaluate_rules(columns)
+
+    flag_rows = {name: column.tolist() for name, column in flags.items()}
+    return [
+        FullAnalysis(
+            financial_data=data,
+            ratios=row_ratios(ratios, row),
+            health_score=row_score(scores, row),
+            recommendations=render_recommendations(columns, fired, row),
+            compliance=build_compliance(data, {name: flag_rows[name][row] for name in flag_rows}),
+            previous_year_ratios=row_ratios(standalone_prev, row) if has_prev is not None and has_prev[row] else None,
+        )
+        for row, data in enumerate(records)
+    ]
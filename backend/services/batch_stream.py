@@ -0,0 +1,158 @@
+"""
+Streaming batch analysis over NDJSON.
+Reads FinancialData lines from an async byte stream and yields FullAnalysis lines chunk by chunk.
+"""
+import asyncio
+import json
+from bisect import bisect_right
+from typing import AsyncIterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from models.financial_data import FinancialData
+from services.analyzer import analyze_batch
+from services.executor import run_stage
+from services.metrics import stage
+from utils.constants import CALCULATE_STREAM_CHUNK_SIZE, CALCULATE_STREAM_MAX_LINE_BYTES, CALCULATE_STREAM_QUEUE_CHUNKS
+
+Line = Tuple[int, bytes]      # (1-based line number, raw line)
+
+
+def error_line(line: int, error: str) -> bytes:
+    return json.dumps({"line": line, "error": error}).encode() + b"\n"
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'record'}: {err['msg']}" for err in e.errors()
+    )
+
+
+class LineSplitter:
+    """
+    Incremental splitter for body chunks that may cut lines anywhere.
+
+    Lines over ``max_bytes`` are dropped as they arrive and reported once
+    (as an empty line with ``too_long`` set), so one runaway record cannot
+    make the buffer grow without bound.
+    """
+
+    def __init__(self, max_bytes: int = CALCULATE_STREAM_MAX_LINE_BYTES):
+        self.max_bytes = max_bytes
+        self.line = 0
+        self.too_long: List[int] = []
+        self._buffer = bytearray()
+        self._skipping = False
+
+    def feed(self, data: bytes) -> List[Line]:
+        lines: List[Line] = []
+        start = 0
+        while True:
+            end = data.find(b"\n", start)
+            if end < 0:
+                break
+            self.line += 1
+            if self._skipping:
+                self._skipping = False
+            else:
+                self._buffer += data[start:end]
+                if len(self._buffer) > self.max_bytes:
+                    self.too_long.append(self.line)
+                else:
+                    lines.append((self.line, bytes(self._buffer)))
+            self._buffer.clear()
+            start = end + 1
+        if not self._skipping:
+            self._buffer += data[start:]
+            if len(self._buffer) > self.max_bytes:
+                self.too_long.append(self.line + 1)
+                self._buffer.clear()
+                self._skipping = True
+        return lines
+
+    def close(self) -> List[Line]:
+        """Flush the final line when the body does not end with a newline."""
+        if self._skipping or not self._buffer:
+            return []
+        self.line += 1
+        line = (self.line, bytes(self._buffer))
+        self._buffer.clear()
+        return [line]
+
+
+def analyze_lines(lines: List[Line], too_long: List[int]) -> bytes:
+    """
+    NDJSON output for one chunk, in input line order: a FullAnalysis per
+    valid record, ``{"line": n, "error": ...}`` for anything that failed.
+    Blank lines are skipped.
+    """
+    records: List[FinancialData] = []
+    numbers: List[int] = []
+    out: List[Tuple[int, bytes]] = [(n, error_line(n, "Line is too long")) for n in too_long]
+    with stage("validate"):
+        for number, raw in lines:
+            if not raw.strip():
+                continue
+            try:
+                records.append(FinancialData.model_validate_json(raw))
+                numbers.append(number)
+            except ValidationError as e:
+                out.append((number, error_line(number, _validation_message(e))))
+    with stage("analyze_batch"):
+        analyses = analyze_batch(records)
+    with stage("serialize"):
+        for number, analysis in zip(numbers, analyses):
+            out.append((number, analysis.model_dump_json().encode() + b"\n"))
+    out.sort(key=lambda item: item[0])
+    return b"".join(body for _, body in out)
+
+
+async def stream_analyses(
+    body: AsyncIterator[bytes],
+    chunk_size: int = CALCULATE_STREAM_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Analyse an NDJSON body of FinancialData records as it arrives.
+
+    A reader task splits the body into chunks of ``chunk_size`` records and
+    hands them over through a queue of CALCULATE_STREAM_QUEUE_CHUNKS slots;
+    each chunk is validated and scored on the "analysis" pool and yielded
+    as soon as it is done, while later records are still being uploaded.
+    Nothing is buffered beyond those few chunks: when the consumer stops
+    reading, the queue fills, the reader stops pulling the body and the
+    client's upload stalls on TCP flow control.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=CALCULATE_STREAM_QUEUE_CHUNKS)
+
+    async def read() -> None:
+        splitter = LineSplitter()
+        pending: List[Line] = []
+        reported = 0
+        try:
+            async for data in body:
+                pending.extend(splitter.feed(data))
+                while len(pending) >= chunk_size:
+                    chunk, pending = pending[:chunk_size], pending[chunk_size:]
+                    # Oversized lines after this chunk's last line go out with the chunk they fall in
+                    upto = bisect_right(splitter.too_long, chunk[-1][0], lo=reported)
+                    await queue.put((chunk, splitter.too_long[reported:upto]))
+                    reported = upto
+            pending.extend(splitter.close())
+            if pending or len(splitter.too_long) > reported:
+                await queue.put((pending, splitter.too_long[reported:]))
+            await queue.put(None)
+        except Exception as e:
+            await queue.put(e)
+
+    reader = asyncio.create_task(read())
+    try:
+        while True:
+            item: Optional[object] = await queue.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            lines, too_long = item
+            yield await run_stage("analysis", analyze_lines, lines, too_long)
+    finally:
+        reader.cancel()
@@ -0,0 +1,238 @@
+"""
+Bulk portfolio analysis over flat files.
+Streams company-year rows in fixed-size chunks through calculate → score → recommend.
+"""
+import json
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import deque
+from typing import Callable, Deque, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from models.financial_frame import INPUT_FIELDS, OPTIONAL_FIELDS
+from services.analyzer import score_batch
+from services.calculator import RATIO_FIELDS, calculate_ratios_batch
+from services.ratio_store import RatioStore
+from services.recommender import RECOMMENDATION_RULES, evaluate_rules, rule_columns
+from utils.constants import BULK_CHUNK_SIZE, HEALTH_ZONES
+
+ID_COLUMNS = ["company_name", "financial_year"]
+SCORE_COLUMNS = ["overall", "liquidity", "profitability", "leverage", "efficiency", "cash_flow", "compliance"]
+
+_ZONE_NAMES = np.array([zone[2] for zone in HEALTH_ZONES], dtype=object)
+_RULE_CODES = np.array([rule.code for rule in RECOMMENDATION_RULES], dtype=object)
+_RULE_PRIORITIES = np.array([rule.priority for rule in RECOMMENDATION_RULES], dtype=object)
+_ZONE_INDEX = {name: i for i, name in enumerate(_ZONE_NAMES)}
+
+
+def _file_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".csv", ".txt"):
+        return "csv"
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unsupported file type '{ext}' (expected .csv, .parquet or .jsonl)")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet files need the 'pyarrow' package: pip install pyarrow")
+    return pa, pq
+
+
+# ── Reading ────────────────────────────────────────────────────────
+
+def read_chunks(path: str, chunk_size: int = BULK_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Yield the input file as DataFrames of at most ``chunk_size`` rows, never loading it whole."""
+    fmt = _file_format(path)
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size, float_precision="round_trip")
+    elif fmt == "jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size, precise_float=True)
+    else:
+        _, pq = _require_pyarrow()
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+# ── One chunk ──────────────────────────────────────────────────────
+
+def _numeric(chunk: pd.DataFrame, name: str, default: float) -> np.ndarray:
+    if name not in chunk:
+        return np.full(len(chunk), default)
+    return pd.to_numeric(chunk[name], errors="coerce").fillna(default).to_numpy(dtype=np.float64)
+
+
+def analyze_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ratios, scores and fired recommendation codes for every row of a chunk.
+
+    Columns use the BalanceSheet / ProfitLoss / CashFlow field names; blank
+    or missing inputs count as 0. Optional ``prev_<field>`` columns carry
+    the prior year, which is used wherever any of them is filled in.
+    """
+    n = len(chunk)
+    columns = {name: _numeric(chunk, name, 0.0) for name in INPUT_FIELDS}
+    columns.update({name: _numeric(chunk, name, np.nan) for name in OPTIONAL_FIELDS})
+
+    prev_names = [name for name in INPUT_FIELDS if "prev_" + name in chunk]
+    prev_columns = has_prev = None
+    if prev_names:
+        has_prev = chunk[["prev_" + name for name in prev_names]].notna().any(axis=1).to_numpy()
+        prev_columns = {name: _numeric(chunk, "prev_" + name, 0.0) for name in INPUT_FIELDS}
+
+    ratios, scores = score_batch(columns, prev_columns, has_prev)
+    # Like analyze(): rules compare against the prior year's standalone ratios
+    prev_ratios = None
+    if prev_columns is not None:
+        prev_ratios = {
+            name: np.where(has_prev, column, np.nan)
+            for name, column in calculate_ratios_batch(prev_columns).items()
+        }
+    fired = evaluate_rules(rule_columns(ratios, columns, prev_ratios))
+
+    out = pd.DataFrame({
+        name: chunk[name].to_numpy() if name in chunk else np.full(n, None, dtype=object)
+        for name in ID_COLUMNS
+    })
+    for name in RATIO_FIELDS:
+        out[name] = ratios[name]
+    for name in SCORE_COLUMNS:
+        out["score_" + name] = scores[name]
+    out["zone"] = _ZONE_NAMES[scores["zone"]]
+    out["high_priority_count"] = (fired & (_RULE_PRIORITIES == "HIGH")[:, None]).sum(axis=0)
+    out["recommendations"] = [";".join(_RULE_CODES[fired[:, row]]) for row in range(n)]
+    return out
+
+
+# ── Writing ────────────────────────────────────────────────────────
+
+def json_lines(frame: pd.DataFrame) -> Iterator[str]:
+    """
+    Rows as JSON objects, floats in their shortest round-trip form (as in
+    the CSV output and the API's model JSON, so 15.05 stays 15.05) and NaN
+    as null.
+    """
+    columns = {}
+    for name in frame.columns:
+        values = frame[name].tolist()
+        if frame[name].dtype.kind == "f":
+            values = [None if v != v else v for v in values]
+        columns[name] = values
+    for i in range(len(frame)):
+        yield json.dumps({name: values[i] for name, values in columns.items()})
+
+
+class ChunkWriter:
+    """Appends result chunks to a CSV, JSON-lines or Parquet file as they arrive."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.format = _file_format(path)
+        if self.format == "parquet":
+            _require_pyarrow()
+        self._parquet = None
+        self._started = False
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if self.format == "csv":
+            frame.to_csv(self.path, mode="a" if self._started else "w", header=not self._started, index=False)
+        elif self.format == "jsonl":
+            with open(self.path, "a" if self._started else "w") as f:
+                f.writelines(line + "\n" for line in json_lines(frame))
+        else:
+            pa, pq = _require_pyarrow()
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        self._started = True
+
+    def close(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def append_results(store: RatioStore, result: pd.DataFrame) -> int:
+    """Append an ``analyze_chunk`` result to a ratio store, as scored. Returns the store's row count."""
+    labels = {name: result[name].fillna("").astype(str).tolist() for name in ID_COLUMNS}
+    ratios = {name: result[name].to_numpy(dtype=np.float64) for name in RATIO_FIELDS}
+    scores = {name: result["score_" + name].to_numpy(dtype=np.float64) for name in SCORE_COLUMNS}
+    scores["zone"] = result["zone"].map(_ZONE_INDEX).to_numpy()
+    return store.append(labels["company_name"], labels["financial_year"], ratios, scores)
+
+
+# ── Driver ─────────────────────────────────────────────────────────
+
+def run_bulk(
+    input_path: str,
+    output_path: str,
+    chunk_size: int = BULK_CHUNK_SIZE,
+    workers: int = 1,
+    progress: Optional[Callable[[int, float], None]] = None,
+    ratio_store: Optional[str] = None,
+) -> dict:
+    """
+    Stream ``input_path`` through ``analyze_chunk`` into ``output_path``.
+
+    With ``workers > 1`` chunks are analysed on a process pool, but at most
+    two per worker are in flight and results are written strictly in input
+    order, so memory stays bounded and the output is identical to a
+    single-process run. ``progress(rows_done, elapsed_seconds)`` is called
+    after each chunk is written. With ``ratio_store`` every chunk's ratios
+    and scores are also appended to the RatioStore in that directory
+    (created if needed), which is what ``/api/screen`` reads.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    _file_format(input_path)
+    writer = ChunkWriter(output_path)
+    store = RatioStore(ratio_store, create=True) if ratio_store is not None else None
+    rows = chunks = 0
+    start = time.perf_counter()
+
+    def emit(result: pd.DataFrame) -> None:
+        nonlocal rows, chunks
+        writer.write(result)
+        if store is not None:
+            append_results(store, result)
+        rows += len(result)
+        chunks += 1
+        if progress is not None:
+            progress(rows, time.perf_counter() - start)
+
+    try:
+        if workers == 1:
+            for chunk in read_chunks(input_path, chunk_size):
+                emit(analyze_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending: Deque[Future] = deque()
+                for chunk in read_chunks(input_path, chunk_size):
+                    pending.append(pool.submit(analyze_chunk, chunk))
+                    if len(pending) >= 2 * workers:
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "chunks": chunks,
+        "store_rows": len(store) if store is not None else None,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+    }
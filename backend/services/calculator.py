@@ -2,8 +2,14 @@
 Financial ratio calculator — all ratios for an Indian SME context.
 All monetary inputs assumed to be in Lakhs (INR).
 """
-from typing import Optional
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
 from models.financial_data import FinancialData, FinancialRatios
+from models.financial_frame import INPUT_FIELDS, derive_columns
+from models.financial_record import FinancialRecord, RatioValues, record_or_none
+from utils.arrays import round_array, safe_div_array
 
 
 def safe_div(numerator: float, denominator: float, default=None) -> Optional[float]:
@@ -13,69 +19,67 @@ def safe_div(numerator: float, denominator: float, default=None) -> Optional[flo
 
 
 def calculate_ratios(data: FinancialData, prev_data: Optional[FinancialData] = None) -> FinancialRatios:
-    bs = data.balance_sheet
-    pl = data.profit_loss
-    cf = data.cash_flow
-
-    revenue = pl.revenue_from_operations
-    total_revenue = pl.total_revenue
-    gross_profit = pl.gross_profit
-    ebitda = pl.ebitda
-    ebit = pl.ebit
-    pbt = pl.pbt
-    pat = pl.pat
-
-    total_assets = bs.total_assets
-    total_equity = bs.total_equity
-    current_assets = bs.total_current_assets
-    current_liabilities = bs.total_current_liabilities
-    total_debt = bs.long_term_borrowings + bs.short_term_borrowings
+    return ratio_values(FinancialRecord.from_data(data), record_or_none(prev_data)).to_model()
+
+
+def ratio_values(r: FinancialRecord, prev: Optional[FinancialRecord] = None) -> RatioValues:
+    """``calculate_ratios`` on FinancialRecords, for the internal pipeline: no model is built."""
+    revenue = r.revenue_from_operations
+    ebitda = r.ebitda
+    ebit = r.ebit
+    pat = r.pat
+
+    total_assets = r.total_assets
+    total_equity = r.total_equity
+    current_assets = r.total_current_assets
+    current_liabilities = r.total_current_liabilities
+    total_debt = r.long_term_borrowings + r.short_term_borrowings
 
     # Averages for efficiency ratios (use prev year if available)
-    if prev_data:
-        avg_assets = (total_assets + prev_data.balance_sheet.total_assets) / 2
-        avg_equity = (total_equity + prev_data.balance_sheet.total_equity) / 2
-        avg_inventory = (bs.inventories + prev_data.balance_sheet.inventories) / 2
-        avg_trade_receivables = (bs.trade_receivables + prev_data.balance_sheet.trade_receivables) / 2
-        avg_trade_payables = (bs.trade_payables + prev_data.balance_sheet.trade_payables) / 2
+    if prev is not None:
+        avg_assets = (total_assets + prev.total_assets) / 2
+        avg_equity = (total_equity + prev.total_equity) / 2
+        avg_inventory = (r.inventories + prev.inventories) / 2
+        avg_trade_receivables = (r.trade_receivables + prev.trade_receivables) / 2
+        avg_trade_payables = (r.trade_payables + prev.trade_payables) / 2
     else:
         avg_assets = total_assets
         avg_equity = total_equity
-        avg_inventory = bs.inventories
-        avg_trade_receivables = bs.trade_receivables
-        avg_trade_payables = bs.trade_payables
+        avg_inventory = r.inventories
+        avg_trade_receivables = r.trade_receivables
+        avg_trade_payables = r.trade_payables
 
     capital_employed = total_assets - current_liabilities
 
     # ── Profitability ──────────────────────────────────────────────
-    gross_margin = safe_div(gross_profit, revenue) * 100 if revenue else None
+    gross_margin = safe_div(r.gross_profit, revenue) * 100 if revenue else None
     net_margin = safe_div(pat, revenue) * 100 if revenue else None
     ebitda_margin = safe_div(ebitda, revenue) * 100 if revenue else None
     ebit_margin = safe_div(ebit, revenue) * 100 if revenue else None
     roe = safe_div(pat, avg_equity) * 100 if avg_equity else None
     roa = safe_div(pat, avg_assets) * 100 if avg_assets else None
     roce = safe_div(ebit, capital_employed) * 100 if capital_employed else None
-    eps = safe_div(pat, data.balance_sheet.share_capital / 10) if data.balance_sheet.share_capital else None  # Assuming face value ₹10
+    eps = safe_div(pat, r.share_capital / 10) if r.share_capital else None  # Assuming face value ₹10
 
     # ── Liquidity ──────────────────────────────────────────────────
     current_ratio = safe_div(current_assets, current_liabilities)
-    quick_ratio = safe_div(current_assets - bs.inventories, current_liabilities)
-    cash_ratio = safe_div(bs.cash_and_equivalents, current_liabilities)
+    quick_ratio = safe_div(current_assets - r.inventories, current_liabilities)
+    cash_ratio = safe_div(r.cash_and_equivalents, current_liabilities)
     working_capital = current_assets - current_liabilities
 
     # ── Leverage ───────────────────────────────────────────────────
     debt_to_equity = safe_div(total_debt, total_equity)
     debt_ratio = safe_div(total_debt, total_assets)
-    interest_coverage = safe_div(ebit, pl.finance_costs)
+    interest_coverage = safe_div(ebit, r.finance_costs)
     # DSCR: (PAT + Depreciation) / (Annual Loan Repayment + Interest)
-    annual_repayment = data.annual_loan_repayment if data.annual_loan_repayment else total_debt * 0.15  # estimate 15% p.a.
-    dscr_denominator = annual_repayment + pl.finance_costs
-    dscr = safe_div(pat + pl.depreciation, dscr_denominator)
-    net_debt = total_debt - bs.cash_and_equivalents
+    annual_repayment = r.annual_loan_repayment if r.annual_loan_repayment else total_debt * 0.15  # estimate 15% p.a.
+    dscr_denominator = annual_repayment + r.finance_costs
+    dscr = safe_div(pat + r.depreciation, dscr_denominator)
+    net_debt = total_debt - r.cash_and_equivalents
     net_debt_to_ebitda = safe_div(net_debt, ebitda)
 
     # ── Efficiency ─────────────────────────────────────────────────
-    cogs = pl.cogs if pl.cogs > 0 else revenue * 0.6  # fallback estimate
+    cogs = r.cogs if r.cogs > 0 else revenue * 0.6  # fallback estimate
 
     dso = safe_div(avg_trade_receivables, revenue) * 365 if revenue else None
     dpo = safe_div(avg_trade_payables, cogs) * 365 if cogs else None
@@ -83,51 +87,224 @@ def calculate_ratios(data: FinancialData, prev_data: Optional[FinancialData] = N
     dio = safe_div(365, inventory_turnover) if inventory_turnover else None
     ccc = (dso or 0) + (dio or 0) - (dpo or 0) if all([dso, dio, dpo]) else None
     asset_turnover = safe_div(revenue, avg_assets)
-    fixed_asset_turnover = safe_div(revenue, bs.fixed_assets) if bs.fixed_assets else None
+    fixed_asset_turnover = safe_div(revenue, r.fixed_assets) if r.fixed_assets else None
     capital_productivity = safe_div(revenue, capital_employed) if capital_employed else None
 
     # ── Cash Flow ──────────────────────────────────────────────────
-    ocf_margin = safe_div(cf.operating_cf, revenue) * 100 if revenue else None
-    fcf = cf.free_cash_flow
-    cf_to_debt = safe_div(cf.operating_cf, total_debt) if total_debt else None
-    cash_conversion_ratio = safe_div(cf.operating_cf, ebitda) if ebitda else None
-    capex_intensity = safe_div(cf.capex, revenue) * 100 if revenue else None
-
-    return FinancialRatios(
-        gross_margin=round(gross_margin, 2) if gross_margin is not None else None,
-        net_margin=round(net_margin, 2) if net_margin is not None else None,
-        ebitda_margin=round(ebitda_margin, 2) if ebitda_margin is not None else None,
-        ebit_margin=round(ebit_margin, 2) if ebit_margin is not None else None,
-        roe=round(roe, 2) if roe is not None else None,
-        roa=round(roa, 2) if roa is not None else None,
-        roce=round(roce, 2) if roce is not None else None,
-        eps=round(eps, 2) if eps is not None else None,
-
-        current_ratio=round(current_ratio, 2) if current_ratio is not None else None,
-        quick_ratio=round(quick_ratio, 2) if quick_ratio is not None else None,
-        cash_ratio=round(cash_ratio, 2) if cash_ratio is not None else None,
-        working_capital=round(working_capital, 2) if working_capital is not None else None,
-
-        debt_to_equity=round(debt_to_equity, 2) if debt_to_equity is not None else None,
-        debt_ratio=round(debt_ratio, 2) if debt_ratio is not None else None,
-        interest_coverage=round(interest_coverage, 2) if interest_coverage is not None else None,
-        dscr=round(dscr, 2) if dscr is not None else None,
-        net_debt=round(net_debt, 2) if net_debt is not None else None,
-        net_debt_to_ebitda=round(net_debt_to_ebitda, 2) if net_debt_to_ebitda is not None else None,
-        total_debt=round(total_debt, 2),
-
-        dso=round(dso, 1) if dso is not None else None,
-        dpo=round(dpo, 1) if dpo is not None else None,
-        dio=round(dio, 1) if dio is not None else None,
-        ccc=round(ccc, 1) if ccc is not None else None,
-        asset_turnover=round(asset_turnover, 2) if asset_turnover is not None else None,
-        inventory_turnover=round(inventory_turnover, 2) if inventory_turnover is not None else None,
-        fixed_asset_turnover=round(fixed_asset_turnover, 2) if fixed_asset_turnover is not None else None,
-        capital_productivity=round(capital_productivity, 2) if capital_productivity is not None else None,
-
-        ocf_margin=round(ocf_margin, 2) if ocf_margin is not None else None,
-        fcf=round(fcf, 2) if fcf is not None else None,
-        cf_to_debt=round(cf_to_debt, 2) if cf_to_debt is not None else None,
-        cash_conversion_ratio=round(cash_conversion_ratio, 2) if cash_conversion_ratio is not None else None,
-        capex_intensity=round(capex_intensity, 2) if capex_intensity is not None else None,
-    )
+    ocf_margin = safe_div(r.operating_cf, revenue) * 100 if revenue else None
+    fcf = r.free_cash_flow
+    cf_to_debt = safe_div(r.operating_cf, total_debt) if total_debt else None
+    cash_conversion_ratio = safe_div(r.operating_cf, ebitda) if ebitda else None
+    capex_intensity = safe_div(r.capex, revenue) * 100 if revenue else None
+
+    out = RatioValues()
+    out.gross_margin = round(gross_margin, 2) if gross_margin is not None else None
+    out.net_margin = round(net_margin, 2) if net_margin is not None else None
+    out.ebitda_margin = round(ebitda_margin, 2) if ebitda_margin is not None else None
+    out.ebit_margin = round(ebit_margin, 2) if ebit_margin is not None else None
+    out.roe = round(roe, 2) if roe is not None else None
+    out.roa = round(roa, 2) if roa is not None else None
+    out.roce = round(roce, 2) if roce is not None else None
+    out.eps = round(eps, 2) if eps is not None else None
+
+    out.current_ratio = round(current_ratio, 2) if current_ratio is not None else None
+    out.quick_ratio = round(quick_ratio, 2) if quick_ratio is not None else None
+    out.cash_ratio = round(cash_ratio, 2) if cash_ratio is not None else None
+    out.working_capital = round(working_capital, 2) if working_capital is not None else None
+
+    out.debt_to_equity = round(debt_to_equity, 2) if debt_to_equity is not None else None
+    out.debt_ratio = round(debt_ratio, 2) if debt_ratio is not None else None
+    out.interest_coverage = round(interest_coverage, 2) if interest_coverage is not None else None
+    out.dscr = round(dscr, 2) if dscr is not None else None
+    out.net_debt = round(net_debt, 2) if net_debt is not None else None
+    out.net_debt_to_ebitda = round(net_debt_to_ebitda, 2) if net_debt_to_ebitda is not None else None
+    out.total_debt = round(total_debt, 2)
+
+    out.dso = round(dso, 1) if dso is not None else None
+    out.dpo = round(dpo, 1) if dpo is not None else None
+    out.dio = round(dio, 1) if dio is not None else None
+    out.ccc = round(ccc, 1) if ccc is not None else None
+    out.asset_turnover = round(asset_turnover, 2) if asset_turnover is not None else None
+    out.inventory_turnover = round(inventory_turnover, 2) if inventory_turnover is not None else None
+    out.fixed_asset_turnover = round(fixed_asset_turnover, 2) if fixed_asset_turnover is not None else None
+    out.capital_productivity = round(capital_productivity, 2) if capital_productivity is not None else None
+
+    out.ocf_margin = round(ocf_margin, 2) if ocf_margin is not None else None
+    out.fcf = round(fcf, 2) if fcf is not None else None
+    out.cf_to_debt = round(cf_to_debt, 2) if cf_to_debt is not None else None
+    out.cash_conversion_ratio = round(cash_conversion_ratio, 2) if cash_conversion_ratio is not None else None
+    out.capex_intensity = round(capex_intensity, 2) if capex_intensity is not None else None
+    return out
+
+
+# ── Batch (columnar) engine ────────────────────────────────────────
+# Same formulas as calculate_ratios, evaluated over whole arrays at once.
+# Inputs are keyed by the flat BalanceSheet / ProfitLoss / CashFlow /
+# FinancialData field names (a FinancialFrame works directly); outputs by
+# FinancialRatios field names, with NaN standing in for None.
+#
+# Formulas are (inputs, formula) nodes in dependency order. Leaves are the
+# raw inputs, the derived totals (DERIVED_NODES), the prior-year values in
+# PREV_INPUTS ("prev_" prefixed) and the boolean "has_prev" column. Every
+# FinancialRatios field is a node; the rest are shared intermediates. The
+# explicit inputs let services.dependency_graph recompute only what an
+# edit touches.
+
+RATIO_FIELDS = list(FinancialRatios.model_fields)
+
+# Ratios rounded to one decimal (days); everything else uses two.
+ONE_DECIMAL_RATIOS = {"dso", "dpo", "dio", "ccc"}
+
+# Prior-year values feeding the averages
+PREV_INPUTS = ["total_assets", "total_equity", "inventories", "trade_receivables", "trade_payables"]
+
+
+def _average(current: np.ndarray, prev: np.ndarray, has_prev: np.ndarray) -> np.ndarray:
+    return np.where(has_prev, (current + prev) / 2, current)
+
+
+def _pct(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return safe_div_array(numerator, denominator) * 100
+
+
+def _days(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return safe_div_array(numerator, denominator) * 365
+
+
+def _ccc(dso: np.ndarray, dio: np.ndarray, dpo: np.ndarray) -> np.ndarray:
+    # Scalar path requires all three to be present and non-zero
+    ok = (dso != 0) & (dio != 0) & (dpo != 0) & ~(np.isnan(dso) | np.isnan(dio) | np.isnan(dpo))
+    return np.where(ok, dso + dio - dpo, np.nan)
+
+
+RATIO_NODES: Dict[str, Tuple[Tuple[str, ...], Callable[..., np.ndarray]]] = {
+    # ── Shared intermediates ───────────────────────────────────────
+    "total_debt": (("long_term_borrowings", "short_term_borrowings"), lambda lt, st: lt + st),
+    "avg_assets": (("total_assets", "prev_total_assets", "has_prev"), _average),
+    "avg_equity": (("total_equity", "prev_total_equity", "has_prev"), _average),
+    "avg_inventory": (("inventories", "prev_inventories", "has_prev"), _average),
+    "avg_trade_receivables": (("trade_receivables", "prev_trade_receivables", "has_prev"), _average),
+    "avg_trade_payables": (("trade_payables", "prev_trade_payables", "has_prev"), _average),
+    "capital_employed": (("total_assets", "total_current_liabilities"), lambda ta, cl: ta - cl),
+    # estimate 15% p.a. when the repayment schedule is unknown
+    "annual_repayment": (
+        ("annual_loan_repayment", "total_debt"),
+        lambda repayment, debt: np.where(repayment != 0, repayment, debt * 0.15),
+    ),
+    # fallback estimate when COGS is not reported
+    "effective_cogs": (
+        ("cogs", "revenue_from_operations"),
+        lambda cogs, revenue: np.where(cogs > 0, cogs, revenue * 0.6),
+    ),
+
+    # ── Profitability ──────────────────────────────────────────────
+    "gross_margin": (("gross_profit", "revenue_from_operations"), _pct),
+    "net_margin": (("pat", "revenue_from_operations"), _pct),
+    "ebitda_margin": (("ebitda", "revenue_from_operations"), _pct),
+    "ebit_margin": (("ebit", "revenue_from_operations"), _pct),
+    "roe": (("pat", "avg_equity"), _pct),
+    "roa": (("pat", "avg_assets"), _pct),
+    "roce": (("ebit", "capital_employed"), _pct),
+    "eps": (("pat", "share_capital"), lambda pat, share_capital: safe_div_array(pat, share_capital / 10)),
+
+    # ── Liquidity ──────────────────────────────────────────────────
+    "current_ratio": (("total_current_assets", "total_current_liabilities"), safe_div_array),
+    "quick_ratio": (
+        ("total_current_assets", "inventories", "total_current_liabilities"),
+        lambda ca, inventories, cl: safe_div_array(ca - inventories, cl),
+    ),
+    "cash_ratio": (("cash_and_equivalents", "total_current_liabilities"), safe_div_array),
+    "working_capital": (("total_current_assets", "total_current_liabilities"), lambda ca, cl: ca - cl),
+
+    # ── Leverage ───────────────────────────────────────────────────
+    "debt_to_equity": (("total_debt", "total_equity"), safe_div_array),
+    "debt_ratio": (("total_debt", "total_assets"), safe_div_array),
+    "interest_coverage": (("ebit", "finance_costs"), safe_div_array),
+    "dscr": (
+        ("pat", "depreciation", "annual_repayment", "finance_costs"),
+        lambda pat, dep, repayment, fc: safe_div_array(pat + dep, repayment + fc),
+    ),
+    "net_debt": (("total_debt", "cash_and_equivalents"), lambda debt, cash: debt - cash),
+    "net_debt_to_ebitda": (("net_debt", "ebitda"), safe_div_array),
+
+    # ── Efficiency ─────────────────────────────────────────────────
+    "dso": (("avg_trade_receivables", "revenue_from_operations"), _days),
+    "dpo": (("avg_trade_payables", "effective_cogs"), _days),
+    "inventory_turnover": (("effective_cogs", "avg_inventory"), safe_div_array),
+    "dio": (("inventory_turnover",), lambda turnover: safe_div_array(365, turnover)),
+    "ccc": (("dso", "dio", "dpo"), _ccc),
+    "asset_turnover": (("revenue_from_operations", "avg_assets"), safe_div_array),
+    "fixed_asset_turnover": (("revenue_from_operations", "fixed_assets"), safe_div_array),
+    "capital_productivity": (("revenue_from_operations", "capital_employed"), safe_div_array),
+
+    # ── Cash Flow ──────────────────────────────────────────────────
+    "ocf_margin": (("operating_cf", "revenue_from_operations"), _pct),
+    "fcf": (("free_cash_flow",), lambda fcf: fcf),
+    "cf_to_debt": (("operating_cf", "total_debt"), safe_div_array),
+    "cash_conversion_ratio": (("operating_cf", "ebitda"), safe_div_array),
+    "capex_intensity": (("capex", "revenue_from_operations"), _pct),
+}
+
+
+def round_ratio(name: str, values: np.ndarray) -> np.ndarray:
+    return round_array(values, 1 if name in ONE_DECIMAL_RATIOS else 2)
+
+
+def _batch_length(columns: Mapping[str, np.ndarray]) -> int:
+    for name in INPUT_FIELDS:
+        if name in columns:
+            return len(columns[name])
+    raise ValueError("No financial input columns supplied")
+
+
+def ratio_leaves(
+    columns: Mapping[str, np.ndarray],
+    prev_columns: Optional[Mapping[str, np.ndarray]] = None,
+    has_prev: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """Leaf values for RATIO_NODES: raw inputs, derived totals and prior-year values."""
+    n = _batch_length(columns)
+    leaves = {
+        name: np.asarray(columns[name], dtype=np.float64) if name in columns else np.zeros(n)
+        for name in INPUT_FIELDS
+    }
+    leaves.update(derive_columns(columns, n))
+
+    if prev_columns is not None:
+        prev = {**prev_columns, **derive_columns(prev_columns, n)}
+        leaves["has_prev"] = np.ones(n, dtype=bool) if has_prev is None else np.asarray(has_prev, dtype=bool)
+    else:
+        prev = {}
+        leaves["has_prev"] = np.zeros(n, dtype=bool)
+    for name in PREV_INPUTS:
+        leaves["prev_" + name] = np.asarray(prev[name], dtype=np.float64) if name in prev else np.zeros(n)
+    return leaves
+
+
+def evaluate_ratio_nodes(values: Dict[str, np.ndarray], names=None) -> Dict[str, np.ndarray]:
+    """
+    Evaluate RATIO_NODES (all of them, or only ``names``, in dependency
+    order) into ``values``, which must already hold every input they read.
+    Values are unrounded; see round_ratio.
+    """
+    for name, (inputs, formula) in RATIO_NODES.items():
+        if names is None or name in names:
+            values[name] = formula(*(values[i] for i in inputs))
+    return values
+
+
+def calculate_ratios_batch(
+    columns: Mapping[str, np.ndarray],
+    prev_columns: Optional[Mapping[str, np.ndarray]] = None,
+    has_prev: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorised ``calculate_ratios`` over N company-years.
+
+    ``prev_columns`` holds the prior-year inputs row-aligned with ``columns``;
+    ``has_prev`` marks which rows actually have a prior year (default: all
+    rows when ``prev_columns`` is given). Missing input columns count as 0,
+    like the pydantic defaults. Results match the scalar function exactly.
+    """
+    values = evaluate_ratio_nodes(ratio_leaves(columns, prev_columns, has_prev))
+    return {name: round_ratio(name, values[name]) for name in RATIO_FIELDS}
@@ -0,0 +1,356 @@
+"""
+Dependency graph: input field → derived totals → ratios → score categories → recommendation rules.
+Used for incremental what-if editing, where one edited input re-runs only what depends on it.
+"""
+import math
+import threading
+from collections import OrderedDict
+from itertools import chain
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from models.financial_data import (
+    AnalysisDelta, FinancialData, FinancialRatios, FullAnalysis, HealthScoreBreakdown, Recommendation,
+)
+from models.financial_frame import DERIVED_NODES, INPUT_FIELDS, OPTIONAL_FIELDS, FinancialFrame
+from services.analyzer import build_compliance, compliance_flags_batch
+from services.calculator import (
+    ONE_DECIMAL_RATIOS, PREV_INPUTS, RATIO_FIELDS, RATIO_NODES, evaluate_ratio_nodes, ratio_leaves,
+)
+from services.recommender import (
+    RECOMMENDATION_RULES, render_recommendations, rule_columns, rule_inputs,
+)
+from services.scorer import (
+    CATEGORY_RATIOS, calculate_cash_flow_score, calculate_compliance_score_from_flags,
+    calculate_efficiency_score, calculate_leverage_score, calculate_liquidity_score,
+    calculate_profitability_score, overall_score_array, zone_for,
+)
+from utils.constants import EDIT_SESSIONS_SIZE
+
+# (inputs) of every computed node, in evaluation order
+NODE_INPUTS: Dict[str, tuple] = {
+    name: inputs for name, (inputs, _) in chain(DERIVED_NODES.items(), RATIO_NODES.items())
+}
+_NODE_FORMULAS = {name: formula for name, (_, formula) in chain(DERIVED_NODES.items(), RATIO_NODES.items())}
+
+# Inputs read by compliance_flags_batch — the compliance category depends on nothing else
+COMPLIANCE_INPUTS = {"tds_payable", "pf_esi_payable", "gst_itc_receivable", "revenue_from_operations", "msme_payables"}
+
+CATEGORIES = list(CATEGORY_RATIOS) + ["compliance"]
+
+RATIO_CATEGORY = {ratio: category for category, ratios in CATEGORY_RATIOS.items() for ratio in ratios}
+
+_CATEGORY_SCORE_FUNCTIONS = {
+    "liquidity": calculate_liquidity_score,
+    "profitability": calculate_profitability_score,
+    "leverage": calculate_leverage_score,
+    "efficiency": calculate_efficiency_score,
+    "cash_flow": calculate_cash_flow_score,
+}
+
+RULE_INPUTS = {rule.code: rule_inputs(rule) for rule in RECOMMENDATION_RULES}
+
+
+def _direct_dependents() -> Dict[str, Set[str]]:
+    dependents: Dict[str, Set[str]] = {}
+    for node, inputs in NODE_INPUTS.items():
+        for name in inputs:
+            dependents.setdefault(name, set()).add(node)
+    return dependents
+
+
+_DEPENDENTS = _direct_dependents()
+
+
+def downstream(names: Iterable[str]) -> Set[str]:
+    """Every computed node that (transitively) reads any of ``names``."""
+    seen: Set[str] = set()
+    stack = list(names)
+    while stack:
+        for node in _DEPENDENTS.get(stack.pop(), ()):
+            if node not in seen:
+                seen.add(node)
+                stack.append(node)
+    return seen
+
+
+def _prev_leaves(prev_fields: Iterable[str]) -> Set[str]:
+    """Current-year "prev_*" leaves fed by edited prior-year input fields."""
+    touched = set(prev_fields) | downstream(prev_fields)
+    return {"prev_" + name for name in PREV_INPUTS if name in touched}
+
+
+def _categories_for(names: Set[str]) -> Set[str]:
+    categories = {RATIO_CATEGORY[n] for n in names if n in RATIO_CATEGORY}
+    if names & COMPLIANCE_INPUTS:
+        categories.add("compliance")
+    return categories
+
+
+def _rules_for(names: Set[str]) -> List[str]:
+    return [code for code, inputs in RULE_INPUTS.items() if inputs & names]
+
+
+# ── Static views of the graph ──────────────────────────────────────
+# Keys are flat input field names, plus "prev_<field>" for prior-year inputs.
+
+def _field_ratios(field: str) -> List[str]:
+    if field.startswith("prev_"):
+        nodes = downstream(_prev_leaves([field[5:]]))
+    else:
+        nodes = downstream([field])
+    return [name for name in RATIO_FIELDS if name in nodes]
+
+
+FIELD_RATIOS: Dict[str, List[str]] = {
+    field: _field_ratios(field) for field in INPUT_FIELDS + ["prev_" + f for f in INPUT_FIELDS]
+}
+
+FIELD_CATEGORIES: Dict[str, List[str]] = {
+    field: [c for c in CATEGORIES if c in _categories_for(set(ratios) | {field})]
+    for field, ratios in FIELD_RATIOS.items()
+}
+
+# Rules reading a ratio scored in the category (or, for compliance, a compliance input)
+CATEGORY_RULES: Dict[str, List[str]] = {
+    category: _rules_for(set(CATEGORY_RATIOS.get(category, [])) | (
+        COMPLIANCE_INPUTS if category == "compliance" else set()
+    ))
+    for category in CATEGORIES
+}
+
+
+def _as_optional(name: str, value: np.ndarray) -> Optional[float]:
+    # Builtin round on the float is exactly round_ratio for a single value
+    v = float(value[0])
+    return None if v != v else round(v, 1 if name in ONE_DECIMAL_RATIOS else 2)
+
+
+def _same(a: Optional[float], b: Optional[float]) -> bool:
+    # -0.0 vs 0.0 matters: it shows up in rendered recommendation text
+    return a == b and (a is None or math.copysign(1, a) == math.copysign(1, b))
+
+
+def _column(value: Optional[float]) -> np.ndarray:
+    return np.array([np.nan if value is None else value])
+
+
+class IncrementalAnalysis:
+    """
+    A single company-year kept fully evaluated, so that edits re-run only
+    the graph nodes, score categories and rules downstream of the edited
+    fields. Node values are one-element arrays pushed through the same
+    formulas as the batch engine; categories are re-scored with the scalar
+    scorers. Results are identical to a full ``analyze`` of the edited data.
+    """
+
+    def __init__(self, data: FinancialData, prev_data: Optional[FinancialData] = None):
+        frame = FinancialFrame.from_records([data])
+        self._names = frame.company_names
+        self._years = frame.financial_years
+        self._optional_fields = {name: frame[name] for name in OPTIONAL_FIELDS}
+
+        self._prev_values: Optional[Dict[str, np.ndarray]] = None
+        self._prev_ratios: Optional[Dict[str, Optional[float]]] = None
+        if prev_data is not None:
+            prev_frame = FinancialFrame.from_records([prev_data])
+            self._values = evaluate_ratio_nodes(ratio_leaves(frame, prev_frame))
+            self._prev_values = evaluate_ratio_nodes(ratio_leaves(prev_frame))
+            self._prev_ratios = {name: _as_optional(name, self._prev_values[name]) for name in RATIO_FIELDS}
+        else:
+            self._values = evaluate_ratio_nodes(ratio_leaves(frame))
+
+        self._ratios = {name: _as_optional(name, self._values[name]) for name in RATIO_FIELDS}
+        self._flags = self._compliance_flags()
+        ratios = FinancialRatios.model_construct(**self._ratios)
+        self._categories = {name: scorer(ratios) for name, scorer in _CATEGORY_SCORE_FUNCTIONS.items()}
+        self._categories["compliance"] = calculate_compliance_score_from_flags(**self._flags)
+        self._overall = overall_score_array(self._categories)
+
+        self._columns = rule_columns(
+            {name: _column(v) for name, v in self._ratios.items()},
+            self._values,
+            {name: _column(v) for name, v in self._prev_ratios.items()} if self._prev_ratios else None,
+        )
+        self._fired = np.zeros(len(RECOMMENDATION_RULES), dtype=bool)
+        self._evaluate_rules(range(len(RECOMMENDATION_RULES)))
+
+    def _compliance_flags(self) -> Dict[str, bool]:
+        return {name: bool(flag[0]) for name, flag in compliance_flags_batch(self._values).items()}
+
+    def _evaluate_rules(self, indices: Iterable[int]) -> None:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for i in indices:
+                self._fired[i] = bool(RECOMMENDATION_RULES[i].predicate(self._columns)[0])
+
+    @staticmethod
+    def _recompute(values: Dict[str, np.ndarray], dirty: Set[str]) -> List[str]:
+        recomputed = []
+        for name, inputs in NODE_INPUTS.items():
+            if name in dirty:
+                values[name] = _NODE_FORMULAS[name](*(values[i] for i in inputs))
+                recomputed.append(name)
+        return recomputed
+
+    def update(self, changes: Mapping[str, float]) -> AnalysisDelta:
+        """
+        Apply edits keyed by flat input field name ("prev_<field>" for the
+        prior year) and return what changed as a result.
+        """
+        current = {f: v for f, v in changes.items() if not f.startswith("prev_")}
+        prior = {f[5:]: v for f, v in changes.items() if f.startswith("prev_")}
+        unknown = [f for f in list(current) + list(prior) if f not in INPUT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown input fields: {', '.join(sorted(unknown))}")
+        if prior and self._prev_values is None:
+            raise ValueError("No prior-year data to edit")
+
+        recomputed: List[str] = []
+        changed: Set[str] = set(current)
+        for field, value in current.items():
+            self._values[field] = self._columns[field] = np.array([float(value)])
+        dirty = downstream(current)
+
+        if prior:
+            for field, value in prior.items():
+                self._prev_values[field] = np.array([float(value)])
+            prev_dirty = downstream(prior)
+            recomputed += ["prev_" + n for n in self._recompute(self._prev_values, prev_dirty)]
+            leaves = _prev_leaves(prior)
+            for leaf in leaves:
+                self._values[leaf] = self._prev_values[leaf[5:]]
+            dirty |= downstream(leaves)
+            for name in RATIO_FIELDS:
+                if name in prev_dirty:
+                    new = _as_optional(name, self._prev_values[name])
+                    if not _same(new, self._prev_ratios[name]):
+                        self._prev_ratios[name] = new
+                        self._columns["prev_" + name] = _column(new)
+                        changed.add("prev_" + name)
+        recomputed += self._recompute(self._values, dirty)
+
+        changed_ratios: Dict[str, Optional[float]] = {}
+        for name in RATIO_FIELDS:
+            if name in dirty:
+                new = _as_optional(name, self._values[name])
+                if not _same(new, self._ratios[name]):
+                    self._ratios[name] = changed_ratios[name] = new
+                    self._columns[name] = _column(new)
+        changed |= set(changed_ratios)
+
+        categories = _categories_for(changed)
+        if categories:
+            ratios = FinancialRatios.model_construct(**self._ratios)
+            for category in categories:
+                if category == "compliance":
+                    self._flags = self._compliance_flags()
+                    self._categories["compliance"] = calculate_compliance_score_from_flags(**self._flags)
+                else:
+                    self._categories[category] = _CATEGORY_SCORE_FUNCTIONS[category](ratios)
+            self._overall = overall_score_array(self._categories)
+
+        before = self._fired.copy()
+        rule_ids = [i for i, rule in enumerate(RECOMMENDATION_RULES) if RULE_INPUTS[rule.code] & changed]
+        self._evaluate_rules(rule_ids)
+        codes = lambda mask: [RECOMMENDATION_RULES[i].code for i in np.flatnonzero(mask)]  # noqa: E731
+
+        return AnalysisDelta(
+            changed_fields=list(changes),
+            ratios=changed_ratios,
+            changed_categories=[c for c in CATEGORIES if c in categories],
+            health_score=self.health_score() if categories else None,
+            fired_rules=codes(self._fired & ~before),
+            cleared_rules=codes(before & ~self._fired),
+            recommendations=self.recommendations() if (before | self._fired)[rule_ids].any() else None,
+            recomputed_nodes=recomputed,
+        )
+
+    # ── Materialising the current state ────────────────────────────
+
+    def health_score(self) -> HealthScoreBreakdown:
+        zone, zone_color = zone_for(self._overall)
+        return HealthScoreBreakdown(
+            overall=round(self._overall, 1),
+            zone=zone,
+            zone_color=zone_color,
+            **{name: round(score, 1) for name, score in self._categories.items()},
+        )
+
+    def recommendations(self) -> List[Recommendation]:
+        return render_recommendations(self._columns, self._fired[:, None], 0)
+
+    def ratios(self) -> FinancialRatios:
+        return FinancialRatios(**self._ratios)
+
+    def financial_data(self) -> FinancialData:
+        columns = {name: self._values[name] for name in INPUT_FIELDS}
+        columns.update(self._optional_fields)
+        return FinancialFrame.from_columns(columns, self._names, self._years).record(0)
+
+    def analysis(self) -> FullAnalysis:
+        data = self.financial_data()
+        return FullAnalysis(
+            financial_data=data,
+            ratios=self.ratios(),
+            health_score=self.health_score(),
+            recommendations=self.recommendations(),
+            compliance=build_compliance(data, self._flags),
+            previous_year_ratios=FinancialRatios(**self._prev_ratios) if self._prev_ratios else None,
+        )
+
+
+# ── Sessions open for editing ──────────────────────────────────────
+
+_Inputs = Tuple[FinancialData, Optional[FinancialData]]
+
+
+class EditSessions:
+    """
+    Bounded LRU of stored sessions kept in memory for incremental editing,
+    keyed by session id. ``remember`` only keeps a session's inputs; its
+    IncrementalAnalysis is built on the first edit, so plain calculations
+    pay nothing for being editable.
+    """
+
+    def __init__(self, maxsize: int = EDIT_SESSIONS_SIZE):
+        self.maxsize = maxsize
+        # session id → its edit state, or just its inputs until the first edit
+        self._entries: "OrderedDict[str, Union[IncrementalAnalysis, _Inputs]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _put(self, session_id: str, entry) -> None:
+        self._entries[session_id] = entry
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def remember(self, session_id: str, data: FinancialData, prev_data: Optional[FinancialData] = None) -> None:
+        """Note a session's inputs, replacing any edit state it had."""
+        with self._lock:
+            self._put(session_id, (data, prev_data))
+
+    def get(self, session_id: str) -> Optional[IncrementalAnalysis]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if isinstance(entry, tuple):
+                entry = IncrementalAnalysis(*entry)
+            self._put(session_id, entry)
+            return entry
+
+    def open(self, session_id: str, data: FinancialData,
+             prev_data: Optional[FinancialData] = None) -> IncrementalAnalysis:
+        """Edit state for a session reloaded from storage."""
+        incremental = IncrementalAnalysis(data, prev_data)
+        with self._lock:
+            self._put(session_id, incremental)
+        return incremental
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+edit_sessions = EditSessions()
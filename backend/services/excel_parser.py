@@ -0,0 +1,214 @@
+"""
+Streaming Excel statement parser.
+Reads workbooks in read-only mode, row by row, and remembers each template's layout.
+"""
+import hashlib
+import io
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from models.financial_data import (
+    BalanceSheet, CashFlow, ExcelExtraction, FinancialData, ProfitLoss,
+)
+from models.financial_frame import (
+    BALANCE_SHEET_FIELDS, CASH_FLOW_FIELDS, COMPANY_FIELDS, PROFIT_LOSS_FIELDS,
+)
+from utils.constants import EXCEL_LAYOUT_CACHE_SIZE
+from utils.line_items import POSITIVE_FIELDS, find_line_item, note_column, row_amounts
+
+# Scanning stops as soon as every one of these has been found
+REQUIRED_FIELDS = frozenset(BALANCE_SHEET_FIELDS + PROFIT_LOSS_FIELDS)
+
+# sheet name → {"label_col", "note_col", "rows": {row number: field}}
+SheetLayout = Dict[str, object]
+WorkbookLayout = Dict[str, SheetLayout]
+
+
+# ── Layout cache ───────────────────────────────────────────────────
+
+class LayoutCache:
+    """Bounded LRU of detected workbook layouts, keyed by structure fingerprint."""
+
+    def __init__(self, maxsize: int = EXCEL_LAYOUT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, WorkbookLayout]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint: str) -> Optional[WorkbookLayout]:
+        with self._lock:
+            layout = self._entries.get(fingerprint)
+            if layout is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+            return layout
+
+    def put(self, fingerprint: str, layout: WorkbookLayout) -> None:
+        with self._lock:
+            self._entries[fingerprint] = layout
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, fingerprint: str) -> None:
+        with self._lock:
+            self._entries.pop(fingerprint, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+layout_cache = LayoutCache()
+
+
+def workbook_fingerprint(workbook) -> str:
+    """Hash of sheet names and their recorded dimensions — read from metadata, no cells touched."""
+    h = hashlib.blake2b(digest_size=16)
+    for ws in workbook.worksheets:
+        try:
+            dimension = ws.calculate_dimension()
+        except ValueError:
+            dimension = "unsized"
+        h.update(f"{ws.title}\0{dimension}\0".encode())
+    return h.hexdigest()
+
+
+# ── Detection ──────────────────────────────────────────────────────
+
+def _detect(workbook) -> Tuple[WorkbookLayout, Dict[str, List[float]], int]:
+    """Scan rows lazily until every required line item is found (or the workbook ends)."""
+    layout: WorkbookLayout = {}
+    values: Dict[str, List[float]] = {}
+    scanned = 0
+    for ws in workbook.worksheets:
+        sheet: SheetLayout = {"label_col": None, "note_col": None, "rows": {}}
+        for row_number, row in enumerate(ws.iter_rows(values_only=True), start=1):
+            scanned += 1
+            if sheet["note_col"] is None:
+                sheet["note_col"] = note_column(row)
+            col, field = find_line_item(row)
+            if field is None or field in values:
+                continue
+            amounts = row_amounts(row, col, sheet["note_col"])
+            if not amounts:
+                continue
+            values[field] = amounts
+            sheet["rows"][row_number] = field
+            sheet["label_col"] = col if sheet["label_col"] is None else sheet["label_col"]
+            if REQUIRED_FIELDS.issubset(values):
+                break
+        if sheet["rows"]:
+            layout[ws.title] = sheet
+        if REQUIRED_FIELDS.issubset(values):
+            break
+    return layout, values, scanned
+
+
+def _replay(workbook, layout: WorkbookLayout) -> Optional[Tuple[Dict[str, List[float]], int]]:
+    """
+    Read only the rows a cached layout points at. Returns None if any of
+    them no longer carries the expected label or amounts (the template has
+    changed), so the caller falls back to full detection.
+    """
+    values: Dict[str, List[float]] = {}
+    scanned = 0
+    sheets = {ws.title: ws for ws in workbook.worksheets}
+    for title, sheet in layout.items():
+        ws = sheets.get(title)
+        if ws is None:
+            return None
+        rows: Dict[int, str] = sheet["rows"]
+        for row_number, row in enumerate(ws.iter_rows(max_row=max(rows), values_only=True), start=1):
+            scanned += 1
+            field = rows.get(row_number)
+            if field is None:
+                continue
+            col, found = find_line_item(row)
+            if found != field:
+                return None
+            amounts = row_amounts(row, col, sheet["note_col"])
+            if not amounts:
+                return None
+            values[field] = amounts
+    return values, scanned
+
+
+# ── Entry point ────────────────────────────────────────────────────
+
+def year_data(values: Dict[str, List[float]], index: int) -> FinancialData:
+    """FinancialData from the ``index``-th amount of each matched line item (0 = current year)."""
+    def pick(fields):
+        out = {}
+        for field in fields:
+            amounts = values.get(field)
+            if amounts and len(amounts) > index:
+                out[field] = abs(amounts[index]) if field in POSITIVE_FIELDS else amounts[index]
+        return out
+
+    return FinancialData(
+        balance_sheet=BalanceSheet(**pick(BALANCE_SHEET_FIELDS)),
+        profit_loss=ProfitLoss(**pick(PROFIT_LOSS_FIELDS)),
+        cash_flow=CashFlow(**pick(CASH_FLOW_FIELDS)),
+        **pick(COMPANY_FIELDS),
+    )
+
+
+def parse_excel(source: Union[str, bytes, BinaryIO], cache: LayoutCache = layout_cache) -> ExcelExtraction:
+    """
+    Extract current- and prior-year financials from a statement workbook.
+
+    Cells are read with openpyxl's read-only, values-only row iterator, so
+    styles and sheets past the last needed line item are never loaded. A
+    workbook whose structure fingerprint matches a cached layout is read
+    straight from the remembered rows, skipping label detection.
+    """
+    start = time.perf_counter()
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    try:
+        workbook = load_workbook(source, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException) as e:
+        raise ValueError("Not a valid .xlsx workbook") from e
+    try:
+        fingerprint = workbook_fingerprint(workbook)
+        layout = cache.get(fingerprint)
+        replayed = _replay(workbook, layout) if layout is not None else None
+        if replayed is not None:
+            values, scanned = replayed
+        else:
+            if layout is not None:
+                cache.discard(fingerprint)
+            layout, values, scanned = _detect(workbook)
+            if layout:
+                cache.put(fingerprint, layout)
+    finally:
+        workbook.close()
+
+    has_prior = any(len(amounts) > 1 for amounts in values.values())
+    return ExcelExtraction(
+        financial_data=year_data(values, 0),
+        previous_year_data=year_data(values, 1) if has_prior else None,
+        matched_fields={
+            field: f"{title}!{row_number}"
+            for title, sheet in layout.items()
+            for row_number, field in sheet["rows"].items()
+        },
+        missing_fields=sorted(REQUIRED_FIELDS.difference(values)),
+        layout_cached=replayed is not None,
+        rows_scanned=scanned,
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+    )
@@ -0,0 +1,115 @@
+"""
+Execution layer for CPU-bound work called from async routes.
+Each pipeline stage gets its own bounded thread or process pool, so heavy requests never run on the event loop.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from services import profiler
+from utils.constants import EXECUTOR_QUEUE_PER_WORKER, EXECUTOR_STAGES
+
+# Worker processes come from a fork server (spawn where there is none):
+# forking the server itself would copy a multithreaded process, held locks included
+MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+class StagePool:
+    """
+    Lazily started executor for one stage, plus a semaphore capping the
+    calls queued on it. Callers past the cap wait on the event loop
+    without holding a worker, so a burst of uploads cannot build an
+    unbounded backlog inside the pool.
+    """
+
+    def __init__(self, name: str, kind: str, workers: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Stage '{name}': pool kind must be 'thread' or 'process', got '{kind}'")
+        if workers < 1:
+            raise ValueError(f"Stage '{name}': workers must be at least 1")
+        self.name = name
+        self.kind = kind
+        self.workers = workers
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=MP_CONTEXT)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+            return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers * EXECUTOR_QUEUE_PER_WORKER)
+        if self.kind == "thread":
+            fn = profiler.bind(fn)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._slots = None
+
+
+def stage_config() -> Dict[str, tuple]:
+    """(kind, workers) per stage: EXECUTOR_STAGES, overridden by EXECUTOR_<STAGE>_KIND / _WORKERS."""
+    config = {}
+    for stage, (kind, workers) in EXECUTOR_STAGES.items():
+        kind = os.getenv(f"EXECUTOR_{stage.upper()}_KIND", kind)
+        workers = int(os.getenv(f"EXECUTOR_{stage.upper()}_WORKERS", workers))
+        config[stage] = (kind, workers)
+    return config
+
+
+pools: Dict[str, StagePool] = {
+    stage: StagePool(stage, kind, workers) for stage, (kind, workers) in stage_config().items()
+}
+
+
+async def run_stage(stage: str, fn: Callable, *args, **kwargs) -> Any:
+    """Run ``fn(*args, **kwargs)`` on the stage's pool and await the result."""
+    if stage not in pools:
+        raise ValueError(f"Unknown executor stage '{stage}'")
+    return await pools[stage].run(fn, *args, **kwargs)
+
+
+_worker_pools: Dict[Tuple[str, int], ProcessPoolExecutor] = {}
+_worker_pools_lock = threading.Lock()
+
+
+def worker_pool(name: str, workers: int) -> ProcessPoolExecutor:
+    """
+    Long-lived process pool for fan-out inside a stage call (stress-test
+    chunks, PDF pages), started on first use and shared by every request,
+    so processes are not started per call.
+    """
+    with _worker_pools_lock:
+        pool = _worker_pools.get((name, workers))
+        if pool is None:
+            pool = _worker_pools[name, workers] = ProcessPoolExecutor(max_workers=workers, mp_context=MP_CONTEXT)
+        return pool
+
+
+def shutdown_pools() -> None:
+    for pool in pools.values():
+        pool.shutdown()
+    with _worker_pools_lock:
+        for pool in _worker_pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _worker_pools.clear()
@@ -0,0 +1,255 @@
+"""
+Goal-seek solver.
+Finds the cheapest weighted set of lever changes that lifts the health score to a target.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.financial_data import FinancialData, GoalSeekResult, LeverChange
+from models.financial_frame import BALANCE_SHEET_FIELDS, CASH_FLOW_FIELDS, PROFIT_LOSS_FIELDS
+from services.analyzer import compliance_flags, compliance_flags_batch
+from services.calculator import calculate_ratios, calculate_ratios_batch
+from services.scorer import calculate_health_score, category_scores_batch, overall_score_array
+from services.sensitivity import perturbed_columns
+from utils.constants import (
+    GOAL_SEEK_MAX_CHANGE_PCT, GOAL_SEEK_MAX_ITERATIONS, GOAL_SEEK_STEPS, HEALTH_ZONES,
+)
+
+# field: (direction that improves health, field that absorbs the cash released or raised)
+GOAL_SEEK_LEVERS: Dict[str, Tuple[int, Optional[str]]] = {
+    "trade_receivables": (-1, "cash_and_equivalents"),
+    "inventories": (-1, "cash_and_equivalents"),
+    "short_term_borrowings": (-1, None),
+    "long_term_borrowings": (-1, None),
+    "cogs": (-1, None),
+    "employee_expenses": (-1, None),
+    "other_expenses": (-1, None),
+    "finance_costs": (-1, None),
+    "revenue_from_operations": (1, None),
+    "share_capital": (1, "cash_and_equivalents"),
+}
+
+# Points evaluated inside the final grid step to land just on the target
+_REFINE_POINTS = 64
+
+
+def target_for(target_score: Optional[float], target_zone: Optional[str]) -> float:
+    if target_score is not None:
+        if not 0 <= target_score <= 100:
+            raise ValueError("Target score must be between 0 and 100")
+        return target_score
+    for low, _, zone, _ in HEALTH_ZONES:
+        if target_zone is not None and zone.lower() == target_zone.lower():
+            return float(low)
+    raise ValueError("Give a target_score or a target_zone ("
+                     + ", ".join(zone[2] for zone in HEALTH_ZONES) + ")")
+
+
+class _Problem:
+    """Scores any number of lever settings (rows of fractional changes) in one batch."""
+
+    def __init__(self, data: FinancialData, levers: List[str], prev_data: Optional[FinancialData]):
+        self.data = data
+        self.prev_data = prev_data
+        self.levers = levers
+        flat = {**data.balance_sheet.model_dump(), **data.profit_loss.model_dump(), **data.cash_flow.model_dump()}
+        self.base_values = np.array([float(flat[field]) for field in levers])
+
+    def deltas(self, changes: np.ndarray) -> Dict[str, np.ndarray]:
+        out: Dict[str, np.ndarray] = {}
+        for j, field in enumerate(self.levers):
+            direction, counterpart = GOAL_SEEK_LEVERS[field]
+            # Sized on |base| so a negative base still moves in the improving direction
+            step = abs(self.base_values[j]) * changes[:, j]
+            out[field] = out.get(field, 0) + direction * step
+            if counterpart is not None:
+                out[counterpart] = out.get(counterpart, 0) + step
+        return out
+
+    def overall(self, changes: np.ndarray) -> np.ndarray:
+        """Unrounded overall score for each row of ``changes``."""
+        perturbations = [(field, "add", delta) for field, delta in self.deltas(changes).items()]
+        columns, prev_columns = perturbed_columns(self.data, perturbations, len(changes), self.prev_data)
+        ratios = calculate_ratios_batch(columns, prev_columns)
+        return overall_score_array(category_scores_batch(ratios, **compliance_flags_batch(columns)))
+
+
+def _apply(data: FinancialData, deltas: Dict[str, float]) -> FinancialData:
+    adjusted = data.model_copy(deep=True)
+    for field, delta in deltas.items():
+        if field in BALANCE_SHEET_FIELDS:
+            section = adjusted.balance_sheet
+        elif field in PROFIT_LOSS_FIELDS:
+            section = adjusted.profit_loss
+        elif field in CASH_FLOW_FIELDS:
+            section = adjusted.cash_flow
+        else:
+            section = adjusted
+        setattr(section, field, getattr(section, field) + delta)
+    return adjusted
+
+
+def _hull_segments(costs: np.ndarray, gains: np.ndarray) -> List[Tuple[float, int]]:
+    """
+    Upper concave hull of one lever's (cost, gain) curve, starting from the
+    origin: (slope, point index) for each segment that still gains score.
+    """
+    segments = []
+    origin_cost, origin_gain, start = 0.0, 0.0, 0
+    while start < len(costs):
+        slopes = (gains[start:] - origin_gain) / (costs[start:] - origin_cost)
+        best = start + int(np.argmax(slopes))
+        if slopes[best - start] <= 0:
+            break
+        segments.append((float(slopes[best - start]), best))
+        origin_cost, origin_gain, start = costs[best], gains[best], best + 1
+    return segments
+
+
+def _trim(
+    problem: _Problem, changes: np.ndarray, current: float, cost_per_pct: np.ndarray, target: float,
+) -> Tuple[np.ndarray, float]:
+    """
+    Walk back moves the hull plan made that interactions between levers
+    turned out not to need, biggest saving first, while staying on target.
+    """
+    for _ in range(len(changes)):
+        moved = np.flatnonzero(changes)
+        if len(moved) == 0:
+            break
+        fractions = np.linspace(0, 1, _REFINE_POINTS, endpoint=False)
+        rows = np.repeat(changes[None, :], len(moved) * len(fractions), axis=0)
+        lever = np.repeat(moved, len(fractions))
+        rows[np.arange(len(rows)), lever] = changes[lever] * np.tile(fractions, len(moved))
+        scores = problem.overall(rows)
+        saving = np.where(scores >= target, cost_per_pct[lever] * (changes[lever] - rows[np.arange(len(rows)), lever]), 0)
+        best = int(np.argmax(saving))
+        if saving[best] <= 0:
+            break
+        changes, current = rows[best], scores[best]
+    return changes, current
+
+
+def goal_seek(
+    data: FinancialData,
+    target: float,
+    levers: Optional[List[str]] = None,
+    weights: Optional[Dict[str, float]] = None,
+    max_change_pct: Optional[float] = None,
+    prev_data: Optional[FinancialData] = None,
+) -> GoalSeekResult:
+    """
+    Cheapest weighted lever changes (cost = weight × |% change|) that lift
+    the unrounded overall score to ``target``.
+
+    Every category scorer is piecewise linear in its ratios, so each
+    lever's score curve is piecewise (near-)linear and the cheapest way to
+    buy score is to walk the segments of the curves' concave hulls in order
+    of gain per cost — a fractional knapsack. Each round scores all lever
+    curves in one batch, merges their hull segments into a sequence of
+    cumulative plans, scores those plans exactly in a second batch (which
+    catches levers interacting through shared ratios) and resolves the
+    segment that crosses the target finely, then trims any move the target
+    no longer needs. If no plan gets there, the next round restarts from
+    the best plan found.
+    """
+    levers = list(levers or GOAL_SEEK_LEVERS)
+    for field in levers:
+        if field not in GOAL_SEEK_LEVERS:
+            raise ValueError(f"Unknown lever '{field}' (expected one of {', '.join(GOAL_SEEK_LEVERS)})")
+    weights = weights or {}
+    cost_per_pct = np.array([float(weights.get(field, 1.0)) for field in levers])
+    if (cost_per_pct <= 0).any():
+        raise ValueError("Lever weights must be positive")
+    limit = (GOAL_SEEK_MAX_CHANGE_PCT if max_change_pct is None else max_change_pct) / 100
+    if not 0 < limit <= 1:
+        raise ValueError("max_change_pct must be in (0, 100]")
+
+    problem = _Problem(data, levers, prev_data)
+    step = limit / GOAL_SEEK_STEPS
+    changes = np.zeros(len(levers))
+    current = problem.overall(changes[None, :])[0]
+    # Levers on a zero base value cannot move anything
+    active = [j for j in range(len(levers)) if problem.base_values[j] != 0]
+
+    iterations = 0
+    while current < target and iterations < GOAL_SEEK_MAX_ITERATIONS:
+        iterations += 1
+
+        # 1. Every lever's score curve over its remaining range, one batch
+        blocks, spans, offset = [], [], 0
+        for j in active:
+            points = changes[j] + step * np.arange(1, GOAL_SEEK_STEPS + 1)
+            points = points[points <= limit + 1e-12]
+            if len(points) == 0:
+                continue
+            block = np.repeat(changes[None, :], len(points), axis=0)
+            block[:, j] = points
+            spans.append((j, offset, points))
+            blocks.append(block)
+            offset += len(points)
+        if not blocks:
+            break
+        curve_scores = problem.overall(np.vstack(blocks))
+
+        # 2. Hull segments of all levers, best gain per cost first
+        segments = []
+        for j, offset, points in spans:
+            gains = curve_scores[offset:offset + len(points)] - current
+            costs = cost_per_pct[j] * (points - changes[j]) * 100
+            segments.extend((slope, j, points[i]) for slope, i in _hull_segments(costs, gains))
+        if not segments:
+            break
+        segments.sort(key=lambda segment: -segment[0])
+        plans = np.repeat(changes[None, :], len(segments), axis=0)
+        for k, (_, j, point) in enumerate(segments):
+            plans[k:, j] = point
+
+        # 3. Score the cumulative plans exactly
+        plan_scores = problem.overall(plans)
+        reaching = np.flatnonzero(plan_scores >= target)
+        if len(reaching):
+            k = int(reaching[0])
+            before = changes if k == 0 else plans[k - 1]
+            j = segments[k][1]
+            fine = np.repeat(plans[k][None, :], _REFINE_POINTS, axis=0)
+            fine[:, j] = np.linspace(before[j], plans[k, j], _REFINE_POINTS)
+            fine_scores = problem.overall(fine)
+            first = int(np.argmax(fine_scores >= target))
+            changes, current = fine[first], fine_scores[first]
+            changes, current = _trim(problem, changes, current, cost_per_pct, target)
+            break
+
+        best = int(np.argmax(plan_scores))
+        if plan_scores[best] <= current:
+            break
+        changes, current = plans[best], plan_scores[best]
+
+    deltas = {field: float(delta[0]) for field, delta in problem.deltas(changes[None, :]).items()}
+    adjusted = _apply(data, {field: delta for field, delta in deltas.items() if delta != 0})
+
+    lever_changes = []
+    for j, field in enumerate(levers):
+        if changes[j] == 0 or problem.base_values[j] == 0:
+            continue
+        base_value = problem.base_values[j]
+        new_value = base_value + deltas[field]
+        lever_changes.append(LeverChange(
+            field=field,
+            base_value=base_value,
+            new_value=round(new_value, 2),
+            change_pct=round((new_value - base_value) / abs(base_value) * 100, 2),
+            cost=round(cost_per_pct[j] * changes[j] * 100, 2),
+        ))
+
+    return GoalSeekResult(
+        target_score=target,
+        achieved=bool(current >= target),
+        base_score=calculate_health_score(calculate_ratios(data, prev_data), **compliance_flags(data)),
+        final_score=calculate_health_score(calculate_ratios(adjusted, prev_data), **compliance_flags(adjusted)),
+        changes=lever_changes,
+        total_cost=round(sum(c.cost for c in lever_changes), 2),
+        iterations=iterations,
+        adjusted_data=adjusted,
+    )
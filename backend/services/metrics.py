@@ -0,0 +1,264 @@
+"""
+In-process latency histograms and counters, exposed in Prometheus text format.
+Stage timers around the pipeline, per-endpoint request metrics and opt-in request profiling.
+"""
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services import profiler
+from utils.constants import METRICS_LATENCY_BUCKETS, METRICS_PREFIX
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# ── Metric types ───────────────────────────────────────────────────
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram per label set. ``observe`` is a bisect and
+    two additions under a lock, so it is cheap enough for every stage call.
+    """
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = METRICS_LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = sorted(buckets)
+        # labels → [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in sorted(self._series.items())]
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + [float("inf")], counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = _labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {repr(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class CacheStats:
+    """
+    Counts that caches keep for themselves, read from each registered
+    cache's ``stats()`` when the metrics are rendered: a counter family per
+    event and an entries gauge, labelled by cache name. Caches pay nothing
+    extra per lookup.
+    """
+
+    COUNTERS = {
+        "hits": "Cache lookups answered from the cache.",
+        "misses": "Cache lookups that had to compute the value.",
+        "evictions": "Cache entries dropped to stay within the size bound.",
+        "invalidations": "Times a whole cache was dropped because its inputs changed.",
+    }
+
+    def __init__(self, name: str):
+        self.name = name
+        self._caches: Dict[str, Callable[[], Dict[str, int]]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, cache: str, stats: Callable[[], Dict[str, int]]) -> None:
+        with self._lock:
+            self._caches[cache] = stats
+
+    def render(self) -> List[str]:
+        with self._lock:
+            caches = sorted(self._caches.items())
+        snapshot = [(cache, stats()) for cache, stats in caches]
+        lines = []
+        for key, help in self.COUNTERS.items():
+            name = f"{self.name}_{key}_total"
+            values = [(cache, stats[key]) for cache, stats in snapshot if key in stats]
+            if values:
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} counter"]
+                lines += [f'{name}{{cache="{_escape(cache)}"}} {_number(value)}' for cache, value in values]
+        name = f"{self.name}_entries"
+        lines += [f"# HELP {name} Entries held in the cache.", f"# TYPE {name} gauge"]
+        lines += [f'{name}{{cache="{_escape(cache)}"}} {_number(stats["size"])}' for cache, stats in snapshot]
+        return lines
+
+
+stage_seconds = Histogram(f"{METRICS_PREFIX}_stage_duration_seconds", "Time spent in one pipeline stage.", ["stage"])
+stage_errors = Counter(f"{METRICS_PREFIX}_stage_errors_total", "Pipeline stage calls that raised.", ["stage"])
+request_seconds = Histogram(f"{METRICS_PREFIX}_request_duration_seconds",
+                            "HTTP request latency, from receipt to the last response byte.", ["method", "route"])
+requests_total = Counter(f"{METRICS_PREFIX}_requests_total", "HTTP requests served.", ["method", "route", "status"])
+requests_in_progress = Gauge(f"{METRICS_PREFIX}_requests_in_progress", "HTTP requests being served.")
+cache_stats = CacheStats(f"{METRICS_PREFIX}_cache")
+
+METRICS = [stage_seconds, stage_errors, request_seconds, requests_total, requests_in_progress, cache_stats]
+
+
+def render() -> str:
+    """Every metric in Prometheus text exposition format 0.0.4."""
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+# ── Stage timers ───────────────────────────────────────────────────
+
+class stage:
+    """
+    Time a pipeline stage, as a context manager or a decorator::
+
+        with stage("calculate_ratios"):
+            ...
+
+    Wall-clock time is recorded, so a stage that awaits an executor counts
+    its queueing too. Exceptions are counted and re-raised.
+    """
+
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "stage":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        stage_seconds.observe(time.perf_counter() - self._start, self.name)
+        if exc_type is not None:
+            stage_errors.inc(self.name)
+
+    def __call__(self, fn):
+        name = self.name
+
+        def timed(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        timed.__name__ = fn.__name__
+        timed.__doc__ = fn.__doc__
+        timed.__wrapped__ = fn
+        return timed
+
+
+class InstrumentedJSONResponse(JSONResponse):
+    """Default response class: times JSON encoding of every endpoint response as the "serialize" stage."""
+
+    def render(self, content) -> bytes:
+        with stage("serialize"):
+            return super().render(content)
+
+
+# ── Request middleware ─────────────────────────────────────────────
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (request and response bodies pass straight
+    through, so streaming endpoints are unaffected) recording latency per
+    route template and status. When REQUEST_PROFILING=1, a request carrying
+    the PROFILE_HEADER header is sampled while it runs; with profiling off
+    the check costs one attribute lookup.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        session: Optional[profiler.ProfileSession] = None
+        if profiler.PROFILING_ENABLED and profiler.requested(scope):
+            session = profiler.start(scope)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if session is not None:
+                    message = {**message, "headers": [*message.get("headers", []), session.header()]}
+            await send(message)
+
+        requests_in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests_in_progress.dec()
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            request_seconds.observe(time.perf_counter() - start, scope["method"], path)
+            requests_total.inc(scope["method"], path, str(status))
+            if session is not None:
+                profiler.finish(session, path, status)
@@ -0,0 +1,227 @@
+"""
+Multi-year chain analysis.
+Scores every year of one or many companies in one vectorised pass and builds MultiYearAnalysis.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.financial_data import FinancialData, FullAnalysis, MultiYearAnalysis
+from models.financial_frame import FinancialFrame
+from services.analyzer import build_compliance, compliance_flags_batch, row_ratios, row_score
+from services.calculator import calculate_ratios_batch
+from services.recommender import evaluate_rules, render_recommendations, rule_columns
+from services.scorer import calculate_health_score_batch
+from utils.arrays import round_array
+from utils.constants import MULTI_YEAR_ROLLING_WINDOW, YOY_CHANGE_THRESHOLD_PCT
+
+# (metric, label, category, lower_is_better) — the rows of the dashboard's
+# year-over-year compare page, in the same order
+COMPARISON_METRICS = [
+    ("revenue_from_operations", "Revenue from Operations", "Revenue & Profitability", False),
+    ("gross_margin", "Gross Profit Margin", "Revenue & Profitability", False),
+    ("ebitda_margin", "EBITDA Margin", "Revenue & Profitability", False),
+    ("net_margin", "Net Profit Margin", "Revenue & Profitability", False),
+    ("roe", "Return on Equity (ROE)", "Revenue & Profitability", False),
+    ("roa", "Return on Assets (ROA)", "Revenue & Profitability", False),
+    ("roce", "ROCE", "Revenue & Profitability", False),
+    ("current_ratio", "Current Ratio", "Liquidity", False),
+    ("quick_ratio", "Quick Ratio", "Liquidity", False),
+    ("cash_ratio", "Cash Ratio", "Liquidity", False),
+    ("working_capital", "Net Working Capital", "Liquidity", False),
+    ("debt_to_equity", "Debt-to-Equity Ratio", "Leverage & Solvency", True),
+    ("debt_ratio", "Debt Ratio", "Leverage & Solvency", True),
+    ("interest_coverage", "Interest Coverage (ICR)", "Leverage & Solvency", False),
+    ("dscr", "DSCR", "Leverage & Solvency", False),
+    ("net_debt_to_ebitda", "Net Debt / EBITDA", "Leverage & Solvency", True),
+    ("dso", "Days Sales Outstanding (DSO)", "Efficiency", True),
+    ("dio", "Days Inventory Outstanding (DIO)", "Efficiency", True),
+    ("dpo", "Days Payable Outstanding (DPO)", "Efficiency", False),
+    ("ccc", "Cash Conversion Cycle (CCC)", "Efficiency", True),
+    ("asset_turnover", "Asset Turnover", "Efficiency", False),
+    ("inventory_turnover", "Inventory Turnover", "Efficiency", False),
+    ("operating_cf", "Operating Cash Flow (OCF)", "Cash Flow", False),
+    ("fcf", "Free Cash Flow (FCF)", "Cash Flow", False),
+    ("ocf_margin", "OCF Margin", "Cash Flow", False),
+]
+
+
+# ── Chained time-series helpers ────────────────────────────────────
+# Rows are company-years sorted by (company, year); ``has_prev`` is False on
+# the first year of each company. Every helper works along the last axis,
+# so a (metrics × rows) block is handled in one call, in O(rows).
+
+def chain_prev(frame: FinancialFrame) -> FinancialFrame:
+    """Row-aligned prior-year rows (row i → row i-1; meaningless where ``has_prev`` is False)."""
+    return frame.take(np.maximum(np.arange(len(frame)) - 1, 0))
+
+
+def group_starts(has_prev: np.ndarray) -> np.ndarray:
+    """Index of the first year of each row's company."""
+    rows = np.arange(len(has_prev))
+    return np.maximum.accumulate(np.where(has_prev, 0, rows))
+
+
+def _shift(values: np.ndarray) -> np.ndarray:
+    shifted = np.empty_like(values)
+    shifted[..., 0] = np.nan
+    shifted[..., 1:] = values[..., :-1]
+    return shifted
+
+
+def yoy_change_pct(values: np.ndarray, has_prev: np.ndarray) -> np.ndarray:
+    """% change on the prior year, against |prior| like the compare page; NaN without one."""
+    prev = _shift(values)
+    ok = has_prev & (prev != 0) & ~np.isnan(prev) & ~np.isnan(values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ok, (values - prev) / np.abs(prev) * 100, np.nan)
+
+
+def rolling_mean(values: np.ndarray, has_prev: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over up to ``window`` years of the same company, skipping NaN."""
+    # One shifted add per lag rather than a cumsum difference, so a row's
+    # mean never picks up rounding error from other companies' rows
+    rows = np.arange(values.shape[-1])
+    starts = group_starts(has_prev)
+    total = np.zeros(values.shape)
+    count = np.zeros(values.shape)
+    for lag in range(window):
+        source = rows - lag
+        valid = source >= starts
+        lagged = values[..., np.maximum(source, 0)]
+        use = valid & ~np.isnan(lagged)
+        total += np.where(use, lagged, 0.0)
+        count += use
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def cagr_pct(values: np.ndarray, has_prev: np.ndarray) -> np.ndarray:
+    """Compound annual growth from the company's first year to each row; NaN unless both ends are positive."""
+    starts = group_starts(has_prev)
+    periods = np.arange(values.shape[-1]) - starts
+    first = values[..., starts]
+    ok = (periods > 0) & (first > 0) & (values > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = np.power(np.where(ok, values / first, 1.0), 1 / np.maximum(periods, 1))
+    return np.where(ok, (growth - 1) * 100, np.nan)
+
+
+# ── Analysis ───────────────────────────────────────────────────────
+
+def _optional(values: np.ndarray) -> List[Optional[float]]:
+    return [None if v != v else v for v in values.tolist()]
+
+
+def _narrative(
+    values: np.ndarray, has_prev: np.ndarray, row: int,
+) -> Tuple[List[str], List[str]]:
+    """Latest-year improvements / deteriorations, worded like the compare page."""
+    improvements: List[str] = []
+    deteriorations: List[str] = []
+    if not has_prev[row]:
+        return improvements, deteriorations
+    current, previous = values[:, row], values[:, row - 1]
+    for (_, label, _, lower_is_better), cur, prev in zip(COMPARISON_METRICS, current, previous):
+        if cur != cur or prev != prev or prev == 0:
+            continue
+        delta = cur - prev
+        pct = abs(delta / abs(prev)) * 100
+        if pct < YOY_CHANGE_THRESHOLD_PCT:
+            continue
+        if (delta < 0) if lower_is_better else (delta > 0):
+            improvements.append(f"{label} improved by {pct:.1f}%")
+        else:
+            deteriorations.append(f"{label} deteriorated by {pct:.1f}%")
+    return improvements, deteriorations
+
+
+def chain_analysis(
+    frame: FinancialFrame,
+    has_prev: np.ndarray,
+    records: Optional[Sequence[FinancialData]] = None,
+) -> List[MultiYearAnalysis]:
+    """
+    One MultiYearAnalysis per company of a (company, year)-sorted frame.
+
+    Every year's ratios (with two-year averages against the row before),
+    scores and rule masks come from single batched passes over all rows,
+    so cost is linear in the number of company-years. Each year's
+    FullAnalysis matches ``analyze(year, previous_year)``.
+    """
+    has_prev = np.asarray(has_prev, dtype=bool)
+    n = len(frame)
+    prev_frame = chain_prev(frame)
+
+    ratios = calculate_ratios_batch(frame, prev_frame, has_prev)
+    flags = compliance_flags_batch(frame)
+    scores = calculate_health_score_batch(ratios, **flags)
+    # analyze() reports the prior year's standalone ratios (no averaging)
+    standalone = calculate_ratios_batch(frame)
+    prev_ratios = {name: np.where(has_prev, _shift(column), np.nan) for name, column in standalone.items()}
+    columns = rule_columns(ratios, frame, prev_ratios)
+    fired = evaluate_rules(columns)
+
+    metrics = np.vstack([
+        ratios[name] if name in ratios else frame[name] for name, _, _, _ in COMPARISON_METRICS
+    ]).astype(np.float64)
+    yoy = round_array(yoy_change_pct(metrics, has_prev), 2)
+    rolling = round_array(rolling_mean(metrics, has_prev, MULTI_YEAR_ROLLING_WINDOW), 2)
+    cagr = round_array(cagr_pct(metrics, has_prev), 2)
+
+    flag_rows = {name: column.tolist() for name, column in flags.items()}
+    results = []
+    starts = np.flatnonzero(~has_prev) if n else np.array([], dtype=int)
+    for start, end in zip(starts, list(starts[1:]) + [n]):
+        analyses = []
+        for row in range(start, end):
+            data = records[row] if records is not None else frame.record(row)
+            analyses.append(FullAnalysis(
+                financial_data=data,
+                ratios=row_ratios(ratios, row),
+                health_score=row_score(scores, row),
+                recommendations=render_recommendations(columns, fired, row),
+                compliance=build_compliance(data, {name: flag_rows[name][row] for name in flag_rows}),
+                previous_year_ratios=row_ratios(standalone, row - 1) if has_prev[row] else None,
+            ))
+
+        rows = slice(start, end)
+        table = [
+            {
+                "metric": name,
+                "label": label,
+                "category": category,
+                "lower_is_better": lower_is_better,
+                "values": _optional(metrics[m, rows]),
+                "yoy_change_pct": _optional(yoy[m, rows]),
+                "rolling_average": _optional(rolling[m, rows]),
+                "cagr_pct": _optional(cagr[m, end - 1:end])[0],
+            }
+            for m, (name, label, category, lower_is_better) in enumerate(COMPARISON_METRICS)
+        ]
+        improvements, deteriorations = _narrative(metrics, has_prev, end - 1)
+        results.append(MultiYearAnalysis(
+            years=frame.financial_years[rows].tolist(),
+            analyses=analyses,
+            comparison_table=table,
+            improvements=improvements,
+            deteriorations=deteriorations,
+        ))
+    return results
+
+
+def multi_year_analysis(records: Sequence[FinancialData]) -> MultiYearAnalysis:
+    """Chain analysis of one company's years, given oldest first."""
+    if not records:
+        raise ValueError("At least one year of data is required")
+    frame = FinancialFrame.from_records(records)
+    return chain_analysis(frame, np.arange(len(records)) > 0, records)[0]
+
+
+def multi_year_frame(frame: FinancialFrame) -> Dict[str, MultiYearAnalysis]:
+    """Chain analysis of every company in a frame, keyed by company name."""
+    frame = frame.sort_by_company()
+    has_prev = np.zeros(len(frame), dtype=bool)
+    has_prev[1:] = frame.company_names[1:] == frame.company_names[:-1]
+    analyses = chain_analysis(frame, has_prev)
+    return {analysis.analyses[0].financial_data.company_name: analysis for analysis in analyses}
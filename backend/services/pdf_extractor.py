@@ -0,0 +1,258 @@
+"""
+PDF statement extraction.
+Finds the balance sheet, P&L and cash-flow pages cheaply, then runs table extraction on those pages only.
+"""
+import hashlib
+import io
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import BinaryIO, Dict, List, Optional, Sequence, Tuple, Union
+
+import pdfplumber
+import pypdfium2 as pdfium
+
+from models.financial_data import PdfExtraction, PdfPage
+from services import metrics
+from services.excel_parser import REQUIRED_FIELDS, year_data
+from services.executor import worker_pool
+from utils.constants import (
+    PDF_MAX_STATEMENT_PAGES, PDF_MIN_PAGE_SCORE, PDF_TABLE_CACHE_SIZE, PDF_WORKERS,
+)
+from utils.line_items import find_line_item, match_line_item, note_column, row_amounts
+
+# Headings that mark a statement page (matched on lower-cased page text)
+STATEMENT_HEADINGS = {
+    "balance_sheet": ["balance sheet", "statement of financial position", "equity and liabilities"],
+    "profit_loss": ["statement of profit and loss", "profit and loss account", "profit & loss",
+                    "income statement"],
+    "cash_flow": ["cash flow statement", "statement of cash flows", "cash flows from operating activities"],
+}
+# A heading counts for this many line-item hits when scoring a page
+HEADING_WEIGHT = 5
+
+_AMOUNT_TOKEN = re.compile(r"^(?:\(?-?₹?\s?[\d,]+(?:\.\d+)?\)?|[-–—])$")
+
+# page rows: each a list of cell strings (None for empty cells)
+PageRows = List[List[Optional[str]]]
+
+
+# ── Page table cache ───────────────────────────────────────────────
+
+class PageTableCache:
+    """Bounded LRU of extracted table rows, keyed by (file hash, page number)."""
+
+    def __init__(self, maxsize: int = PDF_TABLE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, int], PageRows]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_hash: str, page: int) -> Optional[PageRows]:
+        with self._lock:
+            rows = self._entries.get((file_hash, page))
+            if rows is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((file_hash, page))
+            self.hits += 1
+            return rows
+
+    def put(self, file_hash: str, page: int, rows: PageRows) -> None:
+        with self._lock:
+            self._entries[(file_hash, page)] = rows
+            self._entries.move_to_end((file_hash, page))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+page_cache = PageTableCache()
+metrics.cache_stats.register("pdf_page", page_cache.stats)
+
+
+def file_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+# ── Page scoring ───────────────────────────────────────────────────
+
+def text_line_row(line: str) -> List[str]:
+    """Split a text line into [label, amount, amount, ...] using its trailing amount tokens."""
+    tokens = line.split()
+    end = len(tokens)
+    while end > 0 and _AMOUNT_TOKEN.match(tokens[end - 1]):
+        end -= 1
+    amounts = tokens[end:]
+    # A note reference in front of the amounts reads as one more number
+    if len(amounts) > 2:
+        amounts = amounts[-2:]
+    return [" ".join(tokens[:end])] + amounts
+
+
+def score_page(text: str) -> Tuple[Optional[str], int]:
+    """Which statement a page most likely holds, and how strongly: headings plus recognised line-item labels."""
+    lowered = text.lower()
+    best, best_hits = None, 0
+    for statement, headings in STATEMENT_HEADINGS.items():
+        hits = sum(heading in lowered for heading in headings)
+        if hits > best_hits:
+            best, best_hits = statement, hits
+    # pdfium may put a row's amounts on their own line, so labels count alone
+    items = 0
+    for line in text.splitlines():
+        label = text_line_row(line)[0]
+        if label and match_line_item(label) is not None:
+            items += 1
+    return best, best_hits * HEADING_WEIGHT + items
+
+
+def _page_texts(data: bytes) -> List[str]:
+    """Plain text of every page from pdfium — no layout analysis, a few ms per page."""
+    try:
+        document = pdfium.PdfDocument(data)
+    except pdfium.PdfiumError as e:
+        raise ValueError(f"Not a readable PDF: {e}")
+    try:
+        texts = []
+        for index in range(len(document)):
+            page = document[index]
+            textpage = page.get_textpage()
+            texts.append(textpage.get_text_range())
+            textpage.close()
+            page.close()
+        return texts
+    finally:
+        document.close()
+
+
+def select_statement_pages(texts: Sequence[str]) -> List[Tuple[int, Optional[str], int]]:
+    """(page index, statement, score) of the best-scoring pages, in page order."""
+    scored = [(index,) + score_page(text) for index, text in enumerate(texts)]
+    candidates = [page for page in scored if page[2] >= PDF_MIN_PAGE_SCORE]
+    candidates.sort(key=lambda page: -page[2])
+    return sorted(candidates[:PDF_MAX_STATEMENT_PAGES])
+
+
+# ── Table extraction ───────────────────────────────────────────────
+
+def _page_rows(page) -> PageRows:
+    """Table rows of one pdfplumber page; falls back to text lines when it has no ruled tables."""
+    rows: PageRows = [row for table in page.extract_tables() for row in table]
+    if not any(find_line_item(row)[1] for row in rows):
+        rows = [text_line_row(line) for line in (page.extract_text() or "").splitlines()]
+    return rows
+
+
+def _extract_pages(args: Tuple[bytes, List[int]]) -> List[Tuple[int, PageRows, float]]:
+    """Pool task: open the PDF once and extract the given pages — (page index, rows, ms) each."""
+    data, indexes = args
+    out = []
+    with pdfplumber.open(io.BytesIO(data), pages=[index + 1 for index in indexes]) as pdf:
+        for index, page in zip(indexes, pdf.pages):
+            start = time.perf_counter()
+            rows = _page_rows(page)
+            out.append((index, rows, (time.perf_counter() - start) * 1000))
+            page.flush_cache()
+    return out
+
+
+def _extract(data: bytes, indexes: List[int], workers: int) -> List[Tuple[int, PageRows, float]]:
+    if workers <= 1 or len(indexes) <= 1:
+        return _extract_pages((data, indexes))
+    groups = [indexes[i::workers] for i in range(min(workers, len(indexes)))]
+    tasks = [(data, group) for group in groups]
+    return [item for group in worker_pool("pdf", workers).map(_extract_pages, tasks) for item in group]
+
+
+# ── Entry point ────────────────────────────────────────────────────
+
+def _read(source: Union[str, bytes, BinaryIO]) -> bytes:
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return f.read()
+    return source.read()
+
+
+def parse_pdf(
+    source: Union[str, bytes, BinaryIO],
+    cache: PageTableCache = page_cache,
+    workers: int = PDF_WORKERS,
+) -> PdfExtraction:
+    """
+    Extract current- and prior-year financials from a statement PDF.
+
+    Every page is scored from pdfium's raw text (statement headings and
+    recognised line items), and pdfplumber's table extraction — the slow
+    part — runs only on the top pages, spread over a process pool. Table
+    rows are cached per (file hash, page), so re-uploading a file skips
+    extraction entirely.
+    """
+    start = time.perf_counter()
+    data = _read(source)
+    digest = file_hash(data)
+
+    scan_start = time.perf_counter()
+    texts = _page_texts(data)
+    selected = select_statement_pages(texts)
+    scan_ms = (time.perf_counter() - scan_start) * 1000
+
+    rows_by_page: Dict[int, PageRows] = {}
+    extract_ms: Dict[int, float] = {}
+    for index, _, _ in selected:
+        rows = cache.get(digest, index)
+        if rows is not None:
+            rows_by_page[index] = rows
+    missing = [index for index, _, _ in selected if index not in rows_by_page]
+    for index, rows, ms in _extract(data, missing, workers) if missing else []:
+        rows_by_page[index] = rows
+        extract_ms[index] = ms
+        cache.put(digest, index, rows)
+
+    values: Dict[str, List[float]] = {}
+    matched: Dict[str, str] = {}
+    pages = []
+    for index, statement, score in selected:
+        rows = rows_by_page[index]
+        note_col = None
+        for row in rows:
+            if note_col is None:
+                note_col = note_column(row)
+            col, field = find_line_item(row)
+            if field is None or field in values:
+                continue
+            amounts = row_amounts(row, col, note_col)
+            if amounts:
+                values[field] = amounts
+                matched[field] = f"page {index + 1}"
+        pages.append(PdfPage(
+            page=index + 1,
+            statement=statement,
+            score=score,
+            rows=len(rows),
+            cached=index not in extract_ms,
+            extract_ms=round(extract_ms.get(index, 0.0), 2),
+        ))
+
+    has_prior = any(len(amounts) > 1 for amounts in values.values())
+    return PdfExtraction(
+        financial_data=year_data(values, 0),
+        previous_year_data=year_data(values, 1) if has_prior else None,
+        matched_fields=matched,
+        missing_fields=sorted(REQUIRED_FIELDS.difference(values)),
+        page_count=len(texts),
+        statement_pages=pages,
+        scan_ms=round(scan_ms, 2),
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+    )
@@ -0,0 +1,302 @@
+"""
+Normalized analysis storage.
+Writes each session's inputs, ratios, scores and rule codes as indexed rows, and backfills old JSON-only sessions.
+"""
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models.database import (
+    NORMALIZED_TABLES, RATIO_FIELDS, SCORE_FIELDS, AnalysisSession, SessionFinancials, SessionRatios,
+    SessionRecommendation, SessionScores,
+)
+from models.financial_data import FinancialData, FullAnalysis
+from models.financial_frame import INPUT_FIELDS, FinancialFrame
+from services.analyzer import analyze
+from services.executor import run_stage
+from services.metrics import stage
+from services.recommender import RECOMMENDATION_RULES, evaluate_rules, rule_columns
+from utils.constants import DB_BULK_CHUNK_SIZE, NORMALIZED_BACKFILL_CHUNK_SIZE
+
+SCREEN_OPERATORS = {
+    "<": lambda column, value: column < value,
+    "<=": lambda column, value: column <= value,
+    ">": lambda column, value: column > value,
+    ">=": lambda column, value: column >= value,
+    "==": lambda column, value: column == value,
+}
+
+
+# ── Row building ───────────────────────────────────────────────────
+
+def _ratio_columns(ratios: Sequence) -> Dict[str, np.ndarray]:
+    return {
+        name: np.array([np.nan if r is None or getattr(r, name) is None else getattr(r, name) for r in ratios])
+        for name in RATIO_FIELDS
+    }
+
+
+def _nullable(value: float) -> Optional[float]:
+    return None if value != value else value
+
+
+def normalized_rows(items: Sequence[Tuple[str, FullAnalysis]]) -> Dict[type, List[dict]]:
+    """
+    Insert-ready rows for every normalized table, for many sessions at once.
+
+    Ratios and scores are taken as stored in each analysis. Recommendation
+    codes are re-derived by running the rule predicates over the stored
+    ratios in one batch, since rendered recommendations carry no code.
+    """
+    if not items:
+        return {table: [] for table in NORMALIZED_TABLES}
+    analyses = [analysis for _, analysis in items]
+    frame = FinancialFrame.from_records([a.financial_data for a in analyses])
+    ratios = _ratio_columns([a.ratios for a in analyses])
+    has_prev = any(a.previous_year_ratios is not None for a in analyses)
+    prev_ratios = _ratio_columns([a.previous_year_ratios for a in analyses]) if has_prev else None
+    fired = evaluate_rules(rule_columns(ratios, frame, prev_ratios))
+
+    inputs = {name: frame[name].tolist() for name in INPUT_FIELDS}
+    ratio_values = {name: column.tolist() for name, column in ratios.items()}
+    rows: Dict[type, List[dict]] = {table: [] for table in NORMALIZED_TABLES}
+    for i, (session_id, analysis) in enumerate(items):
+        key = {
+            "session_id": session_id,
+            "company_name": analysis.financial_data.company_name,
+            "financial_year": analysis.financial_data.financial_year,
+        }
+        rows[SessionFinancials].append({**key, **{name: inputs[name][i] for name in INPUT_FIELDS}})
+        rows[SessionRatios].append({**key, **{name: _nullable(ratio_values[name][i]) for name in RATIO_FIELDS}})
+        score = analysis.health_score
+        rows[SessionScores].append({
+            **key, **{name: getattr(score, name) for name in SCORE_FIELDS}, "zone": score.zone,
+        })
+        for r in np.flatnonzero(fired[:, i]):
+            rule = RECOMMENDATION_RULES[r]
+            rows[SessionRecommendation].append({**key, "code": rule.code, "priority": rule.priority})
+    return rows
+
+
+def _write_normalized(db: Session, items: Sequence[Tuple[str, FullAnalysis]]) -> None:
+    session_ids = [session_id for session_id, _ in items]
+    for table in NORMALIZED_TABLES:
+        db.execute(delete(table).where(table.session_id.in_(session_ids)))
+    for table, rows in normalized_rows(items).items():
+        if rows:
+            db.execute(insert(table), rows)
+
+
+# ── Writing ────────────────────────────────────────────────────────
+
+def _session_fields(analysis: FullAnalysis, raw_data: Optional[FinancialData] = None) -> dict:
+    """AnalysisSession column values (the JSON blobs included) for one analysis."""
+    data = raw_data or analysis.financial_data
+    with stage("serialize"):
+        return {
+            "company_name": data.company_name,
+            "financial_year": data.financial_year,
+            "raw_data_json": data.model_dump_json(),
+            "analysis_json": analysis.model_dump_json(),
+            "updated_at": datetime.utcnow(),
+        }
+
+
+def save_analysis(
+    db: Session,
+    session_id: str,
+    analysis: FullAnalysis,
+    raw_data: Optional[FinancialData] = None,
+) -> None:
+    """Store an analysis as its JSON blobs and as normalized rows, in one transaction."""
+    fields = _session_fields(analysis, raw_data)
+    with stage("db_write"):
+        record = db.get(AnalysisSession, session_id)
+        if record is None:
+            record = AnalysisSession(id=session_id)
+            db.add(record)
+        for name, value in fields.items():
+            setattr(record, name, value)
+        db.flush()
+        _write_normalized(db, [(session_id, analysis)])
+        db.commit()
+
+
+def _session_writes(
+    session_id: str,
+    analysis: FullAnalysis,
+    raw_data: Optional[FinancialData] = None,
+) -> Tuple[dict, Dict[type, List[dict]]]:
+    return _session_fields(analysis, raw_data), normalized_rows([(session_id, analysis)])
+
+
+async def save_analysis_async(
+    db: AsyncSession,
+    session_id: str,
+    analysis: FullAnalysis,
+    raw_data: Optional[FinancialData] = None,
+) -> None:
+    """
+    ``save_analysis`` over the async driver. The JSON blobs and normalized
+    rows are built on the "db" stage pool; only the statements themselves
+    run on the event loop, awaiting aiosqlite.
+    """
+    fields, rows = await run_stage("db", _session_writes, session_id, analysis, raw_data)
+    with stage("db_write"):
+        record = await db.get(AnalysisSession, session_id)
+        if record is None:
+            record = AnalysisSession(id=session_id)
+            db.add(record)
+        for name, value in fields.items():
+            setattr(record, name, value)
+        await db.flush()
+        for table in NORMALIZED_TABLES:
+            await db.execute(delete(table).where(table.session_id == session_id))
+        for table, table_rows in rows.items():
+            if table_rows:
+                await db.execute(insert(table), table_rows)
+        await db.commit()
+
+
+def save_analyses(
+    db: Session,
+    items: Iterable[Tuple[str, FullAnalysis]],
+    chunk_size: int = DB_BULK_CHUNK_SIZE,
+) -> int:
+    """
+    Bulk form of ``save_analysis`` for batch runs: ``(session_id, analysis)``
+    pairs are written ``chunk_size`` at a time, each chunk as executemany
+    statements in a single transaction. Returns the number saved.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    items = iter(items)
+    saved = 0
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            return saved
+        now = datetime.utcnow()
+        records = [
+            {
+                "id": session_id,
+                "company_name": analysis.financial_data.company_name,
+                "financial_year": analysis.financial_data.financial_year,
+                "raw_data_json": analysis.financial_data.model_dump_json(),
+                "analysis_json": analysis.model_dump_json(),
+                "updated_at": now,
+            }
+            for session_id, analysis in chunk
+        ]
+        existing = set(db.scalars(
+            select(AnalysisSession.id).where(AnalysisSession.id.in_([r["id"] for r in records]))
+        ))
+        new = [{**r, "created_at": now} for r in records if r["id"] not in existing]
+        if new:
+            db.execute(insert(AnalysisSession), new)
+        if existing:
+            db.execute(update(AnalysisSession), [r for r in records if r["id"] in existing])
+        _write_normalized(db, chunk)
+        db.commit()
+        saved += len(chunk)
+
+
+def _blob_analysis(record: AnalysisSession) -> Optional[FullAnalysis]:
+    """The session's analysis from its blobs — re-run from the raw inputs if only those were kept."""
+    try:
+        if record.analysis_json:
+            return FullAnalysis.model_validate_json(record.analysis_json)
+        if record.raw_data_json:
+            return analyze(FinancialData.model_validate_json(record.raw_data_json))
+    except (ValidationError, ValueError, json.JSONDecodeError):
+        return None
+    return None
+
+
+def backfill_normalized(
+    db: Session,
+    chunk_size: int = NORMALIZED_BACKFILL_CHUNK_SIZE,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, int]:
+    """
+    Migrate sessions that only have JSON blobs into the normalized tables.
+
+    Sessions are walked in id order, ``chunk_size`` at a time, one
+    transaction per chunk, so the migration can be interrupted and re-run:
+    sessions that already have a score row are skipped. Blobs that no
+    longer parse are counted and left alone. ``progress(migrated, skipped)``
+    is called after each chunk.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    migrated = skipped = 0
+    last_id = ""
+    while True:
+        records = db.scalars(
+            select(AnalysisSession)
+            .outerjoin(SessionScores, SessionScores.session_id == AnalysisSession.id)
+            .where(SessionScores.session_id.is_(None), AnalysisSession.id > last_id)
+            .order_by(AnalysisSession.id)
+            .limit(chunk_size)
+        ).all()
+        if not records:
+            break
+        last_id = records[-1].id
+        items = []
+        for record in records:
+            analysis = _blob_analysis(record)
+            if analysis is None:
+                skipped += 1
+            else:
+                items.append((record.id, analysis))
+        if items:
+            _write_normalized(db, items)
+        db.commit()
+        db.expunge_all()
+        migrated += len(items)
+        if progress is not None:
+            progress(migrated, skipped)
+    return {"migrated": migrated, "skipped": skipped}
+
+
+# ── Portfolio queries ──────────────────────────────────────────────
+
+def screen_ratio(
+    db: Session,
+    ratio: str,
+    op: str,
+    value: float,
+    financial_year: Optional[str] = None,
+) -> List[dict]:
+    """Sessions whose ``ratio`` satisfies ``op value`` — an index range scan on (financial_year, ratio)."""
+    if ratio not in RATIO_FIELDS:
+        raise ValueError(f"Unknown ratio '{ratio}'")
+    if op not in SCREEN_OPERATORS:
+        raise ValueError(f"Unknown operator '{op}' (expected one of {', '.join(SCREEN_OPERATORS)})")
+    column = getattr(SessionRatios, ratio)
+    query = select(
+        SessionRatios.session_id, SessionRatios.company_name, SessionRatios.financial_year, column,
+    ).where(SCREEN_OPERATORS[op](column, value))
+    if financial_year is not None:
+        query = query.where(SessionRatios.financial_year == financial_year)
+    return [
+        {"session_id": s, "company_name": c, "financial_year": y, ratio: v}
+        for s, c, y, v in db.execute(query.order_by(column))
+    ]
+
+
+def sessions_with_recommendation(db: Session, code: str, financial_year: Optional[str] = None) -> List[dict]:
+    """Sessions on which the rule ``code`` fired."""
+    query = select(
+        SessionRecommendation.session_id, SessionRecommendation.company_name, SessionRecommendation.financial_year,
+    ).where(SessionRecommendation.code == code)
+    if financial_year is not None:
+        query = query.where(SessionRecommendation.financial_year == financial_year)
+    return [{"session_id": s, "company_name": c, "financial_year": y} for s, c, y in db.execute(query)]
@@ -0,0 +1,41 @@
+"""
+Background import of the heavy parser modules once the app is serving.
+Keeps openpyxl / pdfplumber off the startup path without making the first upload pay for them.
+"""
+import importlib
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+from utils.constants import PRELOAD_DELAY_S, PRELOAD_MODULES
+
+# On unless PRELOAD_PARSERS=0, e.g. for workers that never see uploads
+PRELOAD_ENABLED = os.getenv("PRELOAD_PARSERS", "1") == "1"
+
+
+def preload(modules: Sequence[str] = PRELOAD_MODULES) -> Dict[str, Optional[float]]:
+    """Import ``modules``: seconds per module, None for one that failed to import."""
+    preloaded: Dict[str, Optional[float]] = {}
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            preloaded[name] = time.perf_counter() - start
+        except ImportError as e:
+            # A missing optional parser only disables its upload route
+            preloaded[name] = None
+            print(f"preload: could not import {name}: {e}", file=sys.stderr)
+    return preloaded
+
+
+def start_preload(delay: float = PRELOAD_DELAY_S) -> Optional[threading.Timer]:
+    """Import PRELOAD_MODULES on a daemon thread after ``delay`` seconds (so first probes are answered first)."""
+    if not PRELOAD_ENABLED:
+        return None
+    timer = threading.Timer(delay, preload)
+    timer.name = "preload"
+    timer.daemon = True
+    timer.start()
+    return timer
@@ -0,0 +1,190 @@
+"""
+Opt-in sampling profiler for individual requests.
+Samples the flagged request's own Python stacks while it runs and keeps collapsed stacks for flame graphs.
+"""
+import asyncio
+import contextvars
+import functools
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.types import Scope
+
+from utils.constants import PROFILE_HEADER, PROFILE_INTERVAL_S, PROFILE_KEEP, PROFILE_MAX_DEPTH
+
+# Off unless REQUEST_PROFILING=1: the header alone must not let any client start a sampler thread
+PROFILING_ENABLED = os.getenv("REQUEST_PROFILING", "0") == "1"
+
+_HEADER = PROFILE_HEADER.lower().encode("latin-1")
+
+# The session of the request being handled, seen by everything the request's task awaits
+_active: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar("profile_session", default=None)
+
+
+def requested(scope: Scope) -> bool:
+    return any(name == _HEADER and value not in (b"", b"0") for name, value in scope["headers"])
+
+
+class ProfileSession:
+    """
+    One sampling thread for one request: ``stack → samples`` in collapsed
+    (flame graph) form.
+
+    Only the request's own work is sampled: the event-loop thread while the
+    request's task is the one running on it, and executor threads while
+    they run a call the request submitted (see ``bind``). Concurrent
+    requests and idle workers never show up. Work handed on to a process
+    pool (PDF page extraction, stress-test chunks) is not sampled.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, method: str, path: str, interval: float = PROFILE_INTERVAL_S):
+        self.id = f"{os.getpid()}-{next(self._ids)}"
+        self.method = method
+        self.path = path
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started = time.time()
+        self.seconds = 0.0
+        self.route = ""
+        self.status = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop_thread = threading.get_ident()
+        self._workers: Counter = Counter()        # executor thread id → calls running for this request
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampler", daemon=True)
+        self._token: Optional[contextvars.Token] = None
+
+    def header(self) -> Tuple[bytes, bytes]:
+        return b"x-profile-id", self.id.encode()
+
+    def _enter_worker(self) -> None:
+        with self._lock:
+            self._workers[threading.get_ident()] += 1
+
+    def _exit_worker(self) -> None:
+        with self._lock:
+            ident = threading.get_ident()
+            self._workers[ident] -= 1
+            if not self._workers[ident]:
+                del self._workers[ident]
+
+    def _threads(self) -> List[int]:
+        with self._lock:
+            threads = list(self._workers)
+        if self._task is not None and asyncio.current_task(self._loop) is self._task:
+            threads.append(self._loop_thread)
+        return threads
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            threads = self._threads()
+            frames = sys._current_frames()
+            stacks = []
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                names: List[str] = []
+                while frame is not None and len(names) < PROFILE_MAX_DEPTH:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                if names:
+                    stacks.append(";".join(reversed(names)))
+            with self._lock:
+                # finish() may have run while this sample was taken; a finished profile never changes
+                if self._stop.is_set():
+                    return
+                self.stacks.update(stacks)
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        """``frame;frame;... count`` lines, heaviest first: input for flamegraph.pl or speedscope."""
+        with self._lock:
+            stacks = self.stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started": self.started,
+            "seconds": round(self.seconds, 4),
+            "samples": self.samples,
+            "interval_s": self.interval,
+        }
+
+
+_profiles: "OrderedDict[str, ProfileSession]" = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def start(scope: Scope) -> ProfileSession:
+    """Start sampling the calling request's task (call from inside it, on the event loop)."""
+    session = ProfileSession(scope["method"], scope["path"])
+    session._loop = asyncio.get_running_loop()
+    session._task = asyncio.current_task()
+    session._token = _active.set(session)
+    session._thread.start()
+    return session
+
+
+def finish(session: ProfileSession, route: str, status: int) -> None:
+    """
+    Stop sampling and keep the profile. The sampler thread is only told to
+    stop, never joined, so the event loop does not wait out its interval.
+    """
+    with session._lock:
+        session._stop.set()
+    if session._token is not None:
+        _active.reset(session._token)
+        session._token = None
+    session.seconds = time.time() - session.started
+    session.route = route
+    session.status = status
+    with _profiles_lock:
+        _profiles[session.id] = session
+        while len(_profiles) > PROFILE_KEEP:
+            _profiles.popitem(last=False)
+
+
+def bind(fn: Callable) -> Callable:
+    """
+    ``fn``, marked so the executor thread that runs it is sampled as part
+    of the current request's profile; ``fn`` itself when nothing is being
+    profiled. Used by the executor for thread-pool stages.
+    """
+    session = _active.get()
+    if session is None:
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        session._enter_worker()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            session._exit_worker()
+    return run
+
+
+def recent() -> List[Dict[str, object]]:
+    """Summaries of the kept profiles, newest first."""
+    with _profiles_lock:
+        return [session.summary() for session in reversed(_profiles.values())]
+
+
+def get(profile_id: str) -> Optional[ProfileSession]:
+    with _profiles_lock:
+        return _profiles.get(profile_id)
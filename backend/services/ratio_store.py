@@ -0,0 +1,246 @@
+"""
+Memory-mapped columnar store of ratios and scores for whole portfolios.
+One append-only array file per field plus interned company / year ids; readers map columns lazily.
+"""
+import json
+import os
+import threading
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from models.financial_data import FinancialRatios, FullAnalysis, HealthScoreBreakdown
+from models.financial_frame import FinancialFrame
+from services.analyzer import score_batch
+from services.multi_year import chain_prev
+from utils.constants import HEALTH_ZONES, RATIO_STORE_DIRNAME
+
+STORE_VERSION = 1
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RATIO_STORE_DIR = os.getenv("RATIO_STORE_DIR", os.path.join(BASE_DIR, RATIO_STORE_DIRNAME))
+
+RATIO_COLUMNS = list(FinancialRatios.model_fields)
+SCORE_COLUMNS = [f for f in HealthScoreBreakdown.model_fields if f not in ("zone", "zone_color")]
+
+# column → dtype; every column file is a raw little-endian array of `rows` items
+COLUMN_DTYPES: Dict[str, str] = {
+    "company_id": "<u4",
+    "year_id": "<u2",
+    **{name: "<f8" for name in RATIO_COLUMNS},
+    **{"score_" + name: "<f8" for name in SCORE_COLUMNS},
+    "zone": "u1",                    # index into HEALTH_ZONES
+}
+
+_ZONE_INDEX = {zone[2]: i for i, zone in enumerate(HEALTH_ZONES)}
+
+
+class RatioStore:
+    """
+    Append-only columnar store in a directory.
+
+    ``meta.json`` holds the committed row count and is replaced atomically
+    after each append, so readers in other processes never see a partial
+    batch — anything past the committed count is ignored and overwritten by
+    the next append. Columns are opened as read-only ``np.memmap`` on first
+    access: opening a store reads only ``meta.json``, pages come in through
+    the OS page cache, and any number of processes share them without
+    copying. A store has one writer at a time.
+    """
+
+    def __init__(self, path: str, create: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._maps: Dict[str, np.ndarray] = {}
+        self._names: Optional[List[str]] = None
+        self._years: Optional[List[str]] = None
+        self._name_index: Optional[Dict[str, int]] = None
+        if not os.path.exists(self._file("meta.json")):
+            if not create:
+                raise ValueError(f"No ratio store at {path}")
+            os.makedirs(path, exist_ok=True)
+            self._meta = {"version": STORE_VERSION, "rows": 0, "companies": 0, "years": 0,
+                          "columns": COLUMN_DTYPES}
+            self._write_meta()
+        self.refresh()
+
+    # ── Files ──────────────────────────────────────────────────────
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _write_meta(self) -> None:
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._meta, f)
+        os.replace(tmp, self._file("meta.json"))
+
+    def refresh(self) -> None:
+        """Re-read the committed row count, picking up rows appended by another process."""
+        with open(self._file("meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Ratio store version {meta.get('version')} is not supported")
+        if meta["columns"] != COLUMN_DTYPES:
+            raise ValueError("Ratio store columns do not match this version's FinancialRatios fields")
+        self._meta = meta
+        self._maps.clear()
+        self._names = self._years = self._name_index = None
+
+    def __len__(self) -> int:
+        return self._meta["rows"]
+
+    # ── Reading ────────────────────────────────────────────────────
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only memory-mapped view of a column's committed rows."""
+        if name not in COLUMN_DTYPES:
+            raise KeyError(name)
+        mapped = self._maps.get(name)
+        if mapped is None:
+            rows = len(self)
+            if rows == 0:
+                mapped = np.empty(0, dtype=COLUMN_DTYPES[name])
+            else:
+                mapped = np.memmap(self._file(name + ".col"), dtype=COLUMN_DTYPES[name], mode="r", shape=(rows,))
+            self._maps[name] = mapped
+        return mapped
+
+    __getitem__ = column
+
+    def _interned(self, name: str, count: int) -> List[str]:
+        values = []
+        if count:
+            with open(self._file(name + ".jsonl")) as f:
+                for line, _ in zip(f, range(count)):
+                    values.append(json.loads(line))
+        return values
+
+    @property
+    def company_names(self) -> List[str]:
+        """Company name for each company id."""
+        if self._names is None:
+            self._names = self._interned("companies", self._meta["companies"])
+        return self._names
+
+    @property
+    def year_labels(self) -> List[str]:
+        """Financial-year label for each year id."""
+        if self._years is None:
+            self._years = self._interned("years", self._meta["years"])
+        return self._years
+
+    def company_id(self, name: str) -> Optional[int]:
+        if self._name_index is None:
+            self._name_index = {company: i for i, company in enumerate(self.company_names)}
+        return self._name_index.get(name)
+
+    def rows_for(self, company_name: str) -> np.ndarray:
+        """Row numbers of one company, in append order."""
+        company = self.company_id(company_name)
+        if company is None:
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.column("company_id") == company)
+
+    def zones(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        names = np.array([zone[2] for zone in HEALTH_ZONES], dtype=object)
+        return names[self.column("zone") if rows is None else self.column("zone")[rows]]
+
+    # ── Writing ────────────────────────────────────────────────────
+
+    def _intern(self, name: str, labels: Sequence[str], known: List[str]) -> np.ndarray:
+        index = {label: i for i, label in enumerate(known)}
+        added = []
+        ids = np.empty(len(labels), dtype=np.int64)
+        for i, label in enumerate(labels):
+            label_id = index.get(label)
+            if label_id is None:
+                label_id = index[label] = len(known) + len(added)
+                added.append(label)
+            ids[i] = label_id
+        if added:
+            with open(self._file(name + ".jsonl"), "a") as f:
+                f.writelines(json.dumps(label) + "\n" for label in added)
+            known.extend(added)
+        return ids
+
+    def append(
+        self,
+        company_names: Sequence[str],
+        financial_years: Sequence[str],
+        ratios: Mapping[str, np.ndarray],
+        scores: Mapping[str, np.ndarray],
+    ) -> int:
+        """
+        Append a batch given as ratio and score columns (as returned by
+        ``score_batch``, NaN for None). Returns the new row count.
+        """
+        n = len(company_names)
+        if len(financial_years) != n:
+            raise ValueError("company_names and financial_years must have the same length")
+        with self._lock:
+            self.refresh()
+            rows = len(self)
+            names = self.company_names
+            years = self.year_labels
+            # Drop anything an interrupted append left behind the committed counts
+            self._truncate_interned("companies", len(names))
+            self._truncate_interned("years", len(years))
+            columns = {
+                "company_id": self._intern("companies", company_names, names),
+                "year_id": self._intern("years", financial_years, years),
+                "zone": scores["zone"],
+                **{name: ratios[name] for name in RATIO_COLUMNS},
+                **{"score_" + name: scores[name] for name in SCORE_COLUMNS},
+            }
+            for name, dtype in COLUMN_DTYPES.items():
+                values = np.ascontiguousarray(np.asarray(columns[name]).astype(dtype, copy=False))
+                if len(values) != n:
+                    raise ValueError(f"Column '{name}' has {len(values)} rows, expected {n}")
+                with open(self._file(name + ".col"), "ab") as f:
+                    f.truncate(rows * values.itemsize)
+                    f.write(values.tobytes())
+            self._meta.update(rows=rows + n, companies=len(names), years=len(years))
+            self._write_meta()
+            self.refresh()
+        return len(self)
+
+    def _truncate_interned(self, name: str, count: int) -> None:
+        path = self._file(name + ".jsonl")
+        if not os.path.exists(path):
+            return
+        with open(path, "rb+") as f:
+            for _ in range(count):
+                f.readline()
+            f.truncate()
+
+    def append_frame(self, frame: FinancialFrame, chain_years: bool = True) -> int:
+        """
+        Score a frame and append it. With ``chain_years`` the frame is sorted
+        by company and year and each year is scored against the one before,
+        like the multi-year analysis.
+        """
+        has_prev = prev = None
+        if chain_years:
+            frame = frame.sort_by_company()
+            has_prev = np.zeros(len(frame), dtype=bool)
+            has_prev[1:] = frame.company_names[1:] == frame.company_names[:-1]
+            prev = chain_prev(frame)
+        ratios, scores = score_batch(frame, prev, has_prev)
+        return self.append(frame.company_names.tolist(), frame.financial_years.tolist(), ratios, scores)
+
+    def append_analyses(self, analyses: Sequence[FullAnalysis]) -> int:
+        """Append finished analyses as they were scored."""
+        ratios = {
+            name: np.array([np.nan if getattr(a.ratios, name) is None else getattr(a.ratios, name)
+                            for a in analyses], dtype=np.float64)
+            for name in RATIO_COLUMNS
+        }
+        scores = {name: np.array([getattr(a.health_score, name) for a in analyses]) for name in SCORE_COLUMNS}
+        scores["zone"] = np.array([_ZONE_INDEX[a.health_score.zone] for a in analyses])
+        return self.append(
+            [a.financial_data.company_name for a in analyses],
+            [a.financial_data.financial_year for a in analyses],
+            ratios,
+            scores,
+        )
@@ -2,267 +2,454 @@
 Recommendations engine — generates actionable insights from financial ratios.
 Indian context with statutory compliance awareness.
 """
-from typing import List, Optional
+from string import Formatter
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Union
+
+import numpy as np
+
 from models.financial_data import FinancialRatios, FinancialData, Recommendation
+from models.financial_frame import INPUT_FIELDS
+from models.financial_record import RATIO_FIELDS, FinancialRecord, RatioValues
+from utils.arrays import safe_div_array
 
+class RecommendationRule(NamedTuple):
+    code: str
+    priority: str  # "HIGH", "MEDIUM", "POSITIVE"
+    category: str
+    # Boolean mask over rule columns: ratios and raw inputs by field name,
+    # prior-year ratios as "prev_<ratio>", NaN wherever a value is None.
+    # Also evaluated on one record's plain floats (record_values), so keep
+    # to comparisons, & / | and helpers like _per_revenue that take both.
+    predicate: Callable[[Mapping[str, np.ndarray]], np.ndarray]
+    # str.format templates, rendered only for rows that are displayed
+    title: str
+    description: str
+    impact: Optional[str] = None
+    action: Optional[str] = None
+    # Extra template values computed from one row's values
+    extras: Optional[Callable[[Dict[str, float]], Dict[str, float]]] = None
 
-def generate_recommendations(
-    ratios: FinancialRatios,
-    data: FinancialData,
-    prev_ratios: Optional[FinancialRatios] = None,
-) -> List[Recommendation]:
-    recommendations: List[Recommendation] = []
-    bs = data.balance_sheet
-    pl = data.profit_loss
-    revenue = pl.revenue_from_operations
 
+_NAN = float("nan")
+
+
+def _per_revenue(c: Mapping[str, np.ndarray], name: str, periods: int = 1) -> np.ndarray:
+    """
+    ``c[name]`` over revenue per ``periods`` (1: share of revenue, 12:
+    months of revenue), NaN unless revenue is positive. Works on columns
+    and on one record's floats alike.
+    """
+    revenue = c["revenue_from_operations"]
+    if isinstance(revenue, np.ndarray):
+        return np.where(revenue > 0, safe_div_array(c[name], revenue / periods), np.nan)
+    per_period = revenue / periods
+    return c[name] / per_period if revenue > 0 and per_period else _NAN
+
+
+RECOMMENDATION_RULES: List[RecommendationRule] = [
     # ── HIGH PRIORITY ──────────────────────────────────────────────
 
     # PF/ESI overdue — criminal liability risk
-    if bs.pf_esi_payable > 0:
-        recommendations.append(Recommendation(
-            priority="HIGH",
-            category="Compliance",
-            title="PF/ESI Payable Outstanding",
-            description=f"PF/ESI payable of ₹{bs.pf_esi_payable:.1f}L is outstanding. Directors face personal criminal liability under EPF Act for defaults. Deposit immediately.",
-            impact="Avoid criminal prosecution and penalty interest",
-            action="Deposit immediately via EPFO/ESIC portal",
-        ))
+    RecommendationRule(
+        code="PF_ESI_OUTSTANDING",
+        priority="HIGH",
+        category="Compliance",
+        predicate=lambda c: c["pf_esi_payable"] > 0,
+        title="PF/ESI Payable Outstanding",
+        description="PF/ESI payable of ₹{pf_esi_payable:.1f}L is outstanding. Directors face personal criminal liability under EPF Act for defaults. Deposit immediately.",
+        impact="Avoid criminal prosecution and penalty interest",
+        action="Deposit immediately via EPFO/ESIC portal",
+    ),
 
     # TDS payable — interest + prosecution
-    if bs.tds_payable > 0:
-        recommendations.append(Recommendation(
-            priority="HIGH",
-            category="Compliance",
-            title="TDS Payable Overdue",
-            description=f"TDS payable of ₹{bs.tds_payable:.1f}L outstanding. Interest @1.5% per month under Section 201 of IT Act plus potential prosecution of TAN holders.",
-            impact="Stop accumulating 1.5%/month interest",
-            action="Deposit via NSDL before 7th of next month",
-        ))
+    RecommendationRule(
+        code="TDS_OVERDUE",
+        priority="HIGH",
+        category="Compliance",
+        predicate=lambda c: c["tds_payable"] > 0,
+        title="TDS Payable Overdue",
+        description="TDS payable of ₹{tds_payable:.1f}L outstanding. Interest @1.5% per month under Section 201 of IT Act plus potential prosecution of TAN holders.",
+        impact="Stop accumulating 1.5%/month interest",
+        action="Deposit via NSDL before 7th of next month",
+    ),
 
     # DSCR critical
-    if ratios.dscr is not None and ratios.dscr < 1.0:
-        recommendations.append(Recommendation(
-            priority="HIGH",
-            category="Debt",
-            title="DSCR Below 1.0x — NPA Risk",
-            description=f"DSCR of {ratios.dscr:.2f}x is below the RBI minimum of 1.25x. Loan may be classified as NPA. Operating cash flow cannot cover debt obligations.",
-            impact="Prevent NPA classification and bank facility withdrawal",
-            action="Negotiate loan restructuring or moratorium immediately",
-        ))
-    elif ratios.dscr is not None and ratios.dscr < 1.25:
-        recommendations.append(Recommendation(
-            priority="HIGH",
-            category="Debt",
-            title="DSCR Below RBI Minimum (1.25x)",
-            description=f"DSCR of {ratios.dscr:.2f}x is in Sub-Standard zone (RBI norm: >1.25x). Risk of NPA classification within 90 days.",
-            impact="Protect credit rating and bank relationships",
-            action="Accelerate collections, defer non-critical capex",
-        ))
+    RecommendationRule(
+        code="DSCR_NPA_RISK",
+        priority="HIGH",
+        category="Debt",
+        predicate=lambda c: c["dscr"] < 1.0,
+        title="DSCR Below 1.0x — NPA Risk",
+        description="DSCR of {dscr:.2f}x is below the RBI minimum of 1.25x. Loan may be classified as NPA. Operating cash flow cannot cover debt obligations.",
+        impact="Prevent NPA classification and bank facility withdrawal",
+        action="Negotiate loan restructuring or moratorium immediately",
+    ),
+    RecommendationRule(
+        code="DSCR_SUB_STANDARD",
+        priority="HIGH",
+        category="Debt",
+        predicate=lambda c: (c["dscr"] >= 1.0) & (c["dscr"] < 1.25),
+        title="DSCR Below RBI Minimum (1.25x)",
+        description="DSCR of {dscr:.2f}x is in Sub-Standard zone (RBI norm: >1.25x). Risk of NPA classification within 90 days.",
+        impact="Protect credit rating and bank relationships",
+        action="Accelerate collections, defer non-critical capex",
+    ),
 
     # Negative working capital
-    if ratios.working_capital is not None and ratios.working_capital < 0:
-        recommendations.append(Recommendation(
-            priority="HIGH",
-            category="Liquidity",
-            title="Negative Working Capital",
-            description=f"Working capital is negative (₹{abs(ratios.working_capital):.1f}L shortfall). Current liabilities exceed current assets — short-term solvency crisis.",
-            impact="Prevent payment defaults to vendors and banks",
-            action="Accelerate debtor collections, negotiate extended credit from suppliers",
-        ))
+    RecommendationRule(
+        code="NEGATIVE_WORKING_CAPITAL",
+        priority="HIGH",
+        category="Liquidity",
+        predicate=lambda c: c["working_capital"] < 0,
+        title="Negative Working Capital",
+        description="Working capital is negative (₹{working_capital_shortfall:.1f}L shortfall). Current liabilities exceed current assets — short-term solvency crisis.",
+        impact="Prevent payment defaults to vendors and banks",
+        action="Accelerate debtor collections, negotiate extended credit from suppliers",
+        extras=lambda r: {"working_capital_shortfall": abs(r["working_capital"])},
+    ),
 
     # Current ratio critical
-    if ratios.current_ratio is not None and ratios.current_ratio < 1.0:
-        recommendations.append(Recommendation(
-            priority="HIGH",
-            category="Liquidity",
-            title="Critical Current Ratio — Below 1.0x",
-            description=f"Current ratio of {ratios.current_ratio:.2f}x indicates inability to meet short-term obligations from current assets.",
-            impact="Prevent payment defaults and creditor escalations",
-            action="Convert long-term debt to short-term, accelerate receivables",
-        ))
+    RecommendationRule(
+        code="CURRENT_RATIO_CRITICAL",
+        priority="HIGH",
+        category="Liquidity",
+        predicate=lambda c: c["current_ratio"] < 1.0,
+        title="Critical Current Ratio — Below 1.0x",
+        description="Current ratio of {current_ratio:.2f}x indicates inability to meet short-term obligations from current assets.",
+        impact="Prevent payment defaults and creditor escalations",
+        action="Convert long-term debt to short-term, accelerate receivables",
+    ),
 
     # IBC risk — D/E > 3x
-    if ratios.debt_to_equity is not None and ratios.debt_to_equity > 3.0:
-        recommendations.append(Recommendation(
-            priority="HIGH",
-            category="Debt",
-            title="IBC Risk — D/E Exceeds 3x",
-            description=f"Debt-to-Equity of {ratios.debt_to_equity:.2f}x. If a creditor default exceeds ₹1 Cr, they can initiate CIRP under IBC. Seek equity infusion urgently.",
-            impact="Prevent insolvency proceedings",
-            action="Raise equity capital or convert promoter loans to equity",
-        ))
+    RecommendationRule(
+        code="IBC_RISK",
+        priority="HIGH",
+        category="Debt",
+        predicate=lambda c: c["debt_to_equity"] > 3.0,
+        title="IBC Risk — D/E Exceeds 3x",
+        description="Debt-to-Equity of {debt_to_equity:.2f}x. If a creditor default exceeds ₹1 Cr, they can initiate CIRP under IBC. Seek equity infusion urgently.",
+        impact="Prevent insolvency proceedings",
+        action="Raise equity capital or convert promoter loans to equity",
+    ),
 
     # Bad debt risk (high DSO + large receivables)
-    if ratios.dso is not None and ratios.dso > 120:
-        receivables_pct = (bs.trade_receivables / revenue * 100) if revenue else 0
-        recommendations.append(Recommendation(
-            priority="HIGH",
-            category="Receivables",
-            title=f"Very High DSO — {ratios.dso:.0f} Days",
-            description=f"DSO of {ratios.dso:.0f} days with receivables at {receivables_pct:.1f}% of revenue indicates serious collection issues. Risk of bad debt write-offs.",
-            impact="Free up working capital, reduce bad debt risk",
-            action="Issue demand notices to 90+ day overdue customers; consider factoring",
-        ))
+    RecommendationRule(
+        code="DSO_VERY_HIGH",
+        priority="HIGH",
+        category="Receivables",
+        predicate=lambda c: c["dso"] > 120,
+        title="Very High DSO — {dso:.0f} Days",
+        description="DSO of {dso:.0f} days with receivables at {receivables_pct:.1f}% of revenue indicates serious collection issues. Risk of bad debt write-offs.",
+        impact="Free up working capital, reduce bad debt risk",
+        action="Issue demand notices to 90+ day overdue customers; consider factoring",
+        extras=lambda r: {
+            "receivables_pct": (r["trade_receivables"] / r["revenue_from_operations"] * 100)
+            if r["revenue_from_operations"] else 0,
+        },
+    ),
 
     # Finance costs high
-    if revenue > 0 and pl.finance_costs / revenue > 0.08:
-        fc_pct = pl.finance_costs / revenue * 100
-        recommendations.append(Recommendation(
-            priority="HIGH",
-            category="Debt",
-            title=f"Finance Costs Very High ({fc_pct:.1f}% of Revenue)",
-            description=f"Finance costs consuming {fc_pct:.1f}% of revenue (threshold: 5%). Severely compressing net margins.",
-            impact="Improve net margin by reducing debt servicing burden",
-            action="Refinance at lower rates, prepay high-cost loans with surplus cash",
-        ))
+    RecommendationRule(
+        code="FINANCE_COSTS_HIGH",
+        priority="HIGH",
+        category="Debt",
+        predicate=lambda c: _per_revenue(c, "finance_costs") > 0.08,
+        title="Finance Costs Very High ({fc_pct:.1f}% of Revenue)",
+        description="Finance costs consuming {fc_pct:.1f}% of revenue (threshold: 5%). Severely compressing net margins.",
+        impact="Improve net margin by reducing debt servicing burden",
+        action="Refinance at lower rates, prepay high-cost loans with surplus cash",
+        extras=lambda r: {"fc_pct": r["finance_costs"] / r["revenue_from_operations"] * 100},
+    ),
 
     # ── MEDIUM PRIORITY ────────────────────────────────────────────
 
     # DSO moderate
-    if ratios.dso is not None and 60 < ratios.dso <= 120:
-        recommendations.append(Recommendation(
-            priority="MEDIUM",
-            category="Receivables",
-            title=f"DSO at {ratios.dso:.0f} Days — Above Ideal",
-            description=f"Industry ideal for Indian SMEs is <60 days. DSO of {ratios.dso:.0f} days indicates collections need improvement. Introduce early payment discounts.",
-            impact="Release working capital, reduce CC/OD utilisation",
-            action="Offer 1–2% discount for payment within 15 days (2/15, net 45)",
-        ))
+    RecommendationRule(
+        code="DSO_ABOVE_IDEAL",
+        priority="MEDIUM",
+        category="Receivables",
+        predicate=lambda c: (c["dso"] > 60) & (c["dso"] <= 120),
+        title="DSO at {dso:.0f} Days — Above Ideal",
+        description="Industry ideal for Indian SMEs is <60 days. DSO of {dso:.0f} days indicates collections need improvement. Introduce early payment discounts.",
+        impact="Release working capital, reduce CC/OD utilisation",
+        action="Offer 1–2% discount for payment within 15 days (2/15, net 45)",
+    ),
 
     # High CCC
-    if ratios.ccc is not None and ratios.ccc > 90:
-        recommendations.append(Recommendation(
-            priority="MEDIUM",
-            category="Efficiency",
-            title=f"Cash Conversion Cycle Too Long ({ratios.ccc:.0f} Days)",
-            description=f"CCC of {ratios.ccc:.0f} days means it takes over {ratios.ccc/30:.1f} months to convert inventory investment back to cash. High working capital requirement.",
-            impact="Reduce working capital borrowing needs",
-            action="Reduce inventory holding; negotiate better supplier terms",
-        ))
+    RecommendationRule(
+        code="CCC_TOO_LONG",
+        priority="MEDIUM",
+        category="Efficiency",
+        predicate=lambda c: c["ccc"] > 90,
+        title="Cash Conversion Cycle Too Long ({ccc:.0f} Days)",
+        description="CCC of {ccc:.0f} days means it takes over {ccc_months:.1f} months to convert inventory investment back to cash. High working capital requirement.",
+        impact="Reduce working capital borrowing needs",
+        action="Reduce inventory holding; negotiate better supplier terms",
+        extras=lambda r: {"ccc_months": r["ccc"] / 30},
+    ),
 
     # High inventory days
-    if ratios.dio is not None and ratios.dio > 90:
-        recommendations.append(Recommendation(
-            priority="MEDIUM",
-            category="Efficiency",
-            title=f"High Inventory Days ({ratios.dio:.0f} Days)",
-            description=f"Inventory held for {ratios.dio:.0f} days before sale. Excess stock increases storage costs and obsolescence risk.",
-            impact="Release cash locked in inventory",
-            action="Implement JIT ordering, identify slow-moving SKUs for liquidation",
-        ))
+    RecommendationRule(
+        code="DIO_HIGH",
+        priority="MEDIUM",
+        category="Efficiency",
+        predicate=lambda c: c["dio"] > 90,
+        title="High Inventory Days ({dio:.0f} Days)",
+        description="Inventory held for {dio:.0f} days before sale. Excess stock increases storage costs and obsolescence risk.",
+        impact="Release cash locked in inventory",
+        action="Implement JIT ordering, identify slow-moving SKUs for liquidation",
+    ),
 
     # Employee costs high
-    if revenue > 0 and pl.employee_expenses / revenue > 0.30:
-        emp_pct = pl.employee_expenses / revenue * 100
-        recommendations.append(Recommendation(
-            priority="MEDIUM",
-            category="Expenses",
-            title=f"Employee Costs High ({emp_pct:.1f}% of Revenue)",
-            description=f"Labour costs at {emp_pct:.1f}% of revenue (threshold: 30%). Review staffing efficiency or automate repetitive tasks.",
-            impact="Improve EBITDA margin by 3–5 percentage points",
-            action="Conduct productivity analysis; explore automation ROI",
-        ))
+    RecommendationRule(
+        code="EMPLOYEE_COSTS_HIGH",
+        priority="MEDIUM",
+        category="Expenses",
+        predicate=lambda c: _per_revenue(c, "employee_expenses") > 0.30,
+        title="Employee Costs High ({emp_pct:.1f}% of Revenue)",
+        description="Labour costs at {emp_pct:.1f}% of revenue (threshold: 30%). Review staffing efficiency or automate repetitive tasks.",
+        impact="Improve EBITDA margin by 3–5 percentage points",
+        action="Conduct productivity analysis; explore automation ROI",
+        extras=lambda r: {"emp_pct": r["employee_expenses"] / r["revenue_from_operations"] * 100},
+    ),
 
     # GST ITC large
-    if bs.gst_itc_receivable > 0 and revenue > 0:
-        itc_months = bs.gst_itc_receivable / (revenue / 12) if revenue else 0
-        if itc_months > 3:
-            recommendations.append(Recommendation(
-                priority="MEDIUM",
-                category="Compliance",
-                title=f"GST ITC Blocked — {itc_months:.1f} Months of Purchases",
-                description=f"₹{bs.gst_itc_receivable:.1f}L of GST Input Tax Credit is blocked. More than 3 months of ITC not utilised. This is locked working capital.",
-                impact="Release ₹{:.1f}L of cash blocked with government".format(bs.gst_itc_receivable),
-                action="Reconcile GSTR-2A vs books; utilise ITC against GST liability",
-            ))
+    RecommendationRule(
+        code="GST_ITC_BLOCKED",
+        priority="MEDIUM",
+        category="Compliance",
+        predicate=lambda c: (c["gst_itc_receivable"] > 0) & (_per_revenue(c, "gst_itc_receivable", 12) > 3),
+        title="GST ITC Blocked — {itc_months:.1f} Months of Purchases",
+        description="₹{gst_itc_receivable:.1f}L of GST Input Tax Credit is blocked. More than 3 months of ITC not utilised. This is locked working capital.",
+        impact="Release ₹{gst_itc_receivable:.1f}L of cash blocked with government",
+        action="Reconcile GSTR-2A vs books; utilise ITC against GST liability",
+        extras=lambda r: {"itc_months": r["gst_itc_receivable"] / (r["revenue_from_operations"] / 12)},
+    ),
 
     # Net margin declining
-    if prev_ratios and ratios.net_margin is not None and prev_ratios.net_margin is not None:
-        margin_decline = prev_ratios.net_margin - ratios.net_margin
-        if margin_decline > 1.5:
-            recommendations.append(Recommendation(
-                priority="MEDIUM",
-                category="Profitability",
-                title=f"Net Margin Declining ({margin_decline:.1f}pp Drop)",
-                description=f"Net margin fell from {prev_ratios.net_margin:.1f}% to {ratios.net_margin:.1f}%. Review cost structure — identify if it's input cost pressure, labour, or finance costs.",
-                impact="Restore profitability to prior year levels",
-                action="Cost reduction task force; price revision for key products",
-            ))
+    RecommendationRule(
+        code="NET_MARGIN_DECLINING",
+        priority="MEDIUM",
+        category="Profitability",
+        predicate=lambda c: c["prev_net_margin"] - c["net_margin"] > 1.5,
+        title="Net Margin Declining ({margin_decline:.1f}pp Drop)",
+        description="Net margin fell from {prev_net_margin:.1f}% to {net_margin:.1f}%. Review cost structure — identify if it's input cost pressure, labour, or finance costs.",
+        impact="Restore profitability to prior year levels",
+        action="Cost reduction task force; price revision for key products",
+        extras=lambda r: {"margin_decline": r["prev_net_margin"] - r["net_margin"]},
+    ),
 
     # Interest coverage moderate
-    if ratios.interest_coverage is not None and 1.5 < ratios.interest_coverage < 3.0:
-        recommendations.append(Recommendation(
-            priority="MEDIUM",
-            category="Debt",
-            title=f"Interest Coverage Ratio Thin ({ratios.interest_coverage:.2f}x)",
-            description=f"ICR of {ratios.interest_coverage:.2f}x is above minimum but thin. A revenue dip of >25% would make interest coverage dangerous.",
-            impact="Build buffer against revenue volatility",
-            action="Consider fixed-rate refinancing to reduce rate risk",
-        ))
+    RecommendationRule(
+        code="ICR_THIN",
+        priority="MEDIUM",
+        category="Debt",
+        predicate=lambda c: (c["interest_coverage"] > 1.5) & (c["interest_coverage"] < 3.0),
+        title="Interest Coverage Ratio Thin ({interest_coverage:.2f}x)",
+        description="ICR of {interest_coverage:.2f}x is above minimum but thin. A revenue dip of >25% would make interest coverage dangerous.",
+        impact="Build buffer against revenue volatility",
+        action="Consider fixed-rate refinancing to reduce rate risk",
+    ),
 
     # MSME payables
-    if data.msme_payables > 0:
-        recommendations.append(Recommendation(
-            priority="MEDIUM",
-            category="Compliance",
-            title="MSME Payables — 45-Day Compliance",
-            description=f"₹{data.msme_payables:.1f}L due to MSME suppliers. Under MSME Act Section 15, payment must be made within 45 days. Overdue attracts compound interest @3× bank rate.",
-            impact="Avoid mandatory interest payment to MSME suppliers",
-            action="Prioritise MSME supplier payments; disclose in MCA filing if overdue",
-        ))
+    RecommendationRule(
+        code="MSME_PAYABLES",
+        priority="MEDIUM",
+        category="Compliance",
+        predicate=lambda c: c["msme_payables"] > 0,
+        title="MSME Payables — 45-Day Compliance",
+        description="₹{msme_payables:.1f}L due to MSME suppliers. Under MSME Act Section 15, payment must be made within 45 days. Overdue attracts compound interest @3× bank rate.",
+        impact="Avoid mandatory interest payment to MSME suppliers",
+        action="Prioritise MSME supplier payments; disclose in MCA filing if overdue",
+    ),
 
     # ── POSITIVE REINFORCEMENT ─────────────────────────────────────
 
     # Good D/E
-    if ratios.debt_to_equity is not None and ratios.debt_to_equity < 0.5:
-        recommendations.append(Recommendation(
-            priority="POSITIVE",
-            category="Debt",
-            title="Excellent Leverage Position",
-            description=f"D/E of {ratios.debt_to_equity:.2f}x is well below 1x. Company has strong capacity to raise debt for growth if needed.",
-            action="Consider leveraged growth — take on project-linked debt with clear ROI",
-        ))
+    RecommendationRule(
+        code="LEVERAGE_EXCELLENT",
+        priority="POSITIVE",
+        category="Debt",
+        predicate=lambda c: c["debt_to_equity"] < 0.5,
+        title="Excellent Leverage Position",
+        description="D/E of {debt_to_equity:.2f}x is well below 1x. Company has strong capacity to raise debt for growth if needed.",
+        action="Consider leveraged growth — take on project-linked debt with clear ROI",
+    ),
 
-    # Good D/E improving
-    if prev_ratios and ratios.debt_to_equity and prev_ratios.debt_to_equity:
-        if prev_ratios.debt_to_equity - ratios.debt_to_equity > 0.2:
-            recommendations.append(Recommendation(
-                priority="POSITIVE",
-                category="Debt",
-                title="Deleveraging on Track",
-                description=f"D/E improved from {prev_ratios.debt_to_equity:.2f}x to {ratios.debt_to_equity:.2f}x. Debt reduction strategy is working.",
-                action="Continue debt repayment from operating cash flow",
-            ))
+    # Good D/E improving (both years must be non-zero)
+    RecommendationRule(
+        code="DELEVERAGING",
+        priority="POSITIVE",
+        category="Debt",
+        predicate=lambda c: (c["debt_to_equity"] != 0) & (c["prev_debt_to_equity"] != 0) & (
+            c["prev_debt_to_equity"] - c["debt_to_equity"] > 0.2
+        ),
+        title="Deleveraging on Track",
+        description="D/E improved from {prev_debt_to_equity:.2f}x to {debt_to_equity:.2f}x. Debt reduction strategy is working.",
+        action="Continue debt repayment from operating cash flow",
+    ),
 
     # Good current ratio
-    if ratios.current_ratio is not None and 1.5 <= ratios.current_ratio <= 2.5:
-        recommendations.append(Recommendation(
-            priority="POSITIVE",
-            category="Liquidity",
-            title="Healthy Liquidity Position",
-            description=f"Current ratio of {ratios.current_ratio:.2f}x is in the ideal range (1.5–2.5x). Short-term solvency is strong.",
-            action="Maintain working capital discipline; avoid over-stocking",
-        ))
-
-    # Revenue growth
-    if prev_ratios:
-        prev_rev = (prev_ratios.asset_turnover or 0) * 1000  # proxy
-        # Use data directly
-        pass
+    RecommendationRule(
+        code="LIQUIDITY_HEALTHY",
+        priority="POSITIVE",
+        category="Liquidity",
+        predicate=lambda c: (c["current_ratio"] >= 1.5) & (c["current_ratio"] <= 2.5),
+        title="Healthy Liquidity Position",
+        description="Current ratio of {current_ratio:.2f}x is in the ideal range (1.5–2.5x). Short-term solvency is strong.",
+        action="Maintain working capital discipline; avoid over-stocking",
+    ),
 
     # Good DSCR
-    if ratios.dscr is not None and ratios.dscr >= 1.5:
+    RecommendationRule(
+        code="DSCR_COMFORTABLE",
+        priority="POSITIVE",
+        category="Debt",
+        predicate=lambda c: c["dscr"] >= 1.5,
+        title="Comfortable Debt Coverage (DSCR {dscr:.2f}x)",
+        description="DSCR of {dscr:.2f}x comfortably exceeds the RBI minimum of 1.25x. Loan accounts are in Standard category.",
+        action="Maintain by protecting EBITDA margins",
+    ),
+]
+
+PRIORITY_ORDER = {"HIGH": 0, "MEDIUM": 1, "POSITIVE": 2}
+
+
+class _RecordingColumns(dict):
+    """Namespace that remembers every key read from it (values are dummies)."""
+
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+        self.read: Set[str] = set()
+
+    def __missing__(self, key):
+        self.read.add(key)
+        return self.value
+
+
+def rule_inputs(rule: RecommendationRule) -> Set[str]:
+    """Rule-column names a rule reads — in its predicate, templates or extras."""
+    columns = _RecordingColumns(np.ones(1))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rule.predicate(columns)
+    row = _RecordingColumns(1.0)
+    extra_names: Set[str] = set()
+    if rule.extras:
+        extra_names = set(rule.extras(row))
+    templates = [rule.title, rule.description, rule.impact or ""]
+    fields = {name for t in templates for _, name, _, _ in Formatter().parse(t) if name}
+    return columns.read | row.read | (fields - extra_names)
+
+
+def rule_columns(
+    ratios: Mapping[str, np.ndarray],
+    inputs: Mapping[str, np.ndarray],
+    prev_ratios: Optional[Mapping[str, np.ndarray]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Assemble the namespace the rule predicates read from: ratio columns,
+    raw input columns (a FinancialFrame works) and "prev_"-prefixed
+    prior-year ratios, which are all NaN when there is no prior year.
+    """
+    n = len(next(iter(ratios.values())))
+    columns: Dict[str, np.ndarray] = {}
+    zeros = np.zeros(n)
+    for name in INPUT_FIELDS:
+        columns[name] = np.asarray(inputs[name], dtype=np.float64) if name in inputs else zeros
+    nan = np.full(n, np.nan)
+    for name in FinancialRatios.model_fields:
+        columns[name] = np.asarray(ratios[name], dtype=np.float64)
+        columns["prev_" + name] = np.asarray(prev_ratios[name], dtype=np.float64) if prev_ratios else nan
+    return columns
+
+
+def evaluate_rules(columns: Mapping[str, np.ndarray]) -> np.ndarray:
+    """Fire every rule over the whole portfolio: a (rules × companies) boolean mask."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.vstack([np.asarray(rule.predicate(columns), dtype=bool) for rule in RECOMMENDATION_RULES])
+
+
+def fired_rule_codes(fired: np.ndarray, row: int) -> List[str]:
+    return [RECOMMENDATION_RULES[i].code for i in np.flatnonzero(fired[:, row])]
+
+
+class _RowValues(dict):
+    """One row of the rule columns, converted to Python floats on first access."""
+
+    def __init__(self, columns: Mapping[str, np.ndarray], row: int):
+        super().__init__()
+        self.columns = columns
+        self.row = row
+
+    def __missing__(self, key):
+        value = self[key] = self.columns[key][self.row].item()
+        return value
+
+
+def _render(rule_indices: Iterable[int], values: Dict[str, float]) -> List[Recommendation]:
+    recommendations: List[Recommendation] = []
+    for i in rule_indices:
+        rule = RECOMMENDATION_RULES[i]
+        if rule.extras:
+            values.update(rule.extras(values))
         recommendations.append(Recommendation(
-            priority="POSITIVE",
-            category="Debt",
-            title=f"Comfortable Debt Coverage (DSCR {ratios.dscr:.2f}x)",
-            description=f"DSCR of {ratios.dscr:.2f}x comfortably exceeds the RBI minimum of 1.25x. Loan accounts are in Standard category.",
-            action="Maintain by protecting EBITDA margins",
+            priority=rule.priority,
+            category=rule.category,
+            title=rule.title.format_map(values),
+            description=rule.description.format_map(values),
+            impact=rule.impact.format_map(values) if rule.impact else None,
+            action=rule.action,
         ))
 
-    # Sort: HIGH first, then MEDIUM, then POSITIVE
-    priority_order = {"HIGH": 0, "MEDIUM": 1, "POSITIVE": 2}
-    recommendations.sort(key=lambda r: priority_order.get(r.priority, 3))
-
+    recommendations.sort(key=lambda r: PRIORITY_ORDER.get(r.priority, 3))
     return recommendations
+
+
+def render_recommendations(columns: Mapping[str, np.ndarray], fired: np.ndarray, row: int) -> List[Recommendation]:
+    """Format the recommendations for a single company, HIGH first, then MEDIUM, then POSITIVE."""
+    return _render(np.flatnonzero(fired[:, row]), _RowValues(columns, row))
+
+
+# ── Single company-year ────────────────────────────────────────────
+# The rule predicates only compare and combine values, so they run on
+# plain floats just as they do on columns; one record skips building
+# (and evaluating over) dozens of one-element arrays.
+
+def record_values(
+    record: FinancialRecord,
+    ratios: Union[FinancialRatios, RatioValues],
+    prev_ratios: Optional[Union[FinancialRatios, RatioValues]] = None,
+) -> Dict[str, float]:
+    """``rule_columns`` for one company-year, as a dict of floats with NaN for None."""
+    values = record.values()
+    for name in RATIO_FIELDS:
+        value = getattr(ratios, name)
+        values[name] = _NAN if value is None else value
+    for name in RATIO_FIELDS:
+        value = getattr(prev_ratios, name) if prev_ratios is not None else None
+        values["prev_" + name] = _NAN if value is None else value
+    return values
+
+
+def fired_rules(values: Mapping[str, float]) -> List[int]:
+    """Indices into RECOMMENDATION_RULES of the rules that fire for one company-year."""
+    return [i for i, rule in enumerate(RECOMMENDATION_RULES) if rule.predicate(values)]
+
+
+def record_recommendations(
+    record: FinancialRecord,
+    ratios: Union[FinancialRatios, RatioValues],
+    prev_ratios: Optional[Union[FinancialRatios, RatioValues]] = None,
+) -> List[Recommendation]:
+    """``generate_recommendations`` on the internal record types."""
+    values = record_values(record, ratios, prev_ratios)
+    return _render(fired_rules(values), values)
+
+
+def generate_recommendations(
+    ratios: FinancialRatios,
+    data: FinancialData,
+    prev_ratios: Optional[FinancialRatios] = None,
+) -> List[Recommendation]:
+    return record_recommendations(FinancialRecord.from_data(data), ratios, prev_ratios)
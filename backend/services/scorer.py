@@ -2,10 +2,48 @@
 Financial Health Score engine.
 Scores each category 0–100, then weights them for the overall score.
 """
-from typing import Optional
+from typing import Dict, Mapping, Optional, Union
+
+import numpy as np
+
 from models.financial_data import FinancialRatios, HealthScoreBreakdown
+from models.financial_record import RatioValues, ScoreValues
+from utils.arrays import round_array
 from utils.constants import HEALTH_SCORE_WEIGHTS, HEALTH_ZONES
 
+# (ratio, excellent, good, caution, lower_is_better) scored with score_metric
+PROFITABILITY_METRICS = [
+    ("net_margin", 15, 8, 3, False),
+    ("ebitda_margin", 20, 12, 6, False),
+    ("gross_margin", 40, 25, 15, False),
+    ("roe", 20, 12, 6, False),
+    ("roa", 10, 5, 2, False),
+]
+
+LEVERAGE_METRICS = [
+    ("debt_to_equity", 0.5, 1.0, 2.0, True),
+    ("interest_coverage", 5.0, 3.0, 2.0, False),
+    ("dscr", 2.0, 1.5, 1.25, False),
+    ("net_debt_to_ebitda", 1.0, 2.0, 3.0, True),
+    ("debt_ratio", 0.3, 0.5, 0.65, True),
+]
+
+EFFICIENCY_METRICS = [
+    ("dso", 45, 60, 90, True),
+    ("dio", 30, 60, 90, True),
+    ("ccc", 45, 75, 100, True),
+    ("asset_turnover", 1.5, 1.0, 0.5, False),
+    ("inventory_turnover", 12, 8, 4, False),
+]
+
+CASH_FLOW_METRICS = [
+    ("ocf_margin", 15, 8, 3, False),
+    ("cf_to_debt", 0.3, 0.2, 0.1, False),
+]
+
+# The scalar scorers only read attributes, so the model and the internal record both work
+Ratios = Union[FinancialRatios, RatioValues]
+
 
 def score_metric(value: Optional[float], excellent: float, good: float, caution: float,
                  lower_is_better: bool = False, max_score: float = 100) -> float:
@@ -41,7 +79,7 @@ def score_metric(value: Optional[float], excellent: float, good: float, caution:
             return ratio * 30
 
 
-def calculate_liquidity_score(ratios: FinancialRatios) -> float:
+def calculate_liquidity_score(ratios: Ratios) -> float:
     scores = []
 
     # Current ratio: ideal 1.5–2.5x
@@ -83,47 +121,30 @@ def calculate_liquidity_score(ratios: FinancialRatios) -> float:
     return sum(scores) / len(scores)
 
 
-def calculate_profitability_score(ratios: FinancialRatios) -> float:
-    scores = []
+def _score_metrics(ratios: Ratios, metrics) -> list:
+    return [
+        score_metric(getattr(ratios, name), excellent, good, caution, lower_is_better=lower)
+        for name, excellent, good, caution, lower in metrics
+    ]
 
-    scores.append(score_metric(ratios.net_margin, 15, 8, 3))
-    scores.append(score_metric(ratios.ebitda_margin, 20, 12, 6))
-    scores.append(score_metric(ratios.gross_margin, 40, 25, 15))
-    scores.append(score_metric(ratios.roe, 20, 12, 6))
-    scores.append(score_metric(ratios.roa, 10, 5, 2))
 
+def calculate_profitability_score(ratios: Ratios) -> float:
+    scores = _score_metrics(ratios, PROFITABILITY_METRICS)
     return sum(scores) / len(scores)
 
 
-def calculate_leverage_score(ratios: FinancialRatios) -> float:
-    scores = []
-
-    scores.append(score_metric(ratios.debt_to_equity, 0.5, 1.0, 2.0, lower_is_better=True))
-    scores.append(score_metric(ratios.interest_coverage, 5.0, 3.0, 2.0))
-    scores.append(score_metric(ratios.dscr, 2.0, 1.5, 1.25))
-    scores.append(score_metric(ratios.net_debt_to_ebitda, 1.0, 2.0, 3.0, lower_is_better=True))
-    scores.append(score_metric(ratios.debt_ratio, 0.3, 0.5, 0.65, lower_is_better=True))
-
+def calculate_leverage_score(ratios: Ratios) -> float:
+    scores = _score_metrics(ratios, LEVERAGE_METRICS)
     return sum(scores) / len(scores)
 
 
-def calculate_efficiency_score(ratios: FinancialRatios) -> float:
-    scores = []
-
-    scores.append(score_metric(ratios.dso, 45, 60, 90, lower_is_better=True))
-    scores.append(score_metric(ratios.dio, 30, 60, 90, lower_is_better=True))
-    scores.append(score_metric(ratios.ccc, 45, 75, 100, lower_is_better=True))
-    scores.append(score_metric(ratios.asset_turnover, 1.5, 1.0, 0.5))
-    scores.append(score_metric(ratios.inventory_turnover, 12, 8, 4))
-
+def calculate_efficiency_score(ratios: Ratios) -> float:
+    scores = _score_metrics(ratios, EFFICIENCY_METRICS)
     return sum(scores) / len(scores)
 
 
-def calculate_cash_flow_score(ratios: FinancialRatios) -> float:
-    scores = []
-
-    scores.append(score_metric(ratios.ocf_margin, 15, 8, 3))
-    scores.append(score_metric(ratios.cf_to_debt, 0.3, 0.2, 0.1))
+def calculate_cash_flow_score(ratios: Ratios) -> float:
+    scores = _score_metrics(ratios, CASH_FLOW_METRICS)
 
     if ratios.cash_conversion_ratio is not None:
         ccr = ratios.cash_conversion_ratio
@@ -157,13 +178,31 @@ def calculate_compliance_score_from_flags(
     return max(0, score)
 
 
+def zone_for(overall: float):
+    for low, high, zone, zone_color in HEALTH_ZONES:
+        if low <= overall <= high:
+            return zone, zone_color
+    return "Critical", "red"
+
+
 def calculate_health_score(
-    ratios: FinancialRatios,
+    ratios: Ratios,
     tds_payable_overdue: bool = False,
     gst_itc_large: bool = False,
     pf_esi_overdue: bool = False,
     msme_overdue: bool = False,
 ) -> HealthScoreBreakdown:
+    return score_values(ratios, tds_payable_overdue, gst_itc_large, pf_esi_overdue, msme_overdue).to_model()
+
+
+def score_values(
+    ratios: Ratios,
+    tds_payable_overdue: bool = False,
+    gst_itc_large: bool = False,
+    pf_esi_overdue: bool = False,
+    msme_overdue: bool = False,
+) -> ScoreValues:
+    """``calculate_health_score`` for the internal pipeline: no model is built."""
     liquidity = calculate_liquidity_score(ratios)
     profitability = calculate_profitability_score(ratios)
     leverage = calculate_leverage_score(ratios)
@@ -183,20 +222,189 @@ def calculate_health_score(
         compliance * w["compliance"] / 100
     )
 
-    zone, zone_color = "Critical", "red"
-    for low, high, z, zc in HEALTH_ZONES:
-        if low <= overall <= high:
-            zone, zone_color = z, zc
-            break
-
-    return HealthScoreBreakdown(
-        overall=round(overall, 1),
-        liquidity=round(liquidity, 1),
-        profitability=round(profitability, 1),
-        leverage=round(leverage, 1),
-        efficiency=round(efficiency, 1),
-        cash_flow=round(cash_flow, 1),
-        compliance=round(compliance, 1),
-        zone=zone,
-        zone_color=zone_color,
+    out = ScoreValues()
+    out.overall = round(overall, 1)
+    out.liquidity = round(liquidity, 1)
+    out.profitability = round(profitability, 1)
+    out.leverage = round(leverage, 1)
+    out.efficiency = round(efficiency, 1)
+    out.cash_flow = round(cash_flow, 1)
+    out.compliance = round(compliance, 1)
+    out.zone, out.zone_color = zone_for(overall)
+    return out
+
+
+# ── Batch (columnar) scoring ───────────────────────────────────────
+# Same bands as above, evaluated with np.select over whole ratio columns.
+# A NaN ratio plays the role of None and scores the neutral 50.
+
+def _clip0(x: np.ndarray) -> np.ndarray:
+    return np.maximum(0, x)
+
+
+def score_metric_array(values: np.ndarray, excellent: float, good: float, caution: float,
+                       lower_is_better: bool = False, max_score: float = 100) -> np.ndarray:
+    v = np.asarray(values, dtype=np.float64)
+    if lower_is_better:
+        conditions = [v <= excellent, v <= good, v <= caution]
+        choices = [
+            max_score,
+            60 + (good - v) / (good - excellent) * 40,
+            30 + (caution - v) / (caution - good) * 30,
+        ]
+        below = _clip0(1 - (v - caution) / caution) * 30
+    else:
+        conditions = [v >= excellent, v >= good, v >= caution]
+        choices = [
+            max_score,
+            60 + (v - good) / (excellent - good) * 40,
+            30 + (v - caution) / (good - caution) * 30,
+        ]
+        below = _clip0(v / caution) * 30 if caution > 0 else np.zeros_like(v)
+    scored = np.select(conditions, choices, below)
+    return np.where(np.isnan(v), 50.0, scored)
+
+
+def _mean_scores(scores: list) -> np.ndarray:
+    return sum(scores) / len(scores)
+
+
+def _score_metrics_array(ratios: Mapping[str, np.ndarray], metrics) -> list:
+    return [
+        score_metric_array(ratios[name], excellent, good, caution, lower_is_better=lower)
+        for name, excellent, good, caution, lower in metrics
+    ]
+
+
+def _liquidity_score_array(ratios: Mapping[str, np.ndarray]) -> np.ndarray:
+    cr = np.asarray(ratios["current_ratio"], dtype=np.float64)
+    current = np.select(
+        [(cr >= 1.5) & (cr <= 2.5), (cr >= 1.0) & (cr < 1.5), cr < 1.0],
+        [100, 60 + (cr - 1.0) / 0.5 * 40, _clip0(cr / 1.0 * 30)],
+        np.maximum(70, 100 - (cr - 2.5) * 10),
+    )
+
+    qr = np.asarray(ratios["quick_ratio"], dtype=np.float64)
+    quick = np.where(qr >= 1.0, np.minimum(100, 70 + qr * 10), _clip0(qr / 1.0 * 70))
+
+    cash_r = np.asarray(ratios["cash_ratio"], dtype=np.float64)
+    cash = np.select(
+        [cash_r >= 0.5, cash_r >= 0.2],
+        [100, 60 + (cash_r - 0.2) / 0.3 * 40],
+        _clip0(cash_r / 0.2 * 60),
     )
+
+    return _mean_scores([
+        np.where(np.isnan(cr), 50.0, current),
+        np.where(np.isnan(qr), 50.0, quick),
+        np.where(np.isnan(cash_r), 50.0, cash),
+    ])
+
+
+def _cash_flow_score_array(ratios: Mapping[str, np.ndarray]) -> np.ndarray:
+    scores = _score_metrics_array(ratios, CASH_FLOW_METRICS)
+    ccr = np.asarray(ratios["cash_conversion_ratio"], dtype=np.float64)
+    conversion = np.select(
+        [ccr >= 0.8, ccr >= 0.5],
+        [100, 60 + (ccr - 0.5) / 0.3 * 40],
+        _clip0(ccr / 0.5 * 60),
+    )
+    scores.append(np.where(np.isnan(ccr), 50.0, conversion))
+    return _mean_scores(scores)
+
+
+CATEGORY_SCORERS = {
+    "liquidity": _liquidity_score_array,
+    "profitability": lambda ratios: _mean_scores(_score_metrics_array(ratios, PROFITABILITY_METRICS)),
+    "leverage": lambda ratios: _mean_scores(_score_metrics_array(ratios, LEVERAGE_METRICS)),
+    "efficiency": lambda ratios: _mean_scores(_score_metrics_array(ratios, EFFICIENCY_METRICS)),
+    "cash_flow": _cash_flow_score_array,
+}
+
+# Ratios read by each ratio-based category (compliance is scored from flags)
+CATEGORY_RATIOS = {
+    "liquidity": ["current_ratio", "quick_ratio", "cash_ratio"],
+    "profitability": [m[0] for m in PROFITABILITY_METRICS],
+    "leverage": [m[0] for m in LEVERAGE_METRICS],
+    "efficiency": [m[0] for m in EFFICIENCY_METRICS],
+    "cash_flow": [m[0] for m in CASH_FLOW_METRICS] + ["cash_conversion_ratio"],
+}
+
+
+def compliance_score_array(
+    tds_payable_overdue: np.ndarray,
+    gst_itc_large: np.ndarray,
+    pf_esi_overdue: np.ndarray,
+    msme_overdue: np.ndarray,
+) -> np.ndarray:
+    as_bool = lambda f: np.asarray(f, dtype=bool)  # noqa: E731
+    return _clip0(
+        100.0
+        - 30 * as_bool(tds_payable_overdue)
+        - 30 * as_bool(pf_esi_overdue)
+        - 15 * as_bool(gst_itc_large)
+        - 15 * as_bool(msme_overdue)
+    )
+
+
+def overall_score_array(categories: Mapping[str, np.ndarray]) -> np.ndarray:
+    """Weighted overall score (unrounded) from the six unrounded category scores."""
+    w = HEALTH_SCORE_WEIGHTS
+    return (
+        categories["liquidity"] * w["liquidity"] / 100 +
+        categories["profitability"] * w["profitability"] / 100 +
+        categories["leverage"] * w["leverage"] / 100 +
+        categories["efficiency"] * w["efficiency"] / 100 +
+        categories["cash_flow"] * w["cash_flow"] / 100 +
+        categories["compliance"] * w["compliance"] / 100
+    )
+
+
+def zone_index_array(overall: np.ndarray) -> np.ndarray:
+    """Index into HEALTH_ZONES for each (unrounded) overall score, first match wins."""
+    fallback = next((i for i, zone in enumerate(HEALTH_ZONES) if zone[2] == "Critical"), len(HEALTH_ZONES) - 1)
+    conditions = [(overall >= low) & (overall <= high) for low, high, _, _ in HEALTH_ZONES]
+    return np.select(conditions, list(range(len(HEALTH_ZONES))), fallback)
+
+
+def category_scores_batch(
+    ratios: Mapping[str, np.ndarray],
+    tds_payable_overdue: Optional[np.ndarray] = None,
+    gst_itc_large: Optional[np.ndarray] = None,
+    pf_esi_overdue: Optional[np.ndarray] = None,
+    msme_overdue: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """The six unrounded category scores for each row of ratio columns."""
+    categories = {name: scorer(ratios) for name, scorer in CATEGORY_SCORERS.items()}
+    n = len(categories["liquidity"])
+    flag = lambda f: np.zeros(n, dtype=bool) if f is None else f  # noqa: E731
+    categories["compliance"] = compliance_score_array(
+        flag(tds_payable_overdue), flag(gst_itc_large), flag(pf_esi_overdue), flag(msme_overdue),
+    )
+    return categories
+
+
+def calculate_health_score_batch(
+    ratios: Mapping[str, np.ndarray],
+    tds_payable_overdue: Optional[np.ndarray] = None,
+    gst_itc_large: Optional[np.ndarray] = None,
+    pf_esi_overdue: Optional[np.ndarray] = None,
+    msme_overdue: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorised ``calculate_health_score`` over ratio columns
+    (e.g. the output of ``calculate_ratios_batch``).
+
+    Returns the six category scores and ``overall`` rounded exactly as the
+    scalar path rounds them, plus ``zone`` as an index into HEALTH_ZONES.
+    """
+    categories = category_scores_batch(
+        ratios, tds_payable_overdue, gst_itc_large, pf_esi_overdue, msme_overdue,
+    )
+    overall = overall_score_array(categories)
+
+    scores = {"overall": round_array(overall, 1)}
+    for name in ("liquidity", "profitability", "leverage", "efficiency", "cash_flow", "compliance"):
+        scores[name] = round_array(categories[name], 1)
+    scores["zone"] = zone_index_array(overall)
+    return scores
@@ -0,0 +1,329 @@
+"""
+Portfolio screening over the memory-mapped ratio store.
+Composable ratio predicates and consecutive-year conditions, evaluated as column scans.
+"""
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from models.financial_data import ScreenCondition, ScreenMatch, ScreenRequest, ScreenResult
+from services.ratio_store import COLUMN_DTYPES, RatioStore
+from utils.constants import IBC_FLAGS, NPA_RISK, SCREEN_INDEX_REFRESH_S, SCREEN_MAX_RESULTS
+
+SCREEN_METRICS = [name for name, dtype in COLUMN_DTYPES.items() if dtype == "<f8"]
+COMPARISON_OPS = (">", ">=", "<", "<=", "between")
+TREND_OPS = ("rising", "falling")
+
+SCREEN_PRESETS: Dict[str, List[ScreenCondition]] = {
+    # IBC flag: D/E above the threshold for the configured run of years
+    "ibc_leverage": [ScreenCondition(
+        metric="debt_to_equity", op=">", value=IBC_FLAGS["de_ratio_threshold"],
+        years=IBC_FLAGS["de_ratio_consecutive_years"],
+    )],
+    # NPA sub-standard band: 1.0 <= DSCR < 1.25
+    "npa_sub_standard": [ScreenCondition(
+        metric="dscr", op="between",
+        low=NPA_RISK["sub_standard"]["dscr_range"][0], high=NPA_RISK["sub_standard"]["dscr_range"][1],
+    )],
+    # Working-capital stretch: cash conversion cycle over 100 days and longer than last year
+    "ccc_rising": [
+        ScreenCondition(metric="ccc", op=">", value=100),
+        ScreenCondition(metric="ccc", op="rising", years=2),
+    ],
+}
+
+
+# Sorted ahead of the first screen: the presets' metrics and the usual credit screens
+WARM_METRICS = frozenset(
+    [condition.metric for conditions in SCREEN_PRESETS.values() for condition in conditions]
+    + ["dscr", "current_ratio", "interest_coverage", "net_margin", "roce", "score_overall"]
+)
+
+
+# ── Chain index ────────────────────────────────────────────────────
+
+_START_YEAR = re.compile(r"\d{4}")
+
+
+def start_year(label: str) -> int:
+    """Calendar year a financial-year label starts in ("2024-25", "FY 2024-25" → 2024); -1 if it has none."""
+    match = _START_YEAR.search(label)
+    return int(match.group()) if match else -1
+
+
+class ScreenIndex:
+    """
+    Rows of a store ordered by (company, year), built once per store size.
+
+    ``link[i]`` is True when chain row i is the calendar year right after
+    row i-1 of the same company, so a missing year breaks the run. Metric
+    columns are gathered into chain order and sorted per metric, either up
+    front by ``warm`` or on the first predicate that uses them; both are
+    cached for later screens.
+    """
+
+    def __init__(self, store: RatioStore):
+        self.store = store
+        start_years = np.array([start_year(label) for label in store.year_labels] or [0], dtype=np.int64)
+        company = np.asarray(store["company_id"])
+        year = start_years[np.asarray(store["year_id"])]
+        self.order = np.lexsort((year, company))
+        self.company = company[self.order]
+        self.year = year[self.order]
+        self.link = np.zeros(len(self.order), dtype=bool)
+        self.link[1:] = (self.company[1:] == self.company[:-1]) & (self.year[1:] == self.year[:-1] + 1)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray, int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def warm(self, metrics: Iterable[str] = ()) -> "ScreenIndex":
+        """Load the labels and sort WARM_METRICS (plus ``metrics``) now rather than on first use."""
+        # Label lists are read from their files on first access
+        self.store.company_names
+        self.store.year_labels
+        for metric in sorted(WARM_METRICS.union(metrics)):
+            self.sorted_index(metric)
+        return self
+
+    @property
+    def sorted_metrics(self) -> List[str]:
+        with self._lock:
+            return list(self._sorted)
+
+    def column(self, metric: str) -> np.ndarray:
+        with self._lock:
+            values = self._columns.get(metric)
+            if values is None:
+                values = self._columns[metric] = np.asarray(self.store[metric])[self.order]
+            return values
+
+    def sorted_index(self, metric: str) -> Tuple[np.ndarray, np.ndarray, int]:
+        """(sorted values, chain positions, count of non-NaN values) — NaN sorts last."""
+        values = self.column(metric)
+        with self._lock:
+            index = self._sorted.get(metric)
+            if index is None:
+                positions = np.argsort(values, kind="stable")
+                ordered = values[positions]
+                index = self._sorted[metric] = (ordered, positions, int(np.count_nonzero(~np.isnan(ordered))))
+            return index
+
+
+_indexes: Dict[Tuple[str, int], ScreenIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def screen_index(store: RatioStore, metrics: Iterable[str] = ()) -> ScreenIndex:
+    """
+    Cached chain index for the store's current row count (appends make a
+    fresh one), warmed with ``metrics`` besides WARM_METRICS when built.
+    """
+    key = (store.path, len(store))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            for stale in [k for k in _indexes if k[0] == store.path]:
+                del _indexes[stale]
+            index = _indexes[key] = ScreenIndex(store).warm(metrics)
+        return index
+
+
+class IndexedStore:
+    """
+    The ratio store in ``path`` paired with its built index, for the server.
+
+    ``refresh`` re-reads the store's committed row count and, when rows
+    have been appended (by bulk_analyze in another process, say), builds
+    the new index before swapping it in; ``watch`` does that on a daemon
+    thread, at open and every SCREEN_INDEX_REFRESH_S. The new index is
+    sorted on every metric the previous one was screened on, and screens
+    keep using the previous pair meanwhile, so none of them waits for an
+    index build.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._current: Optional[Tuple[RatioStore, ScreenIndex]] = None
+        self._error = f"No ratio store at {path}"
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def refresh(self) -> bool:
+        """Pick up appended rows; True when a new index was swapped in."""
+        with self._lock:
+            try:
+                store = RatioStore(self.path)
+            except (ValueError, OSError) as e:
+                self._error = str(e)
+                return False
+            if self._current is not None and len(self._current[0]) == len(store):
+                return False
+            used = self._current[1].sorted_metrics if self._current is not None else ()
+            self._current = (store, screen_index(store, used))
+            return True
+
+    def current(self) -> Tuple[RatioStore, ScreenIndex]:
+        """The latest (store, index) pair — built here only if no refresh has run yet."""
+        if self._current is None:
+            self.refresh()
+            if self._current is None:
+                raise ValueError(self._error)
+        return self._current
+
+    def watch(self, interval: float = SCREEN_INDEX_REFRESH_S) -> threading.Thread:
+        def loop():
+            while True:
+                self.refresh()
+                if self._stop.wait(interval):
+                    return
+
+        self._stop.clear()
+        thread = threading.Thread(target=loop, name="screen-index", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+# ── Predicates ─────────────────────────────────────────────────────
+
+def _shift(mask: np.ndarray, lag: int) -> np.ndarray:
+    shifted = np.zeros_like(mask)
+    shifted[lag:] = mask[:-lag]
+    return shifted
+
+
+def held_for(mask: np.ndarray, link: np.ndarray, years: int) -> np.ndarray:
+    """True where ``mask`` holds on this row and the ``years - 1`` consecutive years before it."""
+    held = mask.copy()
+    linked = link
+    for lag in range(1, years):
+        held &= linked & _shift(mask, lag)
+        linked = linked & _shift(link, lag)
+    return held
+
+
+def _range_mask(index: ScreenIndex, condition: ScreenCondition) -> np.ndarray:
+    ordered, positions, valid = index.sorted_index(condition.metric)
+    op = condition.op
+    if op == "between":
+        lo = np.searchsorted(ordered[:valid], condition.low, side="left")
+        hi = np.searchsorted(ordered[:valid], condition.high, side="left")
+    elif op in (">", ">="):
+        lo = np.searchsorted(ordered[:valid], condition.value, side="right" if op == ">" else "left")
+        hi = valid
+    else:
+        lo = 0
+        hi = np.searchsorted(ordered[:valid], condition.value, side="left" if op == "<" else "right")
+    mask = np.zeros(len(index), dtype=bool)
+    mask[positions[lo:hi]] = True
+    return mask
+
+
+def validate_condition(condition: ScreenCondition) -> None:
+    if condition.metric not in SCREEN_METRICS:
+        raise ValueError(f"Unknown metric '{condition.metric}'")
+    if condition.op not in COMPARISON_OPS + TREND_OPS:
+        raise ValueError(f"Unknown operator '{condition.op}'")
+    if condition.op == "between" and (condition.low is None or condition.high is None):
+        raise ValueError(f"'between' on {condition.metric} needs both low and high")
+    if condition.op in (">", ">=", "<", "<=") and condition.value is None:
+        raise ValueError(f"'{condition.op}' on {condition.metric} needs a value")
+    if condition.op in TREND_OPS and condition.years < 2:
+        raise ValueError(f"'{condition.op}' on {condition.metric} needs years >= 2")
+    if condition.years < 1:
+        raise ValueError("years must be at least 1")
+
+
+def condition_mask(index: ScreenIndex, condition: ScreenCondition) -> np.ndarray:
+    """Chain-ordered rows where the condition holds (NaN never matches)."""
+    if condition.op in TREND_OPS:
+        values = index.column(condition.metric)
+        step = np.zeros(len(index), dtype=bool)
+        with np.errstate(invalid="ignore"):
+            step[1:] = values[1:] > values[:-1] if condition.op == "rising" else values[1:] < values[:-1]
+        return held_for(step & index.link, index.link, condition.years - 1)
+    return held_for(_range_mask(index, condition), index.link, condition.years)
+
+
+# ── Entry point ────────────────────────────────────────────────────
+
+def run_screen(store: RatioStore, request: ScreenRequest, index: Optional[ScreenIndex] = None) -> ScreenResult:
+    """
+    Company-years of the store matching every (or any) condition.
+
+    Range predicates are answered from sorted per-metric indexes and
+    consecutive-year conditions by shifting masks along the (company, year)
+    chain, so a screen costs a few passes over boolean arrays regardless
+    of how many conditions or years it spans. ``index`` is the store's
+    prebuilt index (see IndexedStore); without one it is looked up or built.
+    """
+    start = time.perf_counter()
+    conditions = list(request.conditions)
+    if request.preset is not None:
+        if request.preset not in SCREEN_PRESETS:
+            raise ValueError(f"Unknown preset '{request.preset}' (expected one of {', '.join(SCREEN_PRESETS)})")
+        conditions = SCREEN_PRESETS[request.preset] + conditions
+    if not conditions:
+        raise ValueError("At least one condition or a preset is required")
+    if request.combine not in ("all", "any"):
+        raise ValueError("combine must be 'all' or 'any'")
+    for condition in conditions:
+        validate_condition(condition)
+
+    if index is None:
+        index = screen_index(store)
+    masks = [condition_mask(index, condition) for condition in conditions]
+    matched = np.logical_and.reduce(masks) if request.combine == "all" else np.logical_or.reduce(masks)
+    if request.financial_year is not None:
+        labels = store.year_labels
+        year_id = labels.index(request.financial_year) if request.financial_year in labels else -1
+        matched &= np.asarray(store["year_id"])[index.order] == year_id
+    rows = np.flatnonzero(matched)
+    if request.latest_only and len(rows):
+        companies = index.company[rows]
+        rows = rows[np.append(companies[1:] != companies[:-1], True)]
+
+    limit = SCREEN_MAX_RESULTS if request.limit is None else request.limit
+    shown = rows[:limit]
+    windows: Dict[str, int] = {}
+    for c in conditions:
+        windows[c.metric] = max(windows.get(c.metric, 1), c.years)
+    # Window values that would reach into another company or past a gap year are reported as None
+    reach = [np.ones(len(shown), dtype=bool)]
+    for lag in range(1, max(windows.values())):
+        reach.append(reach[-1] & index.link[np.maximum(shown - lag + 1, 0)])
+    names = store.company_names
+    labels = store.year_labels
+    year_ids = np.asarray(store["year_id"])[index.order[shown]].tolist()
+    values = {
+        metric: [
+            np.where(reach[lag], index.column(metric)[np.maximum(shown - lag, 0)], np.nan)
+            for lag in range(years - 1, -1, -1)
+        ]
+        for metric, years in windows.items()
+    }
+    matches = [
+        ScreenMatch(
+            company_name=names[index.company[row]],
+            financial_year=labels[year_ids[i]],
+            values={
+                metric: [None if v != v else v for v in (float(column[i]) for column in columns)]
+                for metric, columns in values.items()
+            },
+        )
+        for i, row in enumerate(shown.tolist())
+    ]
+    return ScreenResult(
+        rows_scanned=len(index),
+        total_matches=len(rows),
+        matches=matches,
+        elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+    )
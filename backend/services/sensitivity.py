@@ -0,0 +1,147 @@
+"""
+What-if sensitivity engine.
+Sweeps one or two input levers over a grid and scores every point in one batched pass.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.financial_data import FinancialData, SensitivityAxis, SensitivityResult
+from models.financial_frame import INPUT_FIELDS, FinancialFrame
+from services.analyzer import compliance_flags, score_batch
+from services.calculator import RATIO_NODES, calculate_ratios, evaluate_ratio_nodes, ratio_leaves
+from services.scorer import calculate_health_score
+from utils.constants import HEALTH_ZONES, SENSITIVITY_MAX_POINTS
+
+# Day-based levers: target days are converted back into the balance-sheet
+# field that drives them, using that ratio's denominator
+DAY_LEVERS = {
+    "dso": ("trade_receivables", "revenue_from_operations"),
+    "dpo": ("trade_payables", "effective_cogs"),
+    "dio": ("inventories", "effective_cogs"),
+}
+
+AXIS_MODES = ("set", "add", "pct", "scale")
+
+
+def axis_length(axis: SensitivityAxis) -> int:
+    return len(axis.values) if axis.values is not None else axis.steps
+
+
+def axis_values(axis: SensitivityAxis) -> np.ndarray:
+    if axis.values is not None:
+        return np.asarray(axis.values, dtype=np.float64)
+    if axis.steps < 1:
+        raise ValueError(f"Axis '{axis.field}' needs at least one step")
+    return np.linspace(axis.start, axis.stop, axis.steps)
+
+
+def _perturb(base: np.ndarray, mode: str, values: np.ndarray) -> np.ndarray:
+    if mode == "set":
+        return values
+    if mode == "add":
+        return base + values
+    if mode == "scale":
+        return base * values
+    return base * (1 + values / 100)
+
+
+def validate_field(field: str, mode: str) -> None:
+    if field not in INPUT_FIELDS and field not in DAY_LEVERS:
+        raise ValueError(f"Unknown field '{field}'")
+    if mode not in AXIS_MODES:
+        raise ValueError(f"Unknown mode '{mode}' (expected one of {', '.join(AXIS_MODES)})")
+
+
+def perturbed_columns(
+    data: FinancialData,
+    perturbations: List[Tuple[str, str, np.ndarray]],
+    n: int,
+    prev_data: Optional[FinancialData] = None,
+) -> Tuple[Dict[str, np.ndarray], Optional[Dict[str, np.ndarray]]]:
+    """
+    Input columns for N variants of ``data``, each (field, mode, values)
+    perturbation moving one field or day lever per row. Untouched fields
+    are zero-copy broadcasts of the base value.
+    """
+    base = FinancialFrame.from_records([data])
+    columns = {name: np.broadcast_to(base[name], (n,)) for name in INPUT_FIELDS}
+    prev_columns = None
+    prev_base = None
+    if prev_data is not None:
+        prev_base = FinancialFrame.from_records([prev_data])
+        prev_columns = {name: np.broadcast_to(prev_base[name], (n,)) for name in INPUT_FIELDS}
+
+    # Plain input fields first, so day levers see the perturbed revenue / COGS
+    for field, mode, values in perturbations:
+        if field in INPUT_FIELDS:
+            columns[field] = _perturb(base[field], mode, values)
+
+    base_nodes = None
+    for lever, mode, values in perturbations:
+        if lever not in DAY_LEVERS:
+            continue
+        if base_nodes is None:
+            base_nodes = evaluate_ratio_nodes(ratio_leaves(base, prev_base))
+        field, denominator = DAY_LEVERS[lever]
+        base_days = base_nodes[lever]
+        if mode != "set" and np.isnan(base_days).any():
+            raise ValueError(f"Base {lever.upper()} is undefined, so it can only be moved with mode 'set'")
+        target_days = _perturb(base_days, mode, values)
+        if denominator == "effective_cogs":
+            _, effective_cogs = RATIO_NODES["effective_cogs"]
+            scale = effective_cogs(columns["cogs"], columns["revenue_from_operations"])
+        else:
+            scale = columns[denominator]
+        average = target_days * scale / 365
+        # The ratio uses the two-year average when a prior year is present
+        columns[field] = average if prev_columns is None else 2 * average - prev_columns[field]
+
+    return columns, prev_columns
+
+
+def grid_columns(
+    data: FinancialData,
+    axes: List[SensitivityAxis],
+    prev_data: Optional[FinancialData] = None,
+) -> Tuple[Dict[str, np.ndarray], Optional[Dict[str, np.ndarray]], List[np.ndarray]]:
+    """Input columns for every point of a one- or two-axis grid, plus each axis's values."""
+    if not 1 <= len(axes) <= 2:
+        raise ValueError("A sweep takes one or two axes")
+    for axis in axes:
+        validate_field(axis.field, axis.mode)
+    if len({axis.field for axis in axes}) != len(axes):
+        raise ValueError("Each axis must sweep a different field")
+
+    # Sized before any axis is materialised, so an oversized grid costs nothing
+    n = 1
+    for axis in axes:
+        n *= axis_length(axis)
+    if n > SENSITIVITY_MAX_POINTS:
+        raise ValueError(f"Sweep of {n} points exceeds the limit of {SENSITIVITY_MAX_POINTS}")
+    values = [axis_values(axis) for axis in axes]
+    mesh = [m.reshape(-1) for m in np.meshgrid(*values, indexing="ij")]
+
+    perturbations = [(axis.field, axis.mode, grid) for axis, grid in zip(axes, mesh)]
+    columns, prev_columns = perturbed_columns(data, perturbations, n, prev_data)
+    return columns, prev_columns, values
+
+
+def run_sweep(
+    data: FinancialData,
+    axes: List[SensitivityAxis],
+    prev_data: Optional[FinancialData] = None,
+) -> SensitivityResult:
+    columns, prev_columns, values = grid_columns(data, axes, prev_data)
+    _, scores = score_batch(columns, prev_columns)
+
+    shape = tuple(len(v) for v in values)
+    zone_names = np.array([zone[2] for zone in HEALTH_ZONES], dtype=object)
+    base_ratios = calculate_ratios(data, prev_data)
+    return SensitivityResult(
+        axes=[axis.field for axis in axes],
+        axis_values=[v.tolist() for v in values],
+        base_score=calculate_health_score(base_ratios, **compliance_flags(data)),
+        overall=scores["overall"].reshape(shape).tolist(),
+        zone=zone_names[scores["zone"]].reshape(shape).tolist(),
+    )
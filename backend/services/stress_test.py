@@ -0,0 +1,108 @@
+"""
+Monte Carlo stress testing of the health score.
+Draws N scenarios over input fields, scores them in vectorised chunks, optionally across a process pool.
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from models.financial_data import FinancialData, StressFactor, StressTestResult
+from services.analyzer import compliance_flags, score_batch
+from services.calculator import calculate_ratios
+from services.executor import worker_pool
+from services.scorer import calculate_health_score
+from services.sensitivity import perturbed_columns, validate_field
+from utils.constants import (
+    HEALTH_ZONES, NPA_RISK, STRESS_CHUNK_SIZE, STRESS_MAX_SCENARIOS, STRESS_WORKERS,
+)
+
+DISTRIBUTIONS = ("normal", "lognormal", "uniform", "triangular")
+
+# How a draw is applied when the factor gives no mode: lognormal draws are multipliers
+DEFAULT_MODES = {"lognormal": "scale"}
+
+PERCENTILES = [1, 5, 25, 50, 75, 95, 99]
+
+
+def factor_mode(factor: StressFactor) -> str:
+    return factor.mode or DEFAULT_MODES.get(factor.distribution, "pct")
+
+
+def _draw(rng: np.random.Generator, factor: StressFactor, n: int) -> np.ndarray:
+    if factor.distribution == "normal":
+        return rng.normal(factor.mean, factor.std, n)
+    if factor.distribution == "lognormal":
+        return rng.lognormal(factor.mean, factor.std, n)
+    if factor.distribution == "uniform":
+        return rng.uniform(factor.low, factor.high, n)
+    return rng.triangular(factor.low, factor.mode_value, factor.high, n)
+
+
+def _score_chunk(
+    args: Tuple[FinancialData, Optional[FinancialData], List[StressFactor], int, np.random.SeedSequence],
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Score one chunk of scenarios: (overall, zone index, #scenarios with DSCR below the NPA minimum)."""
+    data, prev_data, factors, n, seed = args
+    rng = np.random.default_rng(seed)
+    perturbations = [(f.field, factor_mode(f), _draw(rng, f, n)) for f in factors]
+    columns, prev_columns = perturbed_columns(data, perturbations, n, prev_data)
+    ratios, scores = score_batch(columns, prev_columns)
+    dscr_below = int(np.count_nonzero(ratios["dscr"] < NPA_RISK["standard"]["dscr_min"]))
+    return scores["overall"], scores["zone"].astype(np.int8), dscr_below
+
+
+def run_stress_test(
+    data: FinancialData,
+    factors: List[StressFactor],
+    scenarios: int,
+    seed: int = 0,
+    prev_data: Optional[FinancialData] = None,
+    workers: int = STRESS_WORKERS,
+) -> StressTestResult:
+    """
+    Every chunk of STRESS_CHUNK_SIZE scenarios draws from its own child of
+    ``SeedSequence(seed)``, so results depend only on the seed — not on
+    how many workers ran the chunks.
+    """
+    if not 1 <= scenarios <= STRESS_MAX_SCENARIOS:
+        raise ValueError(f"Scenarios must be between 1 and {STRESS_MAX_SCENARIOS}")
+    if not factors:
+        raise ValueError("At least one stress factor is required")
+    for factor in factors:
+        validate_field(factor.field, factor_mode(factor))
+        if factor.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution '{factor.distribution}' (expected one of {', '.join(DISTRIBUTIONS)})")
+
+    sizes = [STRESS_CHUNK_SIZE] * (scenarios // STRESS_CHUNK_SIZE)
+    if scenarios % STRESS_CHUNK_SIZE:
+        sizes.append(scenarios % STRESS_CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(data, prev_data, factors, n, s) for n, s in zip(sizes, seeds)]
+
+    if workers > 1 and len(tasks) > 1:
+        chunks = list(worker_pool("stress", workers).map(_score_chunk, tasks))
+    else:
+        chunks = [_score_chunk(task) for task in tasks]
+
+    overall = np.concatenate([c[0] for c in chunks])
+    zones = np.concatenate([c[1] for c in chunks])
+    dscr_below = sum(c[2] for c in chunks)
+
+    zone_counts = np.bincount(zones, minlength=len(HEALTH_ZONES))
+    histogram, _ = np.histogram(overall, bins=20, range=(0, 100))
+    base_ratios = calculate_ratios(data, prev_data)
+    return StressTestResult(
+        scenarios=scenarios,
+        seed=seed,
+        base_score=calculate_health_score(base_ratios, **compliance_flags(data)),
+        overall_mean=round(float(overall.mean()), 2),
+        overall_std=round(float(overall.std()), 2),
+        overall_percentiles={
+            f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(overall, PERCENTILES))
+        },
+        overall_histogram=histogram.tolist(),
+        zone_probabilities={
+            zone[2]: round(float(count) / scenarios, 6) for zone, count in zip(HEALTH_ZONES, zone_counts)
+        },
+        dscr_below_npa_probability=round(dscr_below / scenarios, 6),
+    )
@@ -0,0 +1,370 @@
+"""
+Seeded synthetic Indian-SME portfolios for load and scale testing.
+Vectorised company-year series with balanced balance sheets and sector-typical margins and working-capital days.
+"""
+import json
+import time
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterator, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from models.financial_data import DebtorAgeingBucket
+from models.financial_frame import (
+    BALANCE_SHEET_FIELDS, CASH_FLOW_FIELDS, COMPANY_FIELDS, DEBTOR_AGEING_FIELDS, INPUT_FIELDS, OPTIONAL_FIELDS,
+    PROFIT_LOSS_FIELDS, FinancialFrame,
+)
+from services.bulk import ID_COLUMNS, ChunkWriter, _file_format
+from utils.constants import SYNTHETIC_CHUNK_COMPANIES, SYNTHETIC_TAX_RATE
+
+
+class SectorProfile(NamedTuple):
+    weight: float                   # share of companies
+    noun: str                       # used in generated company names
+    gross_margin: float             # revenue - COGS, fraction of revenue
+    employee_pct: float             # employee expenses, fraction of revenue
+    other_pct: float                # other expenses, fraction of revenue
+    dso: float                      # days
+    dio: float
+    dpo: float
+    fixed_asset_turnover: float     # revenue / fixed assets
+    debt_to_equity: float
+    growth: float                   # mean nominal revenue growth per year
+
+
+SECTOR_PROFILES: Dict[str, SectorProfile] = {
+    "Engineering":         SectorProfile(0.20, "Engineering Works", 0.33, 0.09, 0.10, 75, 70, 60, 2.5, 1.1, 0.10),
+    "Textiles":            SectorProfile(0.12, "Textiles", 0.28, 0.09, 0.07, 80, 95, 65, 2.0, 1.4, 0.07),
+    "Trading":             SectorProfile(0.18, "Traders", 0.12, 0.03, 0.04, 45, 40, 40, 15.0, 0.9, 0.09),
+    "IT Services":         SectorProfile(0.15, "Infotech", 0.55, 0.35, 0.08, 70, 3, 30, 8.0, 0.3, 0.15),
+    "Pharma & Chemicals":  SectorProfile(0.10, "Chemicals", 0.40, 0.10, 0.14, 85, 90, 75, 2.2, 0.8, 0.11),
+    "Food Processing":     SectorProfile(0.10, "Foods", 0.22, 0.06, 0.08, 30, 45, 35, 3.0, 1.0, 0.09),
+    "Construction":        SectorProfile(0.08, "Infra Projects", 0.28, 0.08, 0.09, 110, 60, 90, 4.0, 1.6, 0.12),
+    "Auto Components":     SectorProfile(0.07, "Auto Components", 0.32, 0.10, 0.08, 65, 50, 60, 2.0, 1.2, 0.10),
+}
+SECTORS = list(SECTOR_PROFILES)
+
+NAME_PREFIXES = [
+    "Shree", "Sri", "Balaji", "Ganesh", "Laxmi", "Sai", "Om", "Jai", "Bharat", "Hindustan", "Deccan", "Konark",
+    "Kaveri", "Narmada", "Himalaya", "Surya", "Vardhman", "Mahalaxmi", "Annapurna", "Ashoka", "Sahyadri", "Tirupati",
+]
+NAME_MIDDLES = [
+    "Precision", "Global", "National", "United", "Modern", "Star", "Royal", "Prime", "Classic", "Apex", "Supreme",
+    "Dynamic", "Western", "Eastern", "Southern", "Northern", "Pioneer", "Standard", "Allied", "Reliable",
+]
+
+# Columns of a generated chunk: ids, sector, then the bulk-analysis input columns
+COLUMNS = ID_COLUMNS + ["sector"] + INPUT_FIELDS + OPTIONAL_FIELDS
+
+# Balance-sheet groups used to keep the statements consistent
+_EQUITY_START = BALANCE_SHEET_FIELDS.index("share_capital")
+_NON_CASH_ASSETS = [name for name in BALANCE_SHEET_FIELDS[:_EQUITY_START] if name != "cash_and_equivalents"]
+_LIABILITIES = BALANCE_SHEET_FIELDS[BALANCE_SHEET_FIELDS.index("long_term_borrowings"):]
+_FIXED_ASSETS = ("fixed_assets", "capital_wip", "long_term_investments")
+_BORROWINGS = ("long_term_borrowings", "short_term_borrowings")
+_WORKING_ASSETS = [name for name in _NON_CASH_ASSETS if name not in _FIXED_ASSETS]
+_WORKING_LIABILITIES = [name for name in _LIABILITIES if name not in _BORROWINGS]
+_CARRIED = _NON_CASH_ASSETS + _LIABILITIES + ["share_capital"]
+
+
+def financial_year_label(start: int) -> str:
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def _profile_columns(sector: np.ndarray) -> Dict[str, np.ndarray]:
+    return {
+        field: np.array([getattr(SECTOR_PROFILES[s], field) for s in SECTORS])[sector]
+        for field in SectorProfile._fields if field not in ("weight", "noun")
+    }
+
+
+def macro_shocks(seed: int, years: int) -> np.ndarray:
+    """Economy-wide shock per year, shared by every company of a dataset (the burn-in year is index 0)."""
+    return np.random.default_rng([seed, 0]).normal(0, 1, years + 1)
+
+
+# ── One block of companies ─────────────────────────────────────────
+
+def generate_block(seed: int, block: int, companies: int, years: int, start_year: int) -> pd.DataFrame:
+    """
+    ``companies`` companies × ``years`` years, rows grouped by company and
+    ordered by year. Block ``b`` always holds companies
+    ``b * SYNTHETIC_CHUNK_COMPANIES`` onwards, drawn from its own seeded
+    stream, so a dataset depends only on (seed, companies, years, start_year).
+    """
+    rng = np.random.default_rng([seed, 1, block])
+    m = companies
+    first_id = block * SYNTHETIC_CHUNK_COMPANIES
+    weights = np.array([SECTOR_PROFILES[s].weight for s in SECTORS])
+    sector = rng.choice(len(SECTORS), size=m, p=weights / weights.sum())
+    p = _profile_columns(sector)
+
+    def jitter(mean: np.ndarray, rel: float) -> np.ndarray:
+        return mean * rng.lognormal(0, rel, m)
+
+    # Company-level character, drawn once and persistent across years
+    gm_c = np.clip(p["gross_margin"] + rng.normal(0, 0.05, m), 0.05, 0.85)
+    emp_c = jitter(p["employee_pct"], 0.25)
+    oth_c = jitter(p["other_pct"], 0.25)
+    dso_c, dio_c, dpo_c = jitter(p["dso"], 0.25), jitter(p["dio"], 0.3), jitter(p["dpo"], 0.25)
+    fat_c = jitter(p["fixed_asset_turnover"], 0.3)
+    de_c = jitter(p["debt_to_equity"], 0.5)
+    growth_c = p["growth"] + rng.normal(0, 0.04, m)
+    rate = rng.uniform(0.085, 0.135, m)                  # borrowing cost
+    tenor = rng.integers(5, 9, m).astype(np.float64)     # term-loan years
+    wc_funded = rng.uniform(0.2, 0.7, m)                 # share of working capital on CC / OD limits
+    payout = np.where(rng.random(m) < 0.3, rng.uniform(0.05, 0.25, m), 0.0)
+    salary = rng.uniform(3.5e5, 9e5, m)                  # cost per employee, for headcount
+    # Compliance lapses and related-party funding are persistent traits of a minority
+    statutory_lapse = rng.random(m) < 0.08
+    msme_lapse = rng.random(m) < 0.15
+    promoter_share = np.where(rng.random(m) < 0.3, rng.uniform(0.1, 0.6, m), 0.0)
+    itc_months = np.where(rng.random(m) < 0.02, rng.uniform(3.5, 6, m), rng.uniform(0.1, 1.2, m))
+    lti_pct = np.where(rng.random(m) < 0.25, rng.uniform(0.01, 0.08, m), 0.0)
+
+    macro = macro_shocks(seed, years)
+    revenue = np.exp(rng.normal(np.log(2.5e8), 1.0, m))   # median ₹25 Cr
+    growth, gm = growth_c.copy(), gm_c.copy()
+    dso, dio, dpo = dso_c.copy(), dio_c.copy(), dpo_c.copy()
+
+    out = {name: np.empty((years, m)) for name in INPUT_FIELDS + OPTIONAL_FIELDS}
+    state: Dict[str, np.ndarray] = {}
+
+    for t in range(years + 1):     # t == 0 is a burn-in year that sets the opening balances
+        z = rng.standard_normal(m)                        # company-year business shock
+        shock = 0.8 * z + 0.6 * macro[t]
+        growth = growth_c + 0.5 * (growth - growth_c) + 0.07 * shock
+        revenue = revenue * (1 + np.clip(growth, -0.6, 1.5))
+        gm = np.clip(gm_c + 0.6 * (gm - gm_c) + 0.015 * shock, 0.02, 0.9)
+        # Costs are sticky: when growth falls short of trend their share of revenue rises
+        lag = np.clip(growth_c - growth, -0.3, 0.5)
+        emp_pct = emp_c * (1 + 0.6 * lag)
+        oth_pct = oth_c * (1 + 0.4 * lag) * rng.lognormal(0, 0.05, m)
+        # Bad years stretch receivables, inventory and payables
+        dso = np.clip(dso_c + 0.7 * (dso - dso_c) - 8 * shock + rng.normal(0, 4, m), 5, 365)
+        dio = np.clip(dio_c + 0.7 * (dio - dio_c) - 6 * shock + rng.normal(0, 4, m), 0, 365)
+        dpo = np.clip(dpo_c + 0.7 * (dpo - dpo_c) - 6 * shock + rng.normal(0, 4, m), 5, 365)
+
+        cogs = revenue * (1 - gm)
+        employee = revenue * emp_pct
+        other = revenue * oth_pct
+        other_income = revenue * rng.uniform(0, 0.015, m)
+
+        receivables = revenue * dso / 365
+        inventories = cogs * dio / 365
+        payables = cogs * dpo / 365
+
+        if t == 0:
+            # Burn-in starts at target capacity; its borrowings are set from the target D/E below
+            fixed_assets_prev = np.round(revenue / fat_c)
+            cwip_prev = np.zeros(m)
+            ltb_prev = np.zeros(m)
+        else:
+            fixed_assets_prev = state["fixed_assets"]
+            cwip_prev = state["capital_wip"]
+            ltb_prev = state["long_term_borrowings"]
+        depreciation = np.round(fixed_assets_prev * 0.08)
+        target_fa = revenue / fat_c
+        capex = np.round(np.maximum(depreciation + 0.5 * (target_fa - fixed_assets_prev + depreciation), 0))
+        # Part of the year's spend is still under construction; last year's CWIP is completed and
+        # capitalised, so ΔFA + depreciation + ΔCWIP is exactly the (non-negative) spend
+        capital_wip = np.round(capex * np.where(rng.random(m) < 0.3, rng.uniform(0.1, 0.5, m), 0.0))
+        fixed_assets = fixed_assets_prev - depreciation + capex - capital_wip + cwip_prev
+        repayment = ltb_prev / tenor
+        long_term_borrowings = np.maximum(ltb_prev - repayment + 0.6 * capex * (de_c > 0.4), 0)
+        short_term_borrowings = wc_funded * np.maximum(receivables + inventories - payables, 0)
+        finance_costs = rate * ((ltb_prev + long_term_borrowings) / 2 + short_term_borrowings)
+
+        ebit = revenue - cogs - employee - other - depreciation
+        tax = SYNTHETIC_TAX_RATE * np.maximum(ebit - finance_costs + other_income, 0)
+
+        v = {
+            "revenue_from_operations": revenue, "other_income": other_income, "cogs": cogs,
+            "employee_expenses": employee, "finance_costs": finance_costs, "depreciation": depreciation,
+            "other_expenses": other, "tax_expense": tax,
+            "fixed_assets": fixed_assets, "capital_wip": capital_wip,
+            "long_term_investments": revenue * lti_pct,
+            "deferred_tax_asset": np.zeros(m),
+            "long_term_loans_advances": revenue * rng.uniform(0, 0.02, m),
+            "other_non_current_assets": revenue * rng.uniform(0, 0.01, m),
+            "inventories": inventories, "trade_receivables": receivables,
+            "short_term_loans_advances": revenue * rng.uniform(0, 0.02, m),
+            "gst_itc_receivable": revenue / 12 * itc_months * 0.5,
+            "tds_advance_tax_receivable": tax * 0.15 + revenue * 0.002,
+            "other_current_assets": revenue * rng.uniform(0, 0.015, m),
+            "money_received_share_warrants": np.zeros(m),
+            "long_term_borrowings": long_term_borrowings,
+            "deferred_tax_liability": fixed_assets * 0.02,
+            "long_term_provisions": employee * 0.05,
+            "short_term_borrowings": short_term_borrowings, "trade_payables": payables,
+            "gst_payable": revenue * 0.18 / 12 * rng.uniform(0.2, 0.8, m),
+            "tds_payable": np.where(statutory_lapse, employee * 0.1 / 12 * rng.uniform(0.5, 2, m), 0.0),
+            "pf_esi_payable": np.where(statutory_lapse, employee * 0.12 / 12 * rng.uniform(0.5, 2, m), 0.0),
+            # Project businesses (long DSO) take sizeable customer advances
+            "advance_from_customers": revenue * rng.uniform(0, 0.03, m) * np.where(p["dso"] > 100, 3, 1),
+            "other_current_liabilities": revenue * rng.uniform(0.005, 0.03, m),
+        }
+        # Whole rupees: every total is then an exact float sum, so the balance sheet balances to the rupee
+        v = {name: np.round(column) for name, column in v.items()}
+        pat = (v["revenue_from_operations"] - v["cogs"] - v["employee_expenses"] - v["other_expenses"]
+               - v["depreciation"] - v["finance_costs"] + v["other_income"] - v["tax_expense"])
+        dividends = np.round(payout * np.maximum(pat, 0))
+
+        if t == 0:
+            # Opening capital structure: net funding needs split between debt and equity at the
+            # company's target D/E, with a cash buffer of ~3% of revenue
+            cash = np.round(revenue * 0.03)
+            funding = cash + sum(v[name] for name in _NON_CASH_ASSETS) - sum(v[name] for name in _WORKING_LIABILITIES)
+            debt = np.round(funding * de_c / (1 + de_c))
+            v["long_term_borrowings"] = np.maximum(debt - v["short_term_borrowings"], 0)
+            equity = funding - v["long_term_borrowings"] - v["short_term_borrowings"]
+            v["share_capital"] = np.round(np.maximum(equity, revenue * 0.05) * rng.uniform(0.15, 0.5, m))
+            v["reserves_surplus"] = equity - v["share_capital"]
+        else:
+            v["share_capital"] = state["share_capital"]
+            v["reserves_surplus"] = state["reserves_surplus"] + pat - dividends
+            liabilities = sum(v[name] for name in _LIABILITIES)
+            cash = v["share_capital"] + v["reserves_surplus"] + v["money_received_share_warrants"] + liabilities \
+                - sum(v[name] for name in _NON_CASH_ASSETS)
+            # A cash shortfall is drawn on the overdraft, leaving a minimum balance
+            floor = np.round(revenue * 0.005)
+            draw = np.maximum(floor - cash, 0)
+            v["short_term_borrowings"] = v["short_term_borrowings"] + draw
+            cash = cash + draw
+        v["cash_and_equivalents"] = cash
+
+        if t > 0:
+            delta = {name: v[name] - state[name] for name in _CARRIED}
+            capex_paid = delta["fixed_assets"] + v["depreciation"] + delta["capital_wip"]
+            v["operating_cf"] = (
+                pat + v["depreciation"]
+                - sum(delta[name] for name in _WORKING_ASSETS)
+                + sum(delta[name] for name in _WORKING_LIABILITIES)
+            )
+            v["investing_cf"] = -capex_paid - delta["long_term_investments"]
+            v["financing_cf"] = (delta["long_term_borrowings"] + delta["short_term_borrowings"]
+                                 + delta["share_capital"] - dividends)
+            v["capex"] = capex_paid
+            v["promoter_loans"] = np.round(v["long_term_borrowings"] * promoter_share)
+            v["msme_payables"] = np.where(msme_lapse, np.round(v["trade_payables"] * rng.uniform(0.05, 0.3, m)), 0.0)
+            v["msme_receivables"] = np.round(v["trade_receivables"] * rng.uniform(0, 0.3, m))
+            v["annual_loan_repayment"] = np.round(v["long_term_borrowings"] / tenor)
+            v["headcount"] = np.maximum(np.round(v["employee_expenses"] / salary), 1)
+            # Debtor ageing: older buckets grow with DSO; the last bucket takes the rounding
+            spread = np.clip(dso / 365, 0.02, 0.9)
+            shares = np.stack([1 - spread, spread * 0.5, spread * 0.25, spread * 0.15, spread * 0.10])
+            shares /= shares.sum(axis=0)
+            buckets = np.round(shares * v["trade_receivables"])
+            buckets[-1] = v["trade_receivables"] - buckets[:-1].sum(axis=0)
+            for name, bucket in zip(DEBTOR_AGEING_FIELDS, buckets):
+                v[name] = bucket
+            for name in out:
+                out[name][t - 1] = v[name]
+        state = v
+
+    frame = pd.DataFrame({name: out[name].T.ravel() for name in INPUT_FIELDS + OPTIONAL_FIELDS})
+    ids = range(first_id, first_id + m)
+    names = [
+        f"{NAME_PREFIXES[i % len(NAME_PREFIXES)]} {NAME_MIDDLES[(i // len(NAME_PREFIXES)) % len(NAME_MIDDLES)]} "
+        f"{SECTOR_PROFILES[SECTORS[s]].noun} Pvt Ltd [{i:07d}]"
+        for i, s in zip(ids, sector.tolist())
+    ]
+    frame.insert(0, "company_name", np.repeat(np.array(names, dtype=object), years))
+    labels = np.array([financial_year_label(start_year + y) for y in range(years)], dtype=object)
+    frame.insert(1, "financial_year", np.tile(labels, m))
+    frame.insert(2, "sector", np.repeat(np.array(SECTORS, dtype=object)[sector], years))
+    return frame
+
+
+
+
+# ── Datasets ───────────────────────────────────────────────────────
+
+def generate_chunks(
+    companies: int,
+    years: int = 10,
+    seed: int = 0,
+    start_year: int = 2015,
+) -> Iterator[pd.DataFrame]:
+    """
+    The dataset as DataFrames of SYNTHETIC_CHUNK_COMPANIES companies (the
+    last may be shorter), with the ``COLUMNS`` layout ``bulk_analyze.py``
+    reads. Rows are company-years grouped by company, oldest year first.
+    """
+    if companies < 1 or years < 1:
+        raise ValueError("companies and years must be at least 1")
+    for block, first in enumerate(range(0, companies, SYNTHETIC_CHUNK_COMPANIES)):
+        yield generate_block(seed, block, min(SYNTHETIC_CHUNK_COMPANIES, companies - first), years, start_year)
+
+
+def generate_frame(companies: int, years: int = 10, seed: int = 0, start_year: int = 2015) -> FinancialFrame:
+    """A whole dataset as one FinancialFrame, for in-process benchmarks."""
+    chunk = pd.concat(list(generate_chunks(companies, years, seed, start_year)), ignore_index=True)
+    return FinancialFrame.from_columns(
+        {name: chunk[name].to_numpy() for name in INPUT_FIELDS + OPTIONAL_FIELDS},
+        company_names=chunk["company_name"].tolist(),
+        financial_years=chunk["financial_year"].tolist(),
+    )
+
+
+_AGEING_NAMES = list(DebtorAgeingBucket.model_fields)
+
+
+def financial_data_lines(chunk: pd.DataFrame) -> Iterator[str]:
+    """Rows of a chunk as FinancialData JSON, the body format of /api/calculate/batch."""
+    columns = {name: chunk[name].tolist() for name in COLUMNS}
+    for i in range(len(chunk)):
+        row = {name: column[i] for name, column in columns.items()}
+        yield json.dumps({
+            "company_name": row["company_name"],
+            "financial_year": row["financial_year"],
+            "balance_sheet": {name: row[name] for name in BALANCE_SHEET_FIELDS},
+            "profit_loss": {name: row[name] for name in PROFIT_LOSS_FIELDS},
+            "cash_flow": {name: row[name] for name in CASH_FLOW_FIELDS},
+            "headcount": int(row["headcount"]),
+            "debtor_ageing": {name: row[field] for name, field in zip(_AGEING_NAMES, DEBTOR_AGEING_FIELDS)},
+            **{name: row[name] for name in COMPANY_FIELDS},
+        })
+
+
+def write_dataset(
+    path: str,
+    companies: int,
+    years: int = 10,
+    seed: int = 0,
+    start_year: int = 2015,
+    financial_data: bool = False,
+    progress: Optional[Callable[[int, float], None]] = None,
+) -> dict:
+    """
+    Generate a dataset straight into a .csv, .jsonl / .ndjson or .parquet
+    file one chunk at a time, so memory stays flat at any size. With
+    ``financial_data`` a JSON-lines file holds nested FinancialData records
+    instead of flat rows.
+    """
+    fmt = _file_format(path)
+    if financial_data and fmt != "jsonl":
+        raise ValueError("financial_data output needs a .jsonl or .ndjson path")
+    writer = None if financial_data else ChunkWriter(path)
+    rows = 0
+    start = time.perf_counter()
+    try:
+        with open(path, "w") if financial_data else nullcontext() as f:
+            for chunk in generate_chunks(companies, years, seed, start_year):
+                if financial_data:
+                    f.writelines(line + "\n" for line in financial_data_lines(chunk))
+                else:
+                    writer.write(chunk)
+                rows += len(chunk)
+                if progress is not None:
+                    progress(rows, time.perf_counter() - start)
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+    }
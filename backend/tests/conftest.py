@@ -0,0 +1,51 @@
+import random
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pytest
+
+from models.financial_data import BalanceSheet, CashFlow, FinancialData, ProfitLoss
+from models.financial_frame import FinancialFrame
+from services.synthetic import generate_frame
+
+
+def random_financials(rng: random.Random, zero_p: float = 0.2) -> FinancialData:
+    """Arbitrary (not necessarily consistent) statements: zeros, negatives and odd precisions included."""
+    def value(scale: float = 1000, negative: bool = False) -> float:
+        if rng.random() < zero_p:
+            return 0.0
+        return round(rng.uniform(-scale if negative else 0, scale), rng.choice([0, 1, 2, 3]))
+
+    balance_sheet = BalanceSheet(**{name: value() for name in BalanceSheet.model_fields})
+    balance_sheet.reserves_surplus = value(negative=True)
+    return FinancialData(
+        balance_sheet=balance_sheet,
+        profit_loss=ProfitLoss(**{name: value(3000) for name in ProfitLoss.model_fields}),
+        cash_flow=CashFlow(**{name: value(500, negative=True) for name in CashFlow.model_fields}),
+        promoter_loans=value(),
+        msme_payables=value(),
+        msme_receivables=value(),
+        annual_loan_repayment=value(100),
+    )
+
+
+@pytest.fixture(scope="session")
+def records() -> List[FinancialData]:
+    """Random statements at several sparsities, realistic synthetic ones and an all-zero record."""
+    rng = random.Random(11)
+    randoms = [random_financials(rng, zero_p) for zero_p in (0.0, 0.2, 0.5, 0.9) for _ in range(100)]
+    return randoms + generate_frame(40, years=3, seed=3).to_records() + [FinancialData()]
+
+
+@pytest.fixture(scope="session")
+def record_pairs(records) -> List[Tuple[FinancialData, Optional[FinancialData]]]:
+    """Each record with the next one as its prior year on every other row, standalone otherwise."""
+    return [(data, records[(i + 1) % len(records)] if i % 2 else None) for i, data in enumerate(records)]
+
+
+@pytest.fixture(scope="session")
+def batch_pairs(record_pairs) -> Tuple[FinancialFrame, FinancialFrame, np.ndarray]:
+    """``record_pairs`` as the (frame, prev_frame, has_prev) arguments of the batch engines."""
+    frame = FinancialFrame.from_records([data for data, _ in record_pairs])
+    prev_frame = FinancialFrame.from_records([prev or data for data, prev in record_pairs])
+    return frame, prev_frame, np.array([prev is not None for _, prev in record_pairs])
@@ -0,0 +1,77 @@
+import pytest
+
+from services import analysis_cache, metrics, recommender, scorer
+from services.analysis_cache import AnalysisCache, constants_fingerprint
+from services.analyzer import analyze
+from utils import constants
+
+
+def test_hit_returns_the_same_analysis(records):
+    cache = AnalysisCache(maxsize=8)
+    data, prev = records[0], records[1]
+    first = cache.analyze(data, prev)
+    second = cache.analyze(data, prev)
+    assert second == first == analyze(data, prev)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_returned_analyses_are_copies(records):
+    cache = AnalysisCache(maxsize=8)
+    cache.analyze(records[0]).session_id = "changed"
+    assert cache.analyze(records[0]).session_id is None
+
+
+def test_lru_eviction(records):
+    cache = AnalysisCache(maxsize=2)
+    for data in records[:3]:
+        cache.analyze(data)
+    cache.analyze(records[0])
+    assert cache.stats()["evictions"] == 2
+    assert cache.misses == 4
+
+
+@pytest.mark.parametrize("table, edit", [
+    (scorer.LEVERAGE_METRICS, lambda t: t.__setitem__(0, ("debt_to_equity", 0.6, 1.0, 2.0, True))),
+    (constants.HEALTH_SCORE_WEIGHTS, lambda t: t.__setitem__("liquidity", t["liquidity"] + 1)),
+    (recommender.RECOMMENDATION_RULES,
+     lambda t: t.__setitem__(0, t[0]._replace(predicate=lambda c: c["pf_esi_payable"] > 1))),
+])
+def test_editing_an_engine_table_invalidates(records, table, edit):
+    saved = table.copy()
+    cache = AnalysisCache(maxsize=8, recheck_s=0)
+    cache.analyze(records[0])
+    before = constants_fingerprint()
+    try:
+        edit(table)
+        assert constants_fingerprint() != before
+        cache.analyze(records[0])
+        assert (cache.misses, cache.invalidations) == (2, 1)
+    finally:
+        table.clear()
+        table.update(saved) if isinstance(table, dict) else table.extend(saved)
+    assert constants_fingerprint() == before
+
+
+def test_fingerprint_is_rechecked_on_an_interval(records, monkeypatch):
+    cache = AnalysisCache(maxsize=8, recheck_s=3600)
+    calls = []
+    monkeypatch.setattr(analysis_cache, "constants_fingerprint", lambda: calls.append(1) or cache._fingerprint)
+    for _ in range(5):
+        cache.analyze(records[0])
+    assert calls == []
+    cache.check_constants()
+    assert calls == [1]
+
+
+def test_stats_are_published_in_metrics(records):
+    cache = analysis_cache.analysis_cache
+    cache.clear()
+    cache.analyze(records[5])
+    cache.analyze(records[5])
+    stats = cache.stats()
+    text = metrics.render()
+    assert f'fhc_cache_hits_total{{cache="analysis"}} {stats["hits"]}' in text
+    assert f'fhc_cache_misses_total{{cache="analysis"}} {stats["misses"]}' in text
+    assert f'fhc_cache_evictions_total{{cache="analysis"}} {stats["evictions"]}' in text
+    assert f'fhc_cache_invalidations_total{{cache="analysis"}} {stats["invalidations"]}' in text
+    assert 'fhc_cache_entries{cache="analysis"} 1' in text
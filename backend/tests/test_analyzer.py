@@ -0,0 +1,25 @@
+from models.financial_frame import DERIVED_FIELDS
+from models.financial_record import FinancialRecord
+from services.analyzer import analyze, analyze_batch, compliance_flags
+from services.calculator import calculate_ratios, ratio_values
+from services.scorer import score_values
+
+
+def test_analyze_batch_is_byte_identical(record_pairs):
+    batch = analyze_batch([data for data, _ in record_pairs], [prev for _, prev in record_pairs])
+    for (data, prev), analysis in zip(record_pairs, batch):
+        assert analysis.model_dump_json() == analyze(data, prev).model_dump_json()
+
+
+def test_slots_records_match_models(record_pairs):
+    for data, prev in record_pairs:
+        record = FinancialRecord.from_data(data)
+        for name in DERIVED_FIELDS:
+            parts = (data.balance_sheet, data.profit_loss, data.cash_flow)
+            assert getattr(record, name) == getattr(next((p for p in parts if hasattr(p, name)), data), name), name
+
+        values = ratio_values(record, FinancialRecord.from_data(prev) if prev is not None else None)
+        model = calculate_ratios(data, prev)
+        assert values.to_model() == model
+        flags = compliance_flags(data)
+        assert score_values(values, **flags).to_model() == score_values(model, **flags).to_model()
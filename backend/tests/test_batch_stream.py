@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+import pytest
+
+from models.financial_data import FinancialData
+from services.batch_stream import LineSplitter, stream_analyses
+from services.executor import shutdown_pools
+from utils.constants import CALCULATE_STREAM_MAX_LINE_BYTES
+
+
+def test_splitter_joins_lines_cut_across_chunks():
+    splitter = LineSplitter(max_bytes=10)
+    assert splitter.feed(b"ab") == []
+    assert splitter.feed(b"c\nde\n\nf") == [(1, b"abc"), (2, b"de"), (3, b"")]
+    assert splitter.close() == [(4, b"f")]
+    assert splitter.too_long == []
+
+
+def test_splitter_drops_and_numbers_oversized_lines():
+    splitter = LineSplitter(max_bytes=4)
+    # Line 2 overflows within one chunk, line 3 only once its second piece arrives
+    assert splitter.feed(b"ok\n0123456789\n012") == [(1, b"ok")]
+    assert splitter.feed(b"3456") == []
+    assert splitter.feed(b"789\nlast") == []
+    assert splitter.too_long == [2, 3]
+    assert splitter.close() == [(4, b"last")]
+
+
+def _record(year: str) -> bytes:
+    return FinancialData(financial_year=year).model_dump_json().encode()
+
+
+def _stream(parts, chunk_size):
+    async def body():
+        for part in parts:
+            yield part
+
+    async def collect():
+        try:
+            return b"".join([out async for out in stream_analyses(body(), chunk_size)])
+        finally:
+            shutdown_pools()
+
+    return [json.loads(line) for line in asyncio.run(collect()).splitlines()]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 10])
+def test_stream_keeps_input_order_around_oversized_lines(chunk_size):
+    oversized = b"x" * (CALCULATE_STREAM_MAX_LINE_BYTES + 1)
+    years = ["2015-16", "2016-17", "2017-18"]
+    invalid = b'{"balance_sheet": 1}'
+    body = b"\n".join([_record(years[0]), _record(years[1]), invalid, oversized, _record(years[2])]) + b"\n"
+    out = _stream([body], chunk_size)
+    assert [item.get("line") or item["financial_data"]["financial_year"] for item in out] == [
+        "2015-16", "2016-17", 3, 4, "2017-18",
+    ]
+    assert out[3]["error"] == "Line is too long"
@@ -0,0 +1,64 @@
+import math
+
+import numpy as np
+import pytest
+
+from models import binary_records
+from models.binary_records import SCHEMAS, decode, decode_many, encode, encode_many
+from models.financial_data import DebtorAgeingBucket, FinancialData, FinancialRatios, HealthScoreBreakdown
+from models.financial_frame import INPUT_FIELDS, OPTIONAL_FIELDS
+from services.analyzer import analyze
+
+
+def test_layouts_cover_their_models():
+    # Failing here means a model changed: give the new layout a new schema id
+    assert SCHEMAS[1].fields == INPUT_FIELDS + OPTIONAL_FIELDS
+    assert SCHEMAS[2].fields == list(FinancialRatios.model_fields)
+    assert SCHEMAS[3].fields == [f for f in HealthScoreBreakdown.model_fields if f not in ("zone", "zone_color")] + [
+        "zone_index"
+    ]
+
+
+def test_round_trip(records):
+    analyses = [analyze(data) for data in records[::5]]
+    for attr in ("financial_data", "ratios", "health_score"):
+        models = [getattr(a, attr) for a in analyses]
+        assert decode_many(encode_many(models)) == models, attr
+
+
+def test_none_and_optional_parts_round_trip(records):
+    data = records[0].model_copy(update={"headcount": 42, "debtor_ageing": DebtorAgeingBucket(above_180=7.5)})
+    assert decode(encode(data)) == data
+    bare = records[0].model_copy(update={"headcount": None, "debtor_ageing": None})
+    assert decode(encode(bare)) == bare
+
+    ratios = FinancialRatios(current_ratio=1.5)
+    decoded = decode(encode(ratios))
+    assert decoded == ratios and decoded.dscr is None
+    assert not binary_records.present(encode(ratios))[0, SCHEMAS[2].fields.index("dscr")]
+
+
+def test_nan_stays_nan_rather_than_none():
+    buffer = encode(FinancialRatios(current_ratio=float("nan"), dscr=None))
+    decoded = decode(buffer)
+    assert math.isnan(decoded.current_ratio) and decoded.dscr is None
+    mask = binary_records.present(buffer)[0]
+    assert mask[SCHEMAS[2].fields.index("current_ratio")] and not mask[SCHEMAS[2].fields.index("dscr")]
+
+
+def test_company_name_byte_limit():
+    fits = "Ā" * (binary_records.COMPANY_NAME_BYTES // 2)    # two UTF-8 bytes each
+    data = FinancialData(company_name=fits)
+    assert decode(encode(data)).company_name == fits
+    with pytest.raises(ValueError, match="longer than 128 bytes"):
+        encode(FinancialData(company_name=fits + "x"))
+
+
+def test_headers_are_checked():
+    buffer = bytearray(encode(FinancialRatios()))
+    buffer[2:4] = np.uint16(len(SCHEMAS[2].fields) + 1).tobytes()
+    with pytest.raises(ValueError, match="expects 32 fields"):
+        decode(bytes(buffer))
+    buffer[0:2] = np.uint16(99).tobytes()
+    with pytest.raises(ValueError, match="Unknown binary schema id 99"):
+        decode(bytes(buffer))
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from services.bulk import ChunkWriter, run_bulk
+from services.synthetic import write_dataset
+
+
+@pytest.fixture(scope="module")
+def portfolio_csv(tmp_path_factory):
+    path = tmp_path_factory.mktemp("bulk") / "portfolio.csv"
+    write_dataset(str(path), companies=30, years=2, seed=5)
+    return path
+
+
+def test_jsonl_output_matches_csv_output(portfolio_csv, tmp_path):
+    run_bulk(str(portfolio_csv), str(tmp_path / "out.csv"), chunk_size=17)
+    run_bulk(str(portfolio_csv), str(tmp_path / "out.jsonl"), chunk_size=17)
+    from_csv = pd.read_csv(tmp_path / "out.csv", float_precision="round_trip")
+    from_jsonl = pd.read_json(tmp_path / "out.jsonl", lines=True, precise_float=True)
+    pd.testing.assert_frame_equal(from_csv.fillna({"recommendations": ""}), from_jsonl, check_dtype=False)
+
+
+def test_jsonl_floats_are_written_shortest(tmp_path):
+    path = tmp_path / "floats.jsonl"
+    writer = ChunkWriter(str(path))
+    writer.write(pd.DataFrame({"company_name": ["A", "B"], "net_margin": [-15.05, float("nan")]}))
+    writer.close()
+    assert path.read_text().splitlines() == [
+        '{"company_name": "A", "net_margin": -15.05}',
+        '{"company_name": "B", "net_margin": null}',
+    ]
+
@@ -0,0 +1,10 @@
+from services.calculator import RATIO_FIELDS, calculate_ratios, calculate_ratios_batch
+
+
+def test_batch_ratios_match_scalar(record_pairs, batch_pairs):
+    ratios = calculate_ratios_batch(*batch_pairs)
+    for row, (data, prev) in enumerate(record_pairs):
+        expected = calculate_ratios(data, prev)
+        for name in RATIO_FIELDS:
+            value = float(ratios[name][row])
+            assert (None if value != value else value) == getattr(expected, name), (row, name)
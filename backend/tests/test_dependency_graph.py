@@ -0,0 +1,96 @@
+import asyncio
+import random
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from models.database import AnalysisSession, Base, async_url, make_engine
+from models.financial_data import AnalysisEdit, AnalysisRequest, FullAnalysis
+from models.financial_frame import INPUT_FIELDS
+from routers.calculate import calculate, edit
+from services.analyzer import analyze
+from services.dependency_graph import IncrementalAnalysis, edit_sessions
+from services.executor import shutdown_pools
+
+
+def _edited(data, changes):
+    edited = data.model_copy(deep=True)
+    for field, value in changes.items():
+        parts = (edited.balance_sheet, edited.profit_loss, edited.cash_flow)
+        setattr(next((p for p in parts if field in type(p).model_fields), edited), field, value)
+    return edited
+
+
+def test_incremental_updates_match_full_analysis(record_pairs):
+    rng = random.Random(5)
+    for data, prev in record_pairs[::7]:
+        incremental = IncrementalAnalysis(data, prev)
+        for _ in range(4):
+            fields = rng.sample(INPUT_FIELDS, rng.randint(1, 3))
+            changes = {field: round(rng.uniform(-500, 2000), 2) for field in fields}
+            if prev is not None and rng.random() < 0.5:
+                changes["prev_" + rng.choice(INPUT_FIELDS)] = round(rng.uniform(0, 2000), 2)
+            incremental.update(changes)
+            data = _edited(data, {f: v for f, v in changes.items() if not f.startswith("prev_")})
+            if prev is not None:
+                prev = _edited(prev, {f[5:]: v for f, v in changes.items() if f.startswith("prev_")})
+            assert incremental.analysis().model_dump_json() == analyze(data, prev).model_dump_json()
+
+
+def test_incremental_rejects_unknown_and_orphan_prior_fields(records):
+    incremental = IncrementalAnalysis(records[0])
+    with pytest.raises(ValueError, match="Unknown input fields"):
+        incremental.update({"not_a_field": 1.0})
+    with pytest.raises(ValueError, match="No prior-year data"):
+        incremental.update({"prev_cogs": 1.0})
+
+
+def test_patch_edits_a_stored_session(tmp_path, records):
+    url = f"sqlite:///{tmp_path / 'edit.db'}"
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    data, prev = records[430], records[431]
+    changes = {"cogs": 1234.5, "prev_inventories": 321.0}
+    edited = _edited(data, {"cogs": 1234.5})
+    edited_prev = _edited(prev, {"inventories": 321.0})
+
+    async def session_flow():
+        async_engine = create_async_engine(async_url(url))
+        sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+        try:
+            async with sessions() as db:
+                await calculate(AnalysisRequest(financial_data=data, previous_year_data=prev, session_id="s"), db)
+                delta = await edit("s", AnalysisEdit(changes=changes), db)
+                stored = await db.get(AnalysisSession, "s")
+                assert FullAnalysis.model_validate_json(stored.analysis_json).financial_data == edited
+
+                # Reopened from storage once the session has left memory
+                edit_sessions.clear()
+                with pytest.raises(HTTPException) as missing_prior:
+                    await edit("s", AnalysisEdit(changes={"cogs": 99.0}), db)
+                await edit("s", AnalysisEdit(changes={"cogs": 99.0}, previous_year_data=edited_prev), db)
+                await db.refresh(stored)
+                reopened = stored.analysis_json
+
+                with pytest.raises(HTTPException) as unknown_field:
+                    await edit("s", AnalysisEdit(changes={"not_a_field": 1.0}), db)
+                with pytest.raises(HTTPException) as unknown_session:
+                    await edit("nope", AnalysisEdit(changes={"cogs": 1.0}), db)
+        finally:
+            await async_engine.dispose()
+        return delta, reopened, missing_prior.value, unknown_field.value, unknown_session.value
+
+    try:
+        delta, reopened, missing_prior, unknown_field, unknown_session = asyncio.run(session_flow())
+    finally:
+        shutdown_pools()
+        edit_sessions.clear()
+
+    expected = IncrementalAnalysis(data, prev).update(changes)
+    assert delta == expected
+    final = analyze(_edited(edited, {"cogs": 99.0}), edited_prev)
+    final.session_id = "s"
+    assert reopened == final.model_dump_json()
+    assert (missing_prior.status_code, unknown_field.status_code, unknown_session.status_code) == (409, 400, 404)
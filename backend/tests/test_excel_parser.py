@@ -0,0 +1,63 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from openpyxl import Workbook
+
+from routers.excel_import import import_excel
+from services.excel_parser import LayoutCache, parse_excel
+from services.executor import shutdown_pools
+
+
+@pytest.mark.parametrize("content", [b"not a zip", b"PK\x03\x04 truncated"])
+def test_corrupt_workbook_is_a_value_error(content):
+    with pytest.raises(ValueError, match="Not a valid .xlsx workbook"):
+        parse_excel(content)
+
+
+def test_corrupt_upload_is_a_bad_request():
+    upload = UploadFile(file=io.BytesIO(b"not a zip"), filename="statements.xlsx")
+
+    async def upload_once():
+        try:
+            return await import_excel(upload)
+        finally:
+            shutdown_pools()
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(upload_once())
+    assert error.value.status_code == 400
+
+
+def _workbook(amounts):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Balance Sheet"
+    sheet.append(["Particulars", "Note No.", "FY 2023-24", "FY 2022-23"])
+    for label, current, prior in amounts:
+        sheet.append([label, None, current, prior])
+    sheet.append(["Footer", None, None, "end"])
+    out = io.BytesIO()
+    workbook.save(out)
+    return out.getvalue()
+
+
+def _result(extraction):
+    return extraction.model_dump(exclude={"layout_cached", "rows_scanned", "elapsed_ms"})
+
+
+def test_cached_layout_reports_like_a_fresh_parse():
+    rows = [("Inventories", 500, 400), ("Trade Receivables", 300, 250), ("Net Sales", 4000, 3500)]
+    cache = LayoutCache()
+    first = parse_excel(_workbook(rows), cache)
+    again = parse_excel(_workbook(rows), cache)
+    assert not first.layout_cached and again.layout_cached
+    assert _result(again) == _result(first)
+
+    # Same structure, but one remembered row has lost its amounts
+    blanked = [("Inventories", None, None)] + rows[1:]
+    cached = parse_excel(_workbook(blanked), cache)
+    fresh = parse_excel(_workbook(blanked), LayoutCache())
+    assert _result(cached) == _result(fresh)
+    assert "inventories" in cached.missing_fields
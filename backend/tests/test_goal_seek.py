@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from services.goal_seek import GOAL_SEEK_LEVERS, _Problem, goal_seek
+from services.synthetic import generate_frame
+
+
+@pytest.fixture
+def negative_equity():
+    data = generate_frame(1, years=1, seed=5).to_records()[0]
+    data.balance_sheet.share_capital = -abs(data.balance_sheet.share_capital) - 1e6
+    return data
+
+
+@pytest.mark.parametrize("field", list(GOAL_SEEK_LEVERS))
+def test_lever_moves_in_its_direction_on_a_negative_base(field, negative_equity):
+    problem = _Problem(negative_equity, [field], None)
+    problem.base_values[:] = -1000.0
+    direction, counterpart = GOAL_SEEK_LEVERS[field]
+    deltas = problem.deltas(np.array([[0.1]]))
+    assert deltas[field][0] == pytest.approx(direction * 100.0)
+    if counterpart is not None:
+        assert deltas[counterpart][0] == pytest.approx(100.0)
+
+
+def test_negative_share_capital_is_raised_to_the_target(negative_equity):
+    base = goal_seek(negative_equity, 0.0, levers=["share_capital"]).base_score.overall
+    result = goal_seek(negative_equity, base + 3, levers=["share_capital"])
+    assert result.achieved
+    (change,) = result.changes
+    assert change.new_value > change.base_value
+    assert change.change_pct > 0
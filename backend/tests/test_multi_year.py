@@ -0,0 +1,15 @@
+import pytest
+
+from services.analyzer import analyze
+from services.multi_year import multi_year_analysis
+
+
+@pytest.mark.parametrize("years", [1, 2, 5])
+def test_chain_matches_per_year_analysis(records, years):
+    for start in range(0, len(records) - years, 37):
+        chain = records[start:start + years]
+        result = multi_year_analysis(chain)
+        assert len(result.analyses) == years
+        for i, analysis in enumerate(result.analyses):
+            expected = analyze(chain[i], chain[i - 1] if i else None)
+            assert analysis.model_dump_json() == expected.model_dump_json(), (start, i)
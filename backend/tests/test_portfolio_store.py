@@ -0,0 +1,48 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from models.database import NORMALIZED_TABLES, AnalysisSession, Base, async_url, make_engine
+from services.analyzer import analyze
+from services.executor import shutdown_pools
+from services.portfolio_store import save_analysis, save_analysis_async
+
+
+def _rows(db, session_id):
+    """Each normalized table's rows for a session, without the session key and row ids."""
+    return {
+        table.__tablename__: sorted(
+            tuple(sorted((k, v) for k, v in vars(row).items() if not k.startswith("_") and k not in ("id", "session_id")))
+            for row in db.scalars(select(table).where(table.session_id == session_id))
+        )
+        for table in NORMALIZED_TABLES
+    }
+
+
+def test_async_save_matches_sync_save(tmp_path, records):
+    url = f"sqlite:///{tmp_path / 'sessions.db'}"
+    engine = make_engine(url)
+    Base.metadata.create_all(engine)
+    analysis = analyze(records[5], records[6])
+
+    async def save_twice():
+        async_engine = create_async_engine(async_url(url))
+        try:
+            async with async_sessionmaker(async_engine, expire_on_commit=False)() as db:
+                # The second save replaces the first session's rows rather than adding to them
+                await save_analysis_async(db, "async", analysis)
+                await save_analysis_async(db, "async", analysis)
+        finally:
+            await async_engine.dispose()
+            shutdown_pools()
+
+    asyncio.run(save_twice())
+    with sessionmaker(bind=engine)() as db:
+        save_analysis(db, "sync", analysis)
+        stored = {s.id: s for s in db.scalars(select(AnalysisSession))}
+        assert stored["async"].analysis_json == stored["sync"].analysis_json
+        assert _rows(db, "async") == _rows(db, "sync")
+        assert _rows(db, "async")["session_scores"]
+    engine.dispose()
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from services import profiler
+from services.executor import run_stage
+
+SCOPE = {"type": "http", "method": "POST", "path": "/profiled", "headers": []}
+
+
+def _spin_profiled(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _spin_other(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def _other_request():
+    # A concurrent, unflagged request: executor work plus loop work of its own
+    await run_stage("analysis", _spin_other, 0.2)
+    end = time.perf_counter() + 0.1
+    while time.perf_counter() < end:
+        await asyncio.sleep(0)
+
+
+async def _profiled_request():
+    session = profiler.start(SCOPE)
+    try:
+        await run_stage("analysis", _spin_profiled, 0.2)
+    finally:
+        profiler.finish(session, "/profiled", 200)
+    return session
+
+
+def test_samples_only_the_flagged_request():
+    async def main():
+        session, _ = await asyncio.gather(_profiled_request(), _other_request())
+        return session
+
+    session = asyncio.run(main())
+    collapsed = session.collapsed()
+    assert "_spin_profiled" in collapsed
+    assert "_spin_other" not in collapsed
+    assert "_other_request" not in collapsed
+    assert session.samples > 0
+
+
+def test_finished_profile_is_frozen_and_workers_unbound():
+    async def main():
+        return await _profiled_request()
+
+    session = asyncio.run(main())
+    stacks, samples = session.collapsed(), session.samples
+    time.sleep(session.interval * 4)
+    assert (session.collapsed(), session.samples) == (stacks, samples)
+    assert not session._workers
+    assert profiler.bind(_spin_other) is _spin_other
@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.financial_frame import FinancialFrame
+from services.analyzer import analyze, score_batch
+from services.bulk import run_bulk
+from services.ratio_store import RATIO_COLUMNS, SCORE_COLUMNS, RatioStore
+from services.synthetic import generate_frame, write_dataset
+
+
+def _append(store, frame):
+    ratios, scores = score_batch(frame)
+    return store.append(frame.company_names.tolist(), frame.financial_years.tolist(), ratios, scores), ratios
+
+
+def test_append_and_reopen(tmp_path):
+    frame = generate_frame(6, years=2, seed=1)
+    store = RatioStore(str(tmp_path / "store"), create=True)
+    assert len(store) == 0
+    rows, ratios = _append(store, frame)
+    assert rows == len(frame)
+
+    reopened = RatioStore(str(tmp_path / "store"))
+    assert len(reopened) == len(frame)
+    np.testing.assert_array_equal(reopened["dscr"], ratios["dscr"])
+    assert [reopened.company_names[i] for i in reopened["company_id"]] == frame.company_names.tolist()
+    assert [reopened.year_labels[i] for i in reopened["year_id"]] == frame.financial_years.tolist()
+    assert len(reopened.rows_for(frame.company_names[0])) == 2
+
+    # Labels seen before are interned once
+    _append(store, frame)
+    reopened.refresh()
+    assert len(reopened) == 2 * len(frame)
+    assert len(reopened.company_names) == 6
+
+
+def test_missing_store_is_an_error(tmp_path):
+    with pytest.raises(ValueError, match="No ratio store"):
+        RatioStore(str(tmp_path / "absent"))
+
+
+def test_interrupted_append_is_invisible_and_overwritten(tmp_path):
+    path = tmp_path / "store"
+    store = RatioStore(str(path), create=True)
+    first = generate_frame(3, years=1, seed=2)
+    _append(store, first)
+
+    # A writer that died after writing column bytes and new labels but before meta.json
+    with open(path / "dscr.col", "ab") as f:
+        f.write(np.full(5, 99.0).tobytes())
+    with open(path / "companies.jsonl", "a") as f:
+        f.write(json.dumps("Ghost Pvt Ltd") + "\n")
+    reopened = RatioStore(str(path))
+    assert len(reopened) == 3
+    assert "Ghost Pvt Ltd" not in reopened.company_names
+
+    second = generate_frame(2, years=1, seed=9)
+    _, ratios = _append(reopened, second)
+    reopened = RatioStore(str(path))
+    assert len(reopened) == 5
+    np.testing.assert_array_equal(reopened["dscr"][3:], ratios["dscr"])
+    assert (path / "dscr.col").stat().st_size == 5 * 8
+    lines = (path / "companies.jsonl").read_text().splitlines()
+    assert [json.loads(line) for line in lines] == reopened.company_names
+    assert "Ghost Pvt Ltd" not in reopened.company_names
+
+
+def test_append_analyses_matches_append_frame(tmp_path, records):
+    analyses = [analyze(data) for data in records[400:410]]
+    by_analysis = RatioStore(str(tmp_path / "a"), create=True)
+    by_frame = RatioStore(str(tmp_path / "f"), create=True)
+    by_analysis.append_analyses(analyses)
+    by_frame.append_frame(FinancialFrame.from_records(records[400:410]), chain_years=False)
+    for name in RATIO_COLUMNS + ["score_" + s for s in SCORE_COLUMNS] + ["zone"]:
+        np.testing.assert_array_equal(by_analysis[name], by_frame[name], err_msg=name)
+
+
+def test_bulk_run_fills_the_store(tmp_path):
+    write_dataset(str(tmp_path / "portfolio.csv"), companies=12, years=3, seed=4)
+    stats = run_bulk(
+        str(tmp_path / "portfolio.csv"), str(tmp_path / "out.csv"), chunk_size=7,
+        ratio_store=str(tmp_path / "store"),
+    )
+    out = pd.read_csv(tmp_path / "out.csv", float_precision="round_trip")
+    store = RatioStore(str(tmp_path / "store"))
+    assert stats["store_rows"] == len(store) == len(out) == 36
+    np.testing.assert_array_equal(store["current_ratio"], out["current_ratio"].to_numpy())
+    np.testing.assert_array_equal(store["score_overall"], out["score_overall"].to_numpy())
+    assert store.zones().tolist() == out["zone"].tolist()
+    assert [store.company_names[i] for i in store["company_id"]] == out["company_name"].tolist()
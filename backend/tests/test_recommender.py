@@ -0,0 +1,23 @@
+import numpy as np
+
+from models.financial_record import FinancialRecord
+from services.calculator import calculate_ratios, calculate_ratios_batch
+from services.recommender import (
+    RECOMMENDATION_RULES, evaluate_rules, fired_rule_codes, fired_rules, generate_recommendations, record_values,
+    rule_columns,
+)
+
+
+def test_batch_rules_match_scalar(record_pairs, batch_pairs):
+    frame, prev_frame, has_prev = batch_pairs
+    ratios = calculate_ratios_batch(frame, prev_frame, has_prev)
+    standalone_prev = {
+        name: np.where(has_prev, column, np.nan) for name, column in calculate_ratios_batch(prev_frame).items()
+    }
+    fired = evaluate_rules(rule_columns(ratios, frame, standalone_prev))
+    for row, (data, prev) in enumerate(record_pairs):
+        prev_ratios = calculate_ratios(prev) if prev is not None else None
+        row_ratios = calculate_ratios(data, prev)
+        values = record_values(FinancialRecord.from_data(data), row_ratios, prev_ratios)
+        assert fired_rule_codes(fired, row) == [RECOMMENDATION_RULES[i].code for i in fired_rules(values)], row
+        assert len(generate_recommendations(row_ratios, data, prev_ratios)) == fired[:, row].sum(), row
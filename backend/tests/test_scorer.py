@@ -0,0 +1,15 @@
+from services.analyzer import compliance_flags, score_batch
+from services.calculator import calculate_ratios
+from services.scorer import calculate_health_score
+from utils.constants import HEALTH_ZONES
+
+SCORES = ("overall", "liquidity", "profitability", "leverage", "efficiency", "cash_flow", "compliance")
+
+
+def test_batch_scores_match_scalar(record_pairs, batch_pairs):
+    _, scores = score_batch(*batch_pairs)
+    for row, (data, prev) in enumerate(record_pairs):
+        expected = calculate_health_score(calculate_ratios(data, prev), **compliance_flags(data))
+        for name in SCORES:
+            assert float(scores[name][row]) == getattr(expected, name), (row, name)
+        assert HEALTH_ZONES[scores["zone"][row]][2] == expected.zone
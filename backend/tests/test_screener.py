@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from models.financial_data import ScreenCondition, ScreenRequest
+from services.ratio_store import RATIO_COLUMNS, SCORE_COLUMNS, RatioStore
+from services.screener import WARM_METRICS, IndexedStore, run_screen, screen_index, start_year
+
+
+def _store(path, rows):
+    """Store of (company, year, debt_to_equity) rows; every other column NaN / zero."""
+    n = len(rows)
+    store = RatioStore(str(path), create=True)
+    ratios = {name: np.full(n, np.nan) for name in RATIO_COLUMNS}
+    ratios["debt_to_equity"] = np.array([de for _, _, de in rows], dtype=np.float64)
+    scores = {name: np.zeros(n) for name in SCORE_COLUMNS}
+    scores["zone"] = np.zeros(n, dtype=np.uint8)
+    store.append([c for c, _, _ in rows], [y for _, y, _ in rows], ratios, scores)
+    return store
+
+
+def test_start_year():
+    assert start_year("2024-25") == 2024
+    assert start_year("FY 2019-20") == 2019
+    assert start_year("unknown") == -1
+
+
+def test_consecutive_years_follow_the_calendar_not_the_store(tmp_path):
+    # Another company fills 2016-17, so ranks alone would make A's years look consecutive
+    store = _store(tmp_path, [
+        ("A", "2015-16", 4.0), ("A", "2017-18", 4.0), ("A", "2018-19", 4.0),
+        ("B", "2015-16", 4.0), ("B", "2016-17", 4.0), ("B", "2017-18", 4.0),
+    ])
+    result = run_screen(store, ScreenRequest(preset="ibc_leverage"))
+    assert [(m.company_name, m.financial_year) for m in result.matches] == [("B", "2017-18")]
+
+
+def test_gap_year_breaks_a_run_even_when_no_company_reports_it(tmp_path):
+    store = _store(tmp_path, [("A", "2015-16", 4.0), ("A", "2017-18", 4.0), ("A", "2018-19", 4.0)])
+    assert run_screen(store, ScreenRequest(preset="ibc_leverage")).total_matches == 0
+
+
+@pytest.mark.parametrize("fields", [
+    {"conditions": [{"metric": "dscr", "op": ">", "value": 1, "years": 0}]},
+    {"conditions": [{"metric": "dscr", "op": ">", "value": 1, "years": 10_000}]},
+    {"preset": "ibc_leverage", "limit": -1},
+])
+def test_request_bounds(fields):
+    with pytest.raises(ValidationError):
+        ScreenRequest(**fields)
+
+
+def test_limit_zero_counts_without_returning_rows(tmp_path):
+    store = _store(tmp_path, [("A", "2015-16", 4.0)])
+    result = run_screen(store, ScreenRequest(conditions=[ScreenCondition(metric="debt_to_equity", op=">", value=3)],
+                                             limit=0))
+    assert (result.total_matches, result.matches) == (1, [])
+
+
+def test_indexed_store_builds_indexes_before_screens(tmp_path):
+    portfolio = IndexedStore(str(tmp_path / "store"))
+    with pytest.raises(ValueError, match="No ratio store"):
+        portfolio.current()
+
+    _store(tmp_path / "store", [("A", "2015-16", 4.0), ("A", "2016-17", 4.0)])
+    assert portfolio.refresh()
+    store, index = portfolio.current()
+    assert len(index) == 2 and set(index.sorted_metrics) == WARM_METRICS
+    run_screen(store, ScreenRequest(conditions=[ScreenCondition(metric="quick_ratio", op=">", value=1)]), index)
+    assert not portfolio.refresh()
+
+    # Rows appended through another handle (another process, in production)
+    _store(tmp_path / "store", [("A", "2017-18", 4.0)])
+    assert portfolio.current() == (store, index)
+    assert portfolio.refresh()
+    store, index = portfolio.current()
+    assert len(store) == len(index) == 3
+    assert screen_index(store) is index
+    assert set(index.sorted_metrics) == WARM_METRICS | {"quick_ratio"}
+    result = run_screen(store, ScreenRequest(preset="ibc_leverage"), index)
+    assert [(m.company_name, m.financial_year) for m in result.matches] == [("A", "2017-18")]
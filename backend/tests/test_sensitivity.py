@@ -0,0 +1,45 @@
+import pytest
+from pydantic import ValidationError
+
+from models.financial_data import FinancialData, SensitivityAxis
+from services.analyzer import compliance_flags
+from services.calculator import calculate_ratios
+from services.scorer import calculate_health_score
+from services.sensitivity import grid_columns, run_sweep
+from utils.constants import SENSITIVITY_MAX_POINTS
+
+
+@pytest.mark.parametrize("fields", [
+    {"steps": 0},
+    {"steps": SENSITIVITY_MAX_POINTS + 1},
+    {"values": [0.0] * (SENSITIVITY_MAX_POINTS + 1)},
+])
+def test_axis_bounds(fields):
+    with pytest.raises(ValidationError):
+        SensitivityAxis(field="cogs", **fields)
+
+
+def test_oversized_grid_is_rejected_before_allocation():
+    # Bypasses validation, as a direct caller could: 10^10 steps must not reach np.linspace
+    axis = SensitivityAxis.model_construct(field="cogs", mode="add", values=None, start=0, stop=1, steps=10**10)
+    with pytest.raises(ValueError, match="exceeds the limit"):
+        grid_columns(FinancialData(), [axis])
+
+
+def test_two_axes_multiply_towards_the_limit():
+    side = int(SENSITIVITY_MAX_POINTS ** 0.5) + 1
+    axes = [SensitivityAxis(field="cogs", steps=side), SensitivityAxis(field="inventories", steps=side)]
+    with pytest.raises(ValueError, match="exceeds the limit"):
+        grid_columns(FinancialData(), axes)
+
+
+@pytest.mark.parametrize("index", [20, 150, 260, 420, 436])
+def test_sweep_points_match_scalar_scores(records, index):
+    data, prev = records[index], records[index + 1]
+    axis = SensitivityAxis(field="revenue_from_operations", mode="pct", start=-30, stop=30, steps=7)
+    result = run_sweep(data, [axis], prev)
+    for pct, overall in zip(result.axis_values[0], result.overall):
+        moved = data.model_copy(deep=True)
+        moved.profit_loss.revenue_from_operations *= 1 + pct / 100
+        score = calculate_health_score(calculate_ratios(moved, prev), **compliance_flags(moved))
+        assert overall == score.overall
@@ -0,0 +1,18 @@
+"""Startup budget: heavy parser libraries stay off the import path and a cold start fits STARTUP_BUDGET_S."""
+import statistics
+
+from benchmarks.startup import cold_start, import_report
+from utils.constants import DEFERRED_IMPORTS, STARTUP_BUDGET_S
+
+
+def test_import_main_defers_parser_libraries():
+    report = import_report("main")
+    assert [name for name in DEFERRED_IMPORTS if name in report.modules] == []
+
+
+def test_cold_start_within_budget(tmp_path, monkeypatch):
+    # The server's lifespan creates its tables; keep them out of the working tree
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'startup.db'}")
+    monkeypatch.setenv("PRELOAD_PARSERS", "0")
+    times = [cold_start("main:app", 8767, "/health", timeout=STARTUP_BUDGET_S * 5) for _ in range(3)]
+    assert statistics.median(times) <= STARTUP_BUDGET_S, times
@@ -0,0 +1,39 @@
+import pytest
+
+from models.financial_data import StressFactor
+from services import executor
+from services.executor import shutdown_pools, worker_pool
+from services.stress_test import factor_mode, run_stress_test
+from utils.constants import STRESS_CHUNK_SIZE
+
+FACTORS = [
+    StressFactor(field="revenue_from_operations", distribution="normal", mean=0, std=15),
+    StressFactor(field="cogs", distribution="lognormal", mean=0, std=0.1),
+]
+
+
+@pytest.mark.parametrize("distribution, mode", [("normal", "pct"), ("uniform", "pct"), ("lognormal", "scale")])
+def test_default_mode_follows_the_distribution(distribution, mode):
+    assert factor_mode(StressFactor(field="cogs", distribution=distribution)) == mode
+    assert factor_mode(StressFactor(field="cogs", distribution=distribution, mode="add")) == "add"
+
+
+def test_lognormal_draws_scale_the_field(records):
+    # Draws are multipliers around 1: as "pct" they would be ~1% moves
+    scaled = run_stress_test(records[420], [FACTORS[1].model_copy(update={"mode": "scale"})], 500, workers=1)
+    assert run_stress_test(records[420], [FACTORS[1]], 500, workers=1) == scaled
+    assert run_stress_test(records[420], [FACTORS[1].model_copy(update={"mode": "pct"})], 500, workers=1) != scaled
+
+
+def test_pool_results_match_inline_and_the_pool_is_reused(records):
+    scenarios = STRESS_CHUNK_SIZE * 2 + 7
+    try:
+        inline = run_stress_test(records[420], FACTORS, scenarios, seed=4, workers=1)
+        pooled = run_stress_test(records[420], FACTORS, scenarios, seed=4, workers=2)
+        pool = worker_pool("stress", 2)
+        assert run_stress_test(records[420], FACTORS, scenarios, seed=4, workers=2) == pooled
+        assert worker_pool("stress", 2) is pool
+        assert pool._mp_context is executor.MP_CONTEXT
+    finally:
+        shutdown_pools()
+    assert pooled == inline
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from services.synthetic import generate_frame
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return generate_frame(3000, years=4, seed=3)
+
+
+def _next_year(frame, name):
+    """(this year, next year) of a column for every company-year that has a next year."""
+    values = frame[name].reshape(-1, 4)
+    return values[:, :-1].ravel(), values[:, 1:].ravel()
+
+
+def test_balance_sheet_balances(frame):
+    np.testing.assert_array_equal(frame["total_assets"], frame["total_liabilities_equity"])
+
+
+def test_cash_flows_reconcile_to_the_cash_balance(frame):
+    before, after = _next_year(frame, "cash_and_equivalents")
+    _, change = _next_year(frame, "net_cash_change")
+    np.testing.assert_array_equal(after - before, change)
+
+
+def test_capex_is_the_spend_on_fixed_assets_and_cwip(frame):
+    assert frame["capex"].min() >= 0
+    fa_before, fa_after = _next_year(frame, "fixed_assets")
+    cwip_before, cwip_after = _next_year(frame, "capital_wip")
+    _, depreciation = _next_year(frame, "depreciation")
+    _, capex = _next_year(frame, "capex")
+    np.testing.assert_array_equal(capex, fa_after - fa_before + depreciation + cwip_after - cwip_before)
+
+
+def test_investing_inflows_come_from_investment_disposals(frame):
+    lti_before, lti_after = _next_year(frame, "long_term_investments")
+    _, investing = _next_year(frame, "investing_cf")
+    assert np.all(lti_after[investing > 0] < lti_before[investing > 0])
+
+
+def test_same_seed_same_data():
+    np.testing.assert_array_equal(generate_frame(50, years=3, seed=8).values, generate_frame(50, years=3, seed=8).values)
@@ -0,0 +1,39 @@
+"""
+NumPy helpers for the batch (portfolio) code paths.
+Missing values are carried as NaN — the columnar equivalent of None.
+"""
+import numpy as np
+
+
+def safe_div_array(numerator, denominator) -> np.ndarray:
+    """Element-wise division that yields NaN wherever the denominator is zero or NaN."""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    shape = np.broadcast(numerator, denominator).shape
+    out = np.full(shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=(denominator != 0) & ~np.isnan(denominator))
+    return out
+
+
+def round_array(values, ndigits: int) -> np.ndarray:
+    """
+    Round like the builtin ``round(x, ndigits)``.
+
+    ``np.round`` scales by 10**ndigits before rounding, which can land on the
+    other side of a half-way point than Python's correctly-rounded result.
+    Those near-ties are rare, so they are re-rounded one by one in Python.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    with np.errstate(invalid="ignore"):
+        distance = np.abs(scaled - np.floor(scaled) - 0.5)
+        suspect = (distance < 1e-6) | (np.abs(scaled) >= 2.0 ** 52)
+    suspect &= np.isfinite(values)
+    if suspect.any():
+        idx = np.flatnonzero(suspect)
+        flat = rounded.reshape(-1)
+        source = values.reshape(-1)
+        for i in idx:
+            flat[i] = round(float(source[i]), ndigits)
+    return rounded
@@ -80,7 +80,8 @@ NPA_RISK = {
 
 # IBC risk flags
 IBC_FLAGS = {
-    "de_ratio_consecutive_years": 3,   # D/E > 3x for 3+ years
+    "de_ratio_threshold": 3,           # D/E above this ...
+    "de_ratio_consecutive_years": 3,   # ... for 3+ years
     "ibc_trigger_amount": 10000000,    # ₹1 Crore in rupees
 }
 
@@ -89,3 +90,123 @@ EXPENSE_ALERTS = {
     "labour_revenue_pct": 30,          # Labour > 30% of revenue
     "finance_revenue_pct": 5,          # Finance costs > 5% of revenue
 }
+
+# Bump whenever the benchmark / scoring tables above are revised, so cached
+# analyses computed under the old tables are discarded
+BENCHMARKS_VERSION = "2025.1"
+
+# Max FullAnalysis objects kept by the in-process analysis cache, and how
+# often (seconds) it re-hashes the scoring tables to notice edits
+ANALYSIS_CACHE_SIZE = 1024
+ANALYSIS_CACHE_RECHECK_S = 1.0
+
+# Stored sessions kept in memory for incremental (PATCH) editing
+EDIT_SESSIONS_SIZE = 256
+
+# Largest what-if grid the sensitivity engine will evaluate in one request
+SENSITIVITY_MAX_POINTS = 250000
+
+# Monte Carlo stress testing: scenarios per chunk (one RNG stream and one
+# pool task each), above which runs are spread over a process pool
+STRESS_CHUNK_SIZE = 100000
+STRESS_MAX_SCENARIOS = 5000000
+STRESS_WORKERS = 4
+
+# Goal-seek solver: largest change considered per lever, grid steps per lever
+# within that range, and the cap on greedy iterations
+GOAL_SEEK_MAX_CHANGE_PCT = 50
+GOAL_SEEK_STEPS = 50
+GOAL_SEEK_MAX_ITERATIONS = 8
+
+# Multi-year analysis: trailing window (years) for rolling averages, and the
+# smallest year-over-year move reported as an improvement / deterioration
+MULTI_YEAR_ROLLING_WINDOW = 3
+YOY_CHANGE_THRESHOLD_PCT = 2
+
+# Rows per chunk for the bulk-analysis CLI (bounds its memory use)
+BULK_CHUNK_SIZE = 10000
+
+# Workbook layouts (sheet → row → field) remembered by the Excel parser
+EXCEL_LAYOUT_CACHE_SIZE = 256
+
+# PDF extraction: pages scoring at least PDF_MIN_PAGE_SCORE (heading weight +
+# line items found) are table-extracted, at most PDF_MAX_STATEMENT_PAGES of
+# them, over PDF_WORKERS processes; extracted pages kept per (file, page)
+PDF_MIN_PAGE_SCORE = 6
+PDF_MAX_STATEMENT_PAGES = 6
+PDF_WORKERS = 4
+PDF_TABLE_CACHE_SIZE = 512
+
+# Sessions migrated per transaction when backfilling the normalized tables
+NORMALIZED_BACKFILL_CHUNK_SIZE = 500
+
+# SQLite storage defaults (each overridable through the SQLITE_* environment
+# variables): WAL lets readers run alongside the single writer, NORMAL sync
+# is durable at checkpoints under WAL, cache in KiB, mmap in bytes
+SQLITE_JOURNAL_MODE = "WAL"
+SQLITE_SYNCHRONOUS = "NORMAL"
+SQLITE_CACHE_SIZE_KIB = 65536
+SQLITE_MMAP_SIZE = 268435456
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_POOL_SIZE = 8
+SQLITE_MAX_OVERFLOW = 16
+
+# Rows per transaction for bulk writes
+DB_BULK_CHUNK_SIZE = 1000
+
+# Portfolio screening: cap (and default) on returned matches, longest
+# consecutive-year run a condition may ask for, where the memory-mapped
+# ratio store lives unless RATIO_STORE_DIR is set, and how often the server
+# checks it for appended rows (re-indexing them before any screen sees them)
+SCREEN_MAX_RESULTS = 1000
+SCREEN_MAX_YEARS = 20
+RATIO_STORE_DIRNAME = "ratio_store"
+SCREEN_INDEX_REFRESH_S = 5.0
+
+# Executor pools per pipeline stage: (kind, workers). "parse" reads uploaded
+# workbooks / PDFs, "analysis" runs the scoring engines, "db" runs
+# synchronous storage calls. Each is overridable with
+# EXECUTOR_<STAGE>_KIND / EXECUTOR_<STAGE>_WORKERS.
+# "parse" stays on threads so every upload sees the same Excel layout cache
+# and PDF page cache; PDF table extraction fans out to its own processes.
+EXECUTOR_STAGES = {
+    "parse": ("thread", 2),
+    "analysis": ("thread", 4),
+    "db": ("thread", 4),
+}
+# Calls allowed to queue on a stage per worker before callers wait
+EXECUTOR_QUEUE_PER_WORKER = 4
+
+# NDJSON batch endpoint: records analysed per chunk, chunks allowed to wait
+# between the upload reader and the analysis pool, and the longest accepted
+# record line
+CALCULATE_STREAM_CHUNK_SIZE = 500
+CALCULATE_STREAM_QUEUE_CHUNKS = 2
+CALCULATE_STREAM_MAX_LINE_BYTES = 1024 * 1024
+
+# Synthetic portfolio generator: companies per generated block (each block
+# has its own seeded stream, so output does not depend on how it is
+# written) and the corporate tax rate applied to positive PBT
+SYNTHETIC_CHUNK_COMPANIES = 20000
+SYNTHETIC_TAX_RATE = 0.2517
+
+# Metrics: name prefix and latency histogram bucket bounds in seconds
+METRICS_PREFIX = "fhc"
+METRICS_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Request profiling (only when REQUEST_PROFILING=1): header that turns it on
+# for one request, sampling interval, deepest stack kept and how many
+# finished profiles are held for /metrics/profiles
+PROFILE_HEADER = "X-Profile"
+PROFILE_INTERVAL_S = 0.005
+PROFILE_MAX_DEPTH = 64
+PROFILE_KEEP = 20
+
+# Startup: libraries that must not load with the app (routers import them
+# on first use), the parser modules a background thread imports once the
+# app is up, how long after startup it waits, and the cold-start budget
+# (process launch to first /health response) checked by benchmarks/startup.py
+DEFERRED_IMPORTS = ("pandas", "openpyxl", "pdfplumber", "pypdfium2")
+PRELOAD_MODULES = ("services.excel_parser", "services.pdf_extractor")
+PRELOAD_DELAY_S = 1.0
+STARTUP_BUDGET_S = 2.5
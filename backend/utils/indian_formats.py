@@ -112,3 +112,22 @@ def lakhs_to_crores(lakhs: float) -> float:
 def fy_label(year_str: str) -> str:
     """Return 'FY 2024-25' format from '2024-25' input."""
     return f"FY {year_str}"
+
+
+def parse_inr_amount(value) -> float:
+    """
+    Parse a statement cell: numbers pass through, strings may use Indian or
+    Western commas, ₹ and (brackets) for negatives; a dash means zero.
+    Raises ValueError when the cell is not an amount.
+    """
+    if isinstance(value, bool):
+        raise ValueError("not an amount")
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().replace("₹", "").replace(",", "").replace(" ", "")
+    if text in ("-", "—", "–"):
+        return 0.0
+    sign = 1.0
+    if text.startswith("(") and text.endswith(")"):
+        sign, text = -1.0, text[1:-1]
+    return sign * float(text)
@@ -0,0 +1,139 @@
+"""
+Statement line-item labels.
+Maps the row labels used in Schedule III / Tally / CA-prepared statements to FinancialData fields.
+"""
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utils.indian_formats import parse_inr_amount
+
+# Same vocabulary as the document-extraction prompt in the frontend
+LINE_ITEM_LABELS: Dict[str, list] = {
+    # Balance sheet — assets
+    "fixed_assets": ["Fixed Assets", "Property Plant and Equipment", "Property, Plant & Equipment", "PPE",
+                     "Tangible Assets", "Net Block"],
+    "capital_wip": ["Capital Work-in-Progress", "Capital Work in Progress", "CWIP", "Assets Under Construction"],
+    "long_term_investments": ["Long-term Investments", "Non-current Investments", "Investment in Subsidiaries"],
+    "deferred_tax_asset": ["Deferred Tax Asset", "Deferred Tax Assets", "Deferred Tax Assets (Net)", "DTA"],
+    "long_term_loans_advances": ["Long-term Loans and Advances", "Long-term Loans & Advances", "Security Deposits",
+                                 "Capital Advances"],
+    "other_non_current_assets": ["Other Non-current Assets", "Goodwill", "Intangible Assets", "Intangibles"],
+    "inventories": ["Inventories", "Inventory", "Stock", "Stock-in-Trade", "Closing Stock"],
+    "trade_receivables": ["Trade Receivables", "Sundry Debtors", "Accounts Receivable", "Debtors"],
+    "cash_and_equivalents": ["Cash and Cash Equivalents", "Cash & Cash Equivalents", "Cash and Bank Balances",
+                             "Cash & Bank", "Bank Balance", "Cash-in-Hand"],
+    "short_term_loans_advances": ["Short-term Loans and Advances", "Short-term Loans & Advances",
+                                  "Advance to Vendors", "Advances to Suppliers", "Prepaid Expenses"],
+    "gst_itc_receivable": ["GST ITC", "GST Input Tax Credit", "Input Tax Credit Receivable", "GST Receivable",
+                           "Balances with GST Authorities"],
+    "tds_advance_tax_receivable": ["TDS Receivable", "Advance Tax", "Advance Tax and TDS", "Tax Refund Receivable",
+                                   "Income Tax Recoverable"],
+    "other_current_assets": ["Other Current Assets"],
+    # Balance sheet — equity and liabilities
+    "share_capital": ["Share Capital", "Equity Share Capital", "Paid-up Capital", "Capital Account"],
+    "reserves_surplus": ["Reserves and Surplus", "Reserves & Surplus", "Other Equity", "Retained Earnings",
+                         "Profit & Loss A/c"],
+    "money_received_share_warrants": ["Money Received Against Share Warrants"],
+    "long_term_borrowings": ["Long-term Borrowings", "Term Loans", "Secured Loans", "Debentures"],
+    "deferred_tax_liability": ["Deferred Tax Liability", "Deferred Tax Liabilities",
+                               "Deferred Tax Liabilities (Net)", "DTL"],
+    "long_term_provisions": ["Long-term Provisions", "Gratuity Liability"],
+    "short_term_borrowings": ["Short-term Borrowings", "Cash Credit", "Bank Overdraft", "Overdraft", "WCDL",
+                              "Working Capital Loan"],
+    "trade_payables": ["Trade Payables", "Sundry Creditors", "Accounts Payable", "Creditors"],
+    "gst_payable": ["GST Payable", "Output GST", "Output Tax", "Duties & Taxes"],
+    "tds_payable": ["TDS Payable", "TCS Payable", "TDS/TCS Payable"],
+    "pf_esi_payable": ["PF Payable", "ESI Payable", "PF and ESI Payable", "Provident Fund Payable", "ESIC Payable"],
+    "advance_from_customers": ["Advance from Customers", "Advances from Customers", "Customer Deposits",
+                               "Unearned Revenue"],
+    "other_current_liabilities": ["Other Current Liabilities", "Accrued Liabilities", "Expenses Payable"],
+    # Profit and loss
+    "revenue_from_operations": ["Revenue from Operations", "Net Sales", "Sales", "Turnover", "Net Revenue",
+                                "Sales Accounts"],
+    "other_income": ["Other Income", "Non-operating Income", "Indirect Incomes"],
+    "cogs": ["Cost of Goods Sold", "COGS", "Cost of Materials Consumed", "Cost of Sales", "Purchase Accounts"],
+    "employee_expenses": ["Employee Benefit Expense", "Employee Benefits Expense", "Employee Benefit Expenses",
+                          "Staff Costs", "Salaries and Wages", "Salaries & Wages", "Personnel Expenses"],
+    "finance_costs": ["Finance Costs", "Finance Cost", "Interest Expense", "Borrowing Costs"],
+    "depreciation": ["Depreciation", "Depreciation and Amortisation", "Depreciation and Amortization",
+                     "Depreciation & Amortisation Expense", "Depreciation and Amortisation Expense",
+                     "Depreciation and Amortization Expense"],
+    "other_expenses": ["Other Expenses", "Administrative Expenses", "Indirect Expenses"],
+    "tax_expense": ["Tax Expense", "Total Tax Expense", "Income Tax Expense", "Provision for Tax"],
+    # Cash flow
+    "operating_cf": ["Net Cash from Operating Activities", "Net Cash from/(used in) Operating Activities",
+                     "Net Cash generated from Operating Activities", "Cash from Operations"],
+    "investing_cf": ["Net Cash from Investing Activities", "Net Cash from/(used in) Investing Activities",
+                     "Net Cash used in Investing Activities"],
+    "financing_cf": ["Net Cash from Financing Activities", "Net Cash from/(used in) Financing Activities",
+                     "Net Cash used in Financing Activities"],
+    "capex": ["Purchase of Fixed Assets", "Purchase of Property, Plant and Equipment", "Capital Expenditure",
+              "CapEx"],
+    # Company-level
+    "promoter_loans": ["Promoter Loans", "Director Loans", "Loans from Directors", "Loans from Shareholders",
+                       "Unsecured Loans from Directors"],
+    "msme_payables": ["MSME Payables", "Payables to MSME", "Dues to Micro and Small Enterprises"],
+    "annual_loan_repayment": ["Principal Repayment", "Loan Repayment", "Repayment of Long-term Borrowings"],
+}
+
+# Fields always reported as positive amounts, whatever sign the statement uses
+POSITIVE_FIELDS = {"capex"}
+
+_ENUMERATION = re.compile(r"^(\(?(?:[ivx]+|[a-h]|\d+(?:\.\d+)*)[).]\s*)+")
+_PARENTHESES = re.compile(r"\([^)]*\)")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_label(text: str) -> str:
+    """Lower-case key for a row label: drops numbering, bracketed asides and punctuation."""
+    text = _ENUMERATION.sub("", text.strip().lower())
+    text = text.replace("&", " and ")
+    text = _PARENTHESES.sub(" ", text)
+    return _NON_ALNUM.sub("", text)
+
+
+_LABEL_INDEX: Dict[str, str] = {
+    normalize_label(label): field
+    for field, labels in LINE_ITEM_LABELS.items()
+    for label in labels
+}
+
+
+def match_line_item(text: str) -> Optional[str]:
+    """The FinancialData field a row label refers to, if any."""
+    return _LABEL_INDEX.get(normalize_label(text))
+
+
+_NOTE_HEADERS = {"note", "notes", "noteno", "notenumber", "schedule", "sch"}
+
+
+def find_line_item(row: Sequence) -> Tuple[Optional[int], Optional[str]]:
+    """First text cell of a statement row that names a known line item: (column, field)."""
+    for col, cell in enumerate(row):
+        if isinstance(cell, str) and cell.strip():
+            field = match_line_item(cell)
+            if field is not None:
+                return col, field
+    return None, None
+
+
+def note_column(row: Sequence) -> Optional[int]:
+    """Column of a "Note No." style header in this row, if it has one."""
+    for col, cell in enumerate(row):
+        if isinstance(cell, str) and normalize_label(cell) in _NOTE_HEADERS:
+            return col
+    return None
+
+
+def row_amounts(row: Sequence, label_col: int, note_col: Optional[int] = None) -> List[float]:
+    """Amount cells to the right of the label: current year first, then prior year."""
+    amounts = []
+    for col in range(label_col + 1, len(row)):
+        cell = row[col]
+        if col == note_col or cell is None or (isinstance(cell, str) and not cell.strip()):
+            continue
+        try:
+            amounts.append(parse_inr_amount(cell))
+        except ValueError:
+            continue
+    return amounts